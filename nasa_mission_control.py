@@ -7,12 +7,13 @@ from typing import Annotated, List, Any, Optional, Dict
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
+from langgraph.constants import Send
 from langgraph.prebuilt import ToolNode
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 import uuid
+import httpx
 import asyncio
 import os
 from datetime import datetime
@@ -22,15 +23,30 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Configuration is read once at import so misconfiguration fails fast at startup
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+if not OPENAI_API_KEY:
+    raise ValueError("OPENAI_API_KEY environment variable is required")
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+
+# Priority levels that require a full systems analysis before the Flight Director decides
+ESCALATED_PRIORITIES = frozenset({"elevated", "critical", "emergency"})
+
+def merge_systems_status(left: Dict[str, str], right: Dict[str, str]) -> Dict[str, str]:
+    """Merge systems status updates written by parallel analysis branches"""
+    return {**left, **right}
+
 # Mission Control State
 class MissionState(TypedDict):
     messages: Annotated[List[Any], add_messages]
     mission_phase: str
     priority_level: str
-    systems_status: Dict[str, str]
+    systems_status: Annotated[Dict[str, str], merge_systems_status]
     crew_status: str
     mission_objectives: List[str]
     emergency_procedures: bool
+    requires_director: bool
     flight_director_approval: bool
 
 # Analysis Output Models
@@ -51,69 +67,154 @@ class SystemsCheck(BaseModel):
     overall_health: str = Field(description="Overall spacecraft health assessment")
 
 # NASA Mission Control Tools
+# Tool payloads are static apart from their clock fields, so they are serialized once at
+# import and only the timestamp placeholder is filled in per call.
+_TIMESTAMP_PLACEHOLDER = "__TIMESTAMP__"
+
+_TELEMETRY_JSON = json.dumps({
+    "timestamp": _TIMESTAMP_PLACEHOLDER,
+    "altitude": "408.5 km",
+    "velocity": "7.66 km/s",
+    "orbital_position": "32.5°N, 85.2°W",
+    "power_level": "94%",
+    "communication_signal": "Strong",
+    "crew_vitals": "Nominal",
+    "experiments_status": "Active - 3/5 running"
+}, indent=2)
+
+_TIMELINE_JSON = json.dumps({
+    "current_time": _TIMESTAMP_PLACEHOLDER,
+    "current_activity": "Scientific observations - Earth imaging",
+    "next_activity": "Crew exercise period (T+45 min)",
+    "upcoming_critical_events": [
+        "Docking procedure - T+6 hours",
+        "EVA preparation - T+18 hours",
+        "Orbital adjustment burn - T+24 hours"
+    ],
+    "mission_day": "Mission Day 15",
+    "days_remaining": "195 days"
+}, indent=2)
+
+_PROTOCOLS_JSON = json.dumps({
+    "active_procedures": "Emergency Response Checklist v2.1",
+    "immediate_actions": [
+        "Secure crew safety",
+        "Assess system damage",
+        "Establish communication with Mission Control",
+        "Implement contingency procedures"
+    ],
+    "communication_priorities": [
+        "Life support systems",
+        "Structural integrity", 
+        "Navigation and control",
+        "Power and thermal systems"
+    ],
+    "backup_options": [
+        "Alternative power sources",
+        "Backup communication channels",
+        "Emergency return procedures",
+        "Crew evacuation protocols"
+    ]
+}, indent=2)
+
 async def get_telemetry_data() -> str:
     """Simulate getting real-time telemetry data"""
-    await asyncio.sleep(1)  # Simulate data retrieval delay
-    
-    telemetry = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
-        "altitude": "408.5 km",
-        "velocity": "7.66 km/s",
-        "orbital_position": "32.5°N, 85.2°W",
-        "power_level": "94%",
-        "communication_signal": "Strong",
-        "crew_vitals": "Nominal",
-        "experiments_status": "Active - 3/5 running"
-    }
-    
-    return json.dumps(telemetry, indent=2)
+    return _TELEMETRY_JSON.replace(_TIMESTAMP_PLACEHOLDER, datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"), 1)
 
 async def check_mission_timeline() -> str:
     """Check current mission timeline and upcoming activities"""
-    await asyncio.sleep(1)
-    
-    timeline = {
-        "current_time": datetime.now().strftime("%H:%M UTC"),
-        "current_activity": "Scientific observations - Earth imaging",
-        "next_activity": "Crew exercise period (T+45 min)",
-        "upcoming_critical_events": [
-            "Docking procedure - T+6 hours",
-            "EVA preparation - T+18 hours",
-            "Orbital adjustment burn - T+24 hours"
-        ],
-        "mission_day": "Mission Day 15",
-        "days_remaining": "195 days"
-    }
-    
-    return json.dumps(timeline, indent=2)
+    return _TIMELINE_JSON.replace(_TIMESTAMP_PLACEHOLDER, datetime.now().strftime("%H:%M UTC"), 1)
 
 async def emergency_protocols() -> str:
     """Access emergency protocols and procedures"""
-    await asyncio.sleep(1)
-    
-    protocols = {
-        "active_procedures": "Emergency Response Checklist v2.1",
-        "immediate_actions": [
-            "Secure crew safety",
-            "Assess system damage",
-            "Establish communication with Mission Control",
-            "Implement contingency procedures"
-        ],
-        "communication_priorities": [
-            "Life support systems",
-            "Structural integrity", 
-            "Navigation and control",
-            "Power and thermal systems"
-        ],
-        "backup_options": [
-            "Alternative power sources",
-            "Backup communication channels",
-            "Emergency return procedures",
-            "Crew evacuation protocols"
-        ]
-    }
-    
-    return json.dumps(protocols, indent=2)
+    return _PROTOCOLS_JSON
+
+# Role prompt templates, built once and filled per request with str.format
+SPECIALIST_SYSTEM_TEMPLATE = """
+        You are a NASA Mission Specialist in Mission Control. Your role is to:
+        
+        1. Analyze incoming situations and requests
+        2. Assess priority levels and urgency
+        3. Recommend immediate actions
+        4. Determine if systems checks or escalation are needed
+        
+        Current Mission Context:
+        - Phase: {phase}
+        - Systems Status: {systems_status}
+        - Crew Status: {crew_status}
+        
+        You must always prioritize crew safety and mission success. Use NASA protocols and procedures.
+        Respond with a structured analysis including situation assessment, priority level, and recommended actions.
+        """
+
+SPECIALIST_ANALYSIS_TEMPLATE = """
+        Analyze this mission control situation: {latest_message}
+        
+        Provide:
+        1. Situation assessment
+        2. Priority level (routine/elevated/critical/emergency)
+        3. Recommended immediate actions
+        4. Whether systems check is required
+        5. Whether crew notification is required  
+        6. Whether Flight Director escalation is required
+        
+        Consider NASA mission control protocols and crew safety as top priority.
+        """
+
+SYSTEMS_ENGINEER_SYSTEM_TEMPLATE = """
+        You are a NASA Systems Engineer in Mission Control. Your role is to:
+        
+        1. Assess spacecraft and mission systems status
+        2. Identify potential technical issues
+        3. Recommend technical solutions and workarounds
+        4. Ensure all systems are operating within parameters
+        
+        Current Priority Level: {priority_level}
+        Emergency Procedures Active: {emergency_procedures}
+        """
+
+SYSTEMS_ENGINEER_ANALYSIS_TEMPLATE = """
+        Conduct a systems engineering analysis for: {latest_message}
+        
+        Assess and report on:
+        1. Primary spacecraft systems (propulsion, power, thermal, etc.)
+        2. Backup systems status
+        3. Life support systems
+        4. Communications systems
+        5. Navigation and guidance systems
+        6. Overall spacecraft health assessment
+        
+        Use NASA systems engineering protocols and provide technical recommendations.
+        """
+
+FLIGHT_DIRECTOR_SYSTEM_TEMPLATE = """
+        You are a NASA Flight Director - the ultimate authority for this mission. Your responsibilities:
+        
+        1. Make final decisions on all mission operations
+        2. Authorize critical procedures and actions
+        3. Ensure crew safety above all else
+        4. Coordinate between all mission control teams
+        5. Communicate final decisions and rationale
+        
+        Priority Level: {priority_level}
+        Emergency Status: {emergency_procedures}
+        Systems Status: {systems_status}
+        """
+
+FLIGHT_DIRECTOR_DECISION_TEMPLATE = """
+        As Flight Director, review the mission control team analysis and make your final decision:
+        
+        {conversation}
+        
+        Provide:
+        1. Your final decision and authorization
+        2. Clear rationale for the decision
+        3. Specific instructions for implementation
+        4. Any additional safety measures required
+        5. Communication plan for crew and stakeholders
+        
+        Remember: Crew safety is paramount. Mission success is secondary.
+        """
 
 # NASA Mission Control Agent
 class NASAMissionControl:
@@ -123,8 +224,6 @@ class NASAMissionControl:
         self.systems_engineer_llm = None
         self.tools = []
         self.graph = None
-        self.session_id = str(uuid.uuid4())
-        self.memory = MemorySaver()
         
         # NASA mission phases
         self.mission_phases = {
@@ -139,60 +238,36 @@ class NASAMissionControl:
     
     async def setup(self):
         """Initialize the mission control system"""
-        # Check for API key
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
+        api_key = OPENAI_API_KEY
+        model = OPENAI_MODEL
         
-        model = os.getenv("OPENAI_MODEL", "gpt-4o")
+        # All roles share one async HTTP client so they reuse the same connection pool
+        http_client = httpx.AsyncClient()
         
         # Initialize LLMs for different roles
-        self.mission_specialist_llm = ChatOpenAI(model=model, temperature=0.1, api_key=api_key)
-        self.flight_director_llm = ChatOpenAI(model=model, temperature=0.0, api_key=api_key)  # Most conservative
-        self.systems_engineer_llm = ChatOpenAI(model=model, temperature=0.1, api_key=api_key)
+        self.mission_specialist_llm = ChatOpenAI(model=model, temperature=0.1, api_key=api_key, http_async_client=http_client)
+        self.flight_director_llm = ChatOpenAI(model=model, temperature=0.0, api_key=api_key, streaming=True, http_async_client=http_client)  # Most conservative
+        self.systems_engineer_llm = ChatOpenAI(model=model, temperature=0.1, api_key=api_key, http_async_client=http_client)
         
         # Setup tools (simplified for demo)
         self.tools = []  # Tools would be added here in real implementation
         
         await self.build_graph()
     
-    def mission_specialist(self, state: MissionState) -> Dict[str, Any]:
+    async def mission_specialist(self, state: MissionState) -> Dict[str, Any]:
         """Mission Specialist - Initial assessment and analysis"""
         
-        system_message = f"""
-        You are a NASA Mission Specialist in Mission Control. Your role is to:
-        
-        1. Analyze incoming situations and requests
-        2. Assess priority levels and urgency
-        3. Recommend immediate actions
-        4. Determine if systems checks or escalation are needed
-        
-        Current Mission Context:
-        - Phase: {state.get('mission_phase', 'orbital_operations')}
-        - Systems Status: {state.get('systems_status', {})}
-        - Crew Status: {state.get('crew_status', 'nominal')}
-        
-        You must always prioritize crew safety and mission success. Use NASA protocols and procedures.
-        Respond with a structured analysis including situation assessment, priority level, and recommended actions.
-        """
+        system_message = SPECIALIST_SYSTEM_TEMPLATE.format(
+            phase=state.get('mission_phase', 'orbital_operations'),
+            systems_status=state.get('systems_status', {}),
+            crew_status=state.get('crew_status', 'nominal')
+        )
         
         # Get the latest message
         latest_message = state["messages"][-1].content
         
         # Create analysis prompt
-        analysis_prompt = f"""
-        Analyze this mission control situation: {latest_message}
-        
-        Provide:
-        1. Situation assessment
-        2. Priority level (routine/elevated/critical/emergency)
-        3. Recommended immediate actions
-        4. Whether systems check is required
-        5. Whether crew notification is required  
-        6. Whether Flight Director escalation is required
-        
-        Consider NASA mission control protocols and crew safety as top priority.
-        """
+        analysis_prompt = SPECIALIST_ANALYSIS_TEMPLATE.format(latest_message=latest_message)
         
         messages = [
             SystemMessage(content=system_message),
@@ -200,56 +275,56 @@ class NASAMissionControl:
         ]
         
         # Get structured output
-        llm_with_output = self.mission_specialist_llm.with_structured_output(MissionAnalysis)
-        analysis = llm_with_output.invoke(messages)
+        llm_with_output = self.mission_specialist_llm.with_structured_output(
+            MissionAnalysis, method="json_schema", strict=True
+        )
+        analysis = await llm_with_output.ainvoke(messages)
+        
+        # Requests without an escalation flag are approved under standing procedures,
+        # except critical and emergency situations which always go to the Flight Director
+        requires_director = (
+            analysis.flight_director_escalation
+            or analysis.priority_level in ["critical", "emergency"]
+        )
+        
+        summary = f"Mission Specialist Analysis: {analysis.situation_assessment}"
+        if not requires_director:
+            actions = "\n".join(f"- {action}" for action in analysis.recommended_actions)
+            summary += f"\n\nApproved under standing procedures. Recommended actions:\n{actions}"
         
         # Update state
         new_state = {
-            "messages": [AIMessage(content=f"Mission Specialist Analysis: {analysis.situation_assessment}")],
+            "messages": [AIMessage(content=summary)],
             "priority_level": analysis.priority_level,
             "emergency_procedures": analysis.priority_level in ["critical", "emergency"],
+            "requires_director": requires_director,
+            "flight_director_approval": not requires_director,
         }
         
         return new_state
     
-    def systems_engineer(self, state: MissionState) -> Dict[str, Any]:
+    async def systems_engineer(self, state: MissionState) -> Dict[str, Any]:
         """Systems Engineer - Technical systems analysis"""
         
-        system_message = f"""
-        You are a NASA Systems Engineer in Mission Control. Your role is to:
-        
-        1. Assess spacecraft and mission systems status
-        2. Identify potential technical issues
-        3. Recommend technical solutions and workarounds
-        4. Ensure all systems are operating within parameters
-        
-        Current Priority Level: {state.get('priority_level', 'routine')}
-        Emergency Procedures Active: {state.get('emergency_procedures', False)}
-        """
+        system_message = SYSTEMS_ENGINEER_SYSTEM_TEMPLATE.format(
+            priority_level=state.get('priority_level', 'routine'),
+            emergency_procedures=state.get('emergency_procedures', False)
+        )
         
         latest_message = state["messages"][-1].content
         
-        systems_prompt = f"""
-        Conduct a systems engineering analysis for: {latest_message}
-        
-        Assess and report on:
-        1. Primary spacecraft systems (propulsion, power, thermal, etc.)
-        2. Backup systems status
-        3. Life support systems
-        4. Communications systems
-        5. Navigation and guidance systems
-        6. Overall spacecraft health assessment
-        
-        Use NASA systems engineering protocols and provide technical recommendations.
-        """
+        systems_prompt = SYSTEMS_ENGINEER_ANALYSIS_TEMPLATE.format(latest_message=latest_message)
         
         messages = [
             SystemMessage(content=system_message),
             HumanMessage(content=systems_prompt)
         ]
         
-        llm_with_output = self.systems_engineer_llm.with_structured_output(SystemsCheck)
-        systems_analysis = llm_with_output.invoke(messages)
+        # Free-form status dicts can't be expressed under strict schemas, so strict mode stays off here
+        llm_with_output = self.systems_engineer_llm.with_structured_output(
+            SystemsCheck, method="json_schema"
+        )
+        systems_analysis = await llm_with_output.ainvoke(messages)
         
         new_state = {
             "messages": [AIMessage(content=f"Systems Engineering Analysis: Overall spacecraft health is {systems_analysis.overall_health}")],
@@ -258,76 +333,71 @@ class NASAMissionControl:
         
         return new_state
     
-    def flight_director(self, state: MissionState) -> Dict[str, Any]:
-        """Flight Director - Final decision and authorization"""
-        
-        system_message = f"""
-        You are a NASA Flight Director - the ultimate authority for this mission. Your responsibilities:
+    async def telemetry_analyst(self, state: MissionState) -> Dict[str, Any]:
+        """Telemetry Analyst - Live telemetry, timeline and protocol review"""
         
-        1. Make final decisions on all mission operations
-        2. Authorize critical procedures and actions
-        3. Ensure crew safety above all else
-        4. Coordinate between all mission control teams
-        5. Communicate final decisions and rationale
+        lookups = [get_telemetry_data(), check_mission_timeline()]
+        if state.get("emergency_procedures", False):
+            lookups.append(emergency_protocols())
         
-        Priority Level: {state.get('priority_level', 'routine')}
-        Emergency Status: {state.get('emergency_procedures', False)}
-        Systems Status: {state.get('systems_status', {})}
-        """
+        reports = await asyncio.gather(*lookups)
         
-        # Gather all previous analysis
-        conversation = "\n".join([msg.content for msg in state["messages"][-3:]])
+        new_state = {
+            "messages": [AIMessage(content="Telemetry Analyst Report:\n" + "\n".join(reports))]
+        }
         
-        decision_prompt = f"""
-        As Flight Director, review the mission control team analysis and make your final decision:
+        return new_state
+    
+    async def flight_director(self, state: MissionState) -> Dict[str, Any]:
+        """Flight Director - Final decision and authorization"""
         
-        {conversation}
+        system_message = FLIGHT_DIRECTOR_SYSTEM_TEMPLATE.format(
+            priority_level=state.get('priority_level', 'routine'),
+            emergency_procedures=state.get('emergency_procedures', False),
+            systems_status=state.get('systems_status', {})
+        )
         
-        Provide:
-        1. Your final decision and authorization
-        2. Clear rationale for the decision
-        3. Specific instructions for implementation
-        4. Any additional safety measures required
-        5. Communication plan for crew and stakeholders
+        # Gather all previous analysis
+        conversation = "\n".join(msg.content for msg in state["messages"][-4:])
         
-        Remember: Crew safety is paramount. Mission success is secondary.
-        """
+        decision_prompt = FLIGHT_DIRECTOR_DECISION_TEMPLATE.format(conversation=conversation)
         
         messages = [
             SystemMessage(content=system_message),
             HumanMessage(content=decision_prompt)
         ]
         
-        response = self.flight_director_llm.invoke(messages)
+        # Stream tokens so callers using stream_mode="messages" see the decision as it is generated
+        decision = ""
+        async for chunk in self.flight_director_llm.astream(messages):
+            decision += chunk.content
         
         new_state = {
-            "messages": [AIMessage(content=f"Flight Director Decision: {response.content}")],
+            "messages": [AIMessage(content=f"Flight Director Decision: {decision}")],
             "flight_director_approval": True
         }
         
         return new_state
     
-    def route_analysis(self, state: MissionState) -> str:
-        """Route based on priority level and analysis needs"""
-        priority = state.get("priority_level", "routine")
-        
-        if priority in ["critical", "emergency"]:
-            return "systems_engineer"
-        elif priority == "elevated":
-            return "systems_engineer"
-        else:
+    def route_analysis(self, state: MissionState):
+        """Route based on priority level and analysis needs
+        
+        Escalated requests fan out to the Systems Engineer and Telemetry Analyst in
+        parallel; both branches join again at the Flight Director when escalation is
+        required. Routine requests the Mission Specialist has already approved finish
+        without a Flight Director call.
+        """
+        if state.get("priority_level", "routine") in ESCALATED_PRIORITIES:
+            return [Send("systems_engineer", state), Send("telemetry_analyst", state)]
+        if state.get("requires_director", False):
             return "flight_director"
+        return END
     
     def route_to_director(self, state: MissionState) -> str:
-        """Route to flight director for final decision"""
-        return "flight_director"
-    
-    def check_completion(self, state: MissionState) -> str:
-        """Check if mission control process is complete"""
-        if state.get("flight_director_approval", False):
-            return "END"
-        else:
-            return "mission_specialist"
+        """Route to flight director for final decision when the specialist escalated"""
+        if state.get("requires_director", False):
+            return "flight_director"
+        return END
     
     async def build_graph(self):
         """Build the mission control workflow graph"""
@@ -336,6 +406,7 @@ class NASAMissionControl:
         # Add nodes
         graph_builder.add_node("mission_specialist", self.mission_specialist)
         graph_builder.add_node("systems_engineer", self.systems_engineer)
+        graph_builder.add_node("telemetry_analyst", self.telemetry_analyst)
         graph_builder.add_node("flight_director", self.flight_director)
         
         # Add edges
@@ -343,19 +414,19 @@ class NASAMissionControl:
         graph_builder.add_conditional_edges(
             "mission_specialist", 
             self.route_analysis, 
-            {"systems_engineer": "systems_engineer", "flight_director": "flight_director"}
+            ["systems_engineer", "telemetry_analyst", "flight_director", END]
         )
-        graph_builder.add_edge("systems_engineer", "flight_director")
+        for analyst in ["systems_engineer", "telemetry_analyst"]:
+            graph_builder.add_conditional_edges(analyst, self.route_to_director, ["flight_director", END])
         graph_builder.add_edge("flight_director", END)
         
-        # Compile graph
-        self.graph = graph_builder.compile(checkpointer=self.memory)
+        # Compile graph without a checkpointer: every request runs on a fresh thread and
+        # only the final state is used, so per-node checkpoint writes would be pure overhead
+        self.graph = graph_builder.compile()
     
-    async def process_mission_request(self, request: str, mission_phase: str = "orbital_operations"):
-        """Process a mission control request"""
-        config = {"configurable": {"thread_id": self.session_id}}
-        
-        initial_state = {
+    def initial_state(self, request: str, mission_phase: str) -> Dict[str, Any]:
+        """Build the starting graph state for a mission control request"""
+        return {
             "messages": [HumanMessage(content=request)],
             "mission_phase": mission_phase,
             "priority_level": "routine",
@@ -363,53 +434,138 @@ class NASAMissionControl:
             "crew_status": "nominal",
             "mission_objectives": [],
             "emergency_procedures": False,
+            "requires_director": False,
             "flight_director_approval": False
         }
+    
+    def request_config(self, request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Build a run config scoped to a single request
         
-        result = await self.graph.ainvoke(initial_state, config=config)
+        Each request runs on its own thread so concurrent users of the shared instance
+        never share graph state.
+        """
+        return {"configurable": {"thread_id": request_id or str(uuid.uuid4())}}
+    
+    async def process_mission_request(self, request: str, mission_phase: str = "orbital_operations",
+                                      request_id: Optional[str] = None):
+        """Process a mission control request"""
+        config = self.request_config(request_id)
         
-        # Format response
-        responses = []
-        for msg in result["messages"]:
-            if hasattr(msg, 'content'):
-                responses.append(msg.content)
+        result = await self.graph.ainvoke(self.initial_state(request, mission_phase), config=config)
         
+        return self.summarize_result(result)
+    
+    async def stream_mission_request(self, request: str, mission_phase: str = "orbital_operations",
+                                     request_id: Optional[str] = None):
+        """Process a mission control request, yielding progress as each role reports
+        
+        Yields ("update", (node, text)) pairs as each node finishes, ("token", text) pairs
+        while the Flight Director is generating, and a single ("result", summary) pair
+        once the workflow has finished.
+        """
+        config = self.request_config(request_id)
+        
+        final_state = None
+        async for mode, payload in self.graph.astream(
+            self.initial_state(request, mission_phase),
+            config=config,
+            stream_mode=["updates", "messages", "values"]
+        ):
+            if mode == "values":
+                final_state = payload
+                continue
+            if mode == "updates":
+                for node, update in payload.items():
+                    for msg in (update or {}).get("messages", []):
+                        yield "update", (node, msg.content)
+                continue
+            chunk, metadata = payload
+            if metadata.get("langgraph_node") == "flight_director" and chunk.content:
+                yield "token", chunk.content
+        
+        yield "result", self.summarize_result(final_state)
+    
+    def summarize_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce final graph state to the response fields shown to operators"""
         return {
-            "analysis": responses,
+            "analysis": [msg.content for msg in result["messages"]],
             "priority_level": result.get("priority_level", "routine"),
             "emergency_status": result.get("emergency_procedures", False),
             "systems_status": result.get("systems_status", {}),
             "approved": result.get("flight_director_approval", False)
         }
 
+# Shared mission control instance, set up once and reused across requests
+_mission_control: Optional[NASAMissionControl] = None
+
+async def get_mission_control() -> NASAMissionControl:
+    """Return the shared mission control instance, running setup on first use"""
+    # setup() never suspends (building the clients and graph awaits nothing), so concurrent
+    # first requests can't interleave between the check and the assignment
+    global _mission_control
+    if _mission_control is None:
+        mission_control = NASAMissionControl()
+        await mission_control.setup()
+        _mission_control = mission_control
+    return _mission_control
+
 # Gradio Interface Functions
-async def process_mission_control_request(request: str, mission_phase: str):
-    """Process mission control request and return formatted response"""
-    
-    # Initialize mission control
-    mission_control = NASAMissionControl()
-    await mission_control.setup()
-    
-    # Process the request
-    result = await mission_control.process_mission_request(request, mission_phase)
-    
-    # Format output
-    output = f"# 🚀 NASA Mission Control Response\n\n"
-    output += f"**Mission Phase:** {mission_phase.replace('_', ' ').title()}\n"
-    output += f"**Priority Level:** {result['priority_level'].upper()}\n"
-    output += f"**Emergency Status:** {'🚨 ACTIVE' if result['emergency_status'] else '✅ Normal'}\n"
-    output += f"**Flight Director Approval:** {'✅ Authorized' if result['approved'] else '⏳ Pending'}\n\n"
+def format_mission_control_response(result: Dict[str, Any], mission_phase: str) -> str:
+    """Format a mission control result as Markdown"""
+    parts = [
+        "# 🚀 NASA Mission Control Response\n\n"
+        f"**Mission Phase:** {mission_phase.replace('_', ' ').title()}\n"
+        f"**Priority Level:** {result['priority_level'].upper()}\n"
+        f"**Emergency Status:** {'🚨 ACTIVE' if result['emergency_status'] else '✅ Normal'}\n"
+        f"**Flight Director Approval:** {'✅ Authorized' if result['approved'] else '⏳ Pending'}\n\n"
+        "## Mission Control Team Analysis\n\n"
+    ]
     
-    output += "## Mission Control Team Analysis\n\n"
     for i, analysis in enumerate(result['analysis'], 1):
-        output += f"### Step {i}\n{analysis}\n\n"
+        parts.append(f"### Step {i}\n{analysis}\n\n")
     
     if result['systems_status']:
-        output += "## Systems Status\n\n"
+        parts.append("## Systems Status\n\n")
         for system, status in result['systems_status'].items():
-            output += f"- **{system.replace('_', ' ').title()}:** {status}\n"
+            parts.append(f"- **{system.replace('_', ' ').title()}:** {status}\n")
+    
+    return "".join(parts)
+
+def format_mission_control_progress(reports: List[str], decision: str) -> str:
+    """Format the in-progress view shown while the mission control team is working"""
+    parts = ["# 🚀 NASA Mission Control Response\n\n## Mission Control Team Analysis (in progress)\n\n"]
+    for i, report in enumerate(reports, 1):
+        parts.append(f"### Step {i}\n{report}\n\n")
+    
+    if decision:
+        parts.append(f"### 👨‍💼 Flight Director Decision (live)\n{decision}\n")
+    else:
+        parts.append("⏳ Awaiting remaining analysis...\n")
+    
+    return "".join(parts)
+
+async def process_mission_control_request(request: str, mission_phase: str):
+    """Process mission control request, streaming each role's report as it completes"""
+    
+    mission_control = await get_mission_control()
     
-    return output
+    yield "# 🚀 NASA Mission Control Response\n\n⏳ Mission control team analyzing request..."
+    
+    # Process the request
+    reports = [request]
+    decision = ""
+    async for kind, payload in mission_control.stream_mission_request(request, mission_phase):
+        if kind == "update":
+            node, text = payload
+            # The Flight Director's report is already on screen via its live tokens
+            if node != "flight_director":
+                reports.append(text)
+                yield format_mission_control_progress(reports, decision)
+        elif kind == "token":
+            decision += payload
+            yield format_mission_control_progress(reports, decision)
+        else:
+            yield format_mission_control_response(payload, mission_phase)
 
 # Create Gradio Interface
 with gr.Blocks(
@@ -469,6 +625,7 @@ with gr.Blocks(
                 <ul style="color: #cccccc;">
                     <li>🎯 Mission Specialist</li>
                     <li>🔧 Systems Engineer</li>
+                    <li>📡 Telemetry Analyst</li>
                     <li>👨‍💼 Flight Director</li>
                 </ul>
                 <h4 style="color: #ffffff; margin-top: 20px;">Priority Levels</h4>
@@ -491,13 +648,15 @@ with gr.Blocks(
     process_button.click(
         fn=process_mission_control_request,
         inputs=[request_input, mission_phase],
-        outputs=response_output
+        outputs=response_output,
+        show_progress="minimal"
     )
     
     request_input.submit(
         fn=process_mission_control_request,
         inputs=[request_input, mission_phase],
-        outputs=response_output
+        outputs=response_output,
+        show_progress="minimal"
     )
 
 if __name__ == "__main__":
@@ -7,17 +7,62 @@ import gradio as gr
 import openai
 import asyncio
 import json
-import random
 import base64
 import os
 import time
+import math
+import hashlib
+import httpx
+import numpy as np
+from functools import lru_cache
+from itertools import chain, islice
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Any, Optional
-from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Shared random generator for simulated mission data
+RNG = np.random.default_rng()
+
+# Maximum number of analyses kept for repeat runs against the same body and region
+ANALYSIS_CACHE_SIZE = 256
+
+# LLM narrative mode: "1" calls OpenAI, "0" skips narratives, "mock" returns canned text
+NASA_LLM = os.getenv("NASA_LLM", "1")
+
+# Upper bound on in-flight OpenAI requests across all concurrent missions
+OPENAI_MAX_CONCURRENT = int(os.getenv("OPENAI_MAX_CONCURRENT", "8"))
+
+# Missions run at once when comparing several planetary bodies
+MULTI_BODY_CONCURRENCY = 4
+
+# Phase narratives produced by the mission briefing, in display order
+BRIEFING_SECTIONS = ("terrain_analysis", "prioritization_analysis", "path_analysis", "science_analysis")
+
+# Completion budget per phase narrative; the streamed briefing gets their sum
+PHASE_MAX_TOKENS = {
+    "terrain_analysis": 800,
+    "prioritization_analysis": 600,
+    "path_analysis": 500,
+    "science_analysis": 600
+}
+
+# Simulated feature catalog choices (repeated entries weight the draw)
+FEATURE_TYPES: Dict[str, Tuple[str, ...]] = {
+    "mars": ("crater", "rock_formation", "mineral_vein", "ancient_riverbed", "dust_devil_track"),
+    "moon": ("impact_crater", "boulder", "regolith_sample", "ice_deposit", "lava_tube"),
+    "europa": ("ice_ridge", "chaos_terrain", "thermal_anomaly", "subsurface_feature", "impact_crater")
+}
+COMPOSITIONS = (
+    "basaltic_rock", "sedimentary_layers", "iron_oxide", 
+    "water_ice", "sulfate_minerals", "carbonates"
+)
+ACCESSIBILITY_LEVELS = ("easy", "easy", "moderate", "difficult")
+HAZARD_LEVELS = ("low", "low", "medium", "high")
+SAMPLING_INSTRUMENTS = ("drill", "arm", "laser", "microscope")
+
 class TerrainFeature(BaseModel):
     """Geological or surface feature"""
     feature_id: str = Field(description="Unique identifier")
@@ -49,184 +94,430 @@ class PathPlan(BaseModel):
     energy_required: float = Field(description="Energy required in Wh")
     hazards_avoided: List[str] = Field(description="Hazards avoided")
     alternative_paths: int = Field(description="Number of alternative paths")
+    segment_distances: Optional[List[float]] = Field(default=None, description="Distance of each leg in meters")
+
+# Planetary reference data shared by mission planning and prompts
+PLANETARY_BODIES = {
+    "mars": {
+        "gravity": 3.71,
+        "day_length": 24.6,
+        "atmosphere": "thin_co2",
+        "temperature_range": (-195, 20),
+        "key_features": ["polar_ice", "canyons", "volcanoes", "impact_craters"],
+        "missions": ["Perseverance", "Curiosity", "Ingenuity"]
+    },
+    "moon": {
+        "gravity": 1.62,
+        "day_length": 708,
+        "atmosphere": "none",
+        "temperature_range": (-230, 120),
+        "key_features": ["craters", "maria", "highlands", "ice_deposits"],
+        "missions": ["Apollo", "Artemis", "Chang'e"]
+    },
+    "europa": {
+        "gravity": 1.31,
+        "day_length": 85.2,
+        "atmosphere": "thin_oxygen",
+        "temperature_range": (-223, -148),
+        "key_features": ["ice_shell", "subsurface_ocean", "chaos_terrain"],
+        "missions": ["Europa_Clipper", "JUICE"]
+    }
+}
+
+# Report environment block for each body, formatted once since the reference data never changes
+PLANETARY_ENVIRONMENT = {
+    body: (
+        "### Planetary Environment\n"
+        f"- **Gravity:** {info['gravity']} m/s²\n"
+        f"- **Day Length:** {info['day_length']} hours\n"
+        f"- **Atmosphere:** {info['atmosphere'].replace('_', ' ').title()}\n"
+        f"- **Temperature:** {info['temperature_range'][0]}°C to {info['temperature_range'][1]}°C\n\n"
+    )
+    for body, info in PLANETARY_BODIES.items()
+}
+
+# Static system prompt sent ahead of every request. It never contains per-mission values,
+# so its tokens form an identical prefix that OpenAI's automatic prompt caching can reuse.
+EXPLORATION_SYSTEM_PROMPT = """You are NASA's planetary exploration AI, combining the roles of planetary geology
+specialist, mission planning specialist, rover operations specialist and autonomous
+science planner. Every request gives mission data followed by the planetary body and
+region being explored.
+
+PLANETARY REFERENCE DATA:
+""" + json.dumps(PLANETARY_BODIES, indent=2) + """
+
+ANALYSIS GUIDELINES:
+
+terrain_analysis - As NASA's planetary geology AI specialist, analyze terrain imagery of the region.
+Identify and catalog terrain features including:
+1. Geological formations and their significance
+2. Potential mineral compositions
+3. Evidence of past/present water activity
+4. Impact craters and their ages
+5. Volcanic or tectonic features
+6. Hazards for rover operations
+7. Scientifically interesting targets
+For each feature, assess:
+- Scientific importance (1-10 scale)
+- Accessibility for rover investigation
+- Potential risks and hazards
+- Required instruments for analysis
+Use established planetary geology terminology and NASA exploration protocols.
+
+prioritization_analysis - As NASA's mission planning specialist, prioritize the terrain features for exploration.
+Create prioritized exploration targets considering:
+1. Scientific value and mission relevance
+2. Accessibility and operational feasibility
+3. Risk vs. reward analysis
+4. Instrument requirements and capabilities
+5. Time and energy constraints
+6. Backup target options
+For each target, specify:
+- Priority level and justification
+- Required investigation duration
+- Necessary instruments and procedures
+- Associated risks and mitigation strategies
+Use NASA planetary exploration best practices.
+
+path_analysis - As NASA's rover operations specialist, plan an optimal path for surface exploration.
+Plan the most efficient path considering:
+1. Travel distance and energy consumption
+2. Target priority and scientific value
+3. Terrain hazards and accessibility
+4. Backup routes and contingency options
+5. Communication windows and power constraints
+6. Weather patterns and seasonal considerations
+Provide:
+- Optimal waypoint sequence
+- Distance and time estimates
+- Energy requirements and charging stops
+- Hazard avoidance strategies
+- Alternative path options
+Use NASA rover operations protocols and planetary navigation techniques.
+
+science_analysis - As NASA's autonomous science planning AI, select optimal science activities.
+Autonomously select and schedule science activities considering:
+1. Time constraints and energy budgets
+2. Scientific priority and mission objectives
+3. Instrument availability and health
+4. Environmental conditions (dust, temperature, lighting)
+5. Data storage and transmission opportunities
+6. Backup activities for contingencies
+Provide:
+- Selected targets and scheduling
+- Instrument usage optimization
+- Data collection priorities
+- Contingency science plans
+- Risk assessment and mitigation
+Use NASA's autonomous science protocols and adaptive mission planning.
+"""
+
+@lru_cache(maxsize=256)
+def select_within_budget(weights: Tuple[int, ...], values: Tuple[int, ...], capacity: int) -> Tuple[int, ...]:
+    """Solve the 0/1 knapsack for integer weights, returning the indices of the chosen items"""
+    best = [0] * (capacity + 1)
+    taken = [[False] * (capacity + 1) for _ in weights]
+    
+    for i, (weight, value) in enumerate(zip(weights, values)):
+        for c in range(capacity, weight - 1, -1):
+            if best[c - weight] + value > best[c]:
+                best[c] = best[c - weight] + value
+                taken[i][c] = True
+    
+    # Walk back through the table to recover the chosen items
+    chosen = []
+    c = capacity
+    for i in range(len(weights) - 1, -1, -1):
+        if taken[i][c]:
+            chosen.append(i)
+            c -= weights[i]
+    
+    return tuple(reversed(chosen))
+
+def order_route(points: List[Tuple[float, float]]) -> List[int]:
+    """Order points into a short open route from the first point (nearest neighbor + 2-opt)"""
+    coords = np.asarray(points, dtype=float)
+    lats, lons = coords[:, 0], coords[:, 1]
+    dist = np.hypot(lats[:, None] - lats, lons[:, None] - lons)
+    
+    # Greedy start: always drive to the closest unvisited point
+    route = [0]
+    unvisited = np.ones(len(points), dtype=bool)
+    unvisited[0] = False
+    while unvisited.any():
+        candidates = np.where(unvisited, dist[route[-1]], np.inf)
+        route.append(int(np.argmin(candidates)))
+        unvisited[route[-1]] = False
+    
+    # 2-opt: reverse any segment that shortens the route until a full pass finds nothing
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route) - 1):
+            for j in range(i + 1, len(route)):
+                a, b = route[i - 1], route[i]
+                c = route[j]
+                d = route[j + 1] if j + 1 < len(route) else None
+                before = dist[a, b] + (dist[c, d] if d is not None else 0.0)
+                after = dist[a, c] + (dist[b, d] if d is not None else 0.0)
+                if after < before - 1e-12:
+                    route[i:j + 1] = reversed(route[i:j + 1])
+                    improved = True
+    
+    return route
+
+# Per-request user message templates; only these carry mission-specific values
+BRIEFING_INSTRUCTIONS = (
+    "Write each of the following analyses in this order, in Markdown. Begin each one with "
+    "a line containing only its marker, for example: === terrain_analysis ===\n"
+)
+BRIEFING_SECTION_TEMPLATE = "\n=== {key} ===\n{payload}\n"
+MISSION_CONTEXT_TEMPLATE = "PLANETARY BODY: {planetary_body}\nREGION: {region}"
+TERRAIN_REQUEST = "Analyze terrain imagery for the planetary body and region given below."
+PRIORITIZATION_TEMPLATE = "MISSION OBJECTIVES:\n{objectives}\n\nTERRAIN FEATURES:\n{features}"
+PATH_TEMPLATE = "CURRENT ROVER POSITION: {rover_position}\n\nEXPLORATION TARGETS:\n{targets}"
+SCIENCE_TEMPLATE = "AVAILABLE TIME: {available_time} sols\n\nPOTENTIAL TARGETS:\n{targets}"
 
 class NASAPlanetaryExplorer:
     """Advanced planetary exploration and mapping system"""
     
     def __init__(self):
-        # Configure OpenAI client
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-        
-        client_kwargs = {"api_key": api_key, "timeout": 60.0, "max_retries": 3}
-        org_id = os.getenv("OPENAI_ORG_ID")
-        if org_id:
-            client_kwargs["organization"] = org_id
+        # Demo and test runs can drive the whole report from the simulated data alone
+        self.llm_enabled = NASA_LLM == "1"
+        self.client = None
+        
+        if self.llm_enabled:
+            # Configure OpenAI client
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY environment variable is required")
             
-        self.client = openai.AsyncOpenAI(**client_kwargs)
-        self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
-        self.planetary_bodies = {
-            "mars": {
-                "gravity": 3.71,
-                "day_length": 24.6,
-                "atmosphere": "thin_co2",
-                "temperature_range": (-195, 20),
-                "key_features": ["polar_ice", "canyons", "volcanoes", "impact_craters"],
-                "missions": ["Perseverance", "Curiosity", "Ingenuity"]
-            },
-            "moon": {
-                "gravity": 1.62,
-                "day_length": 708,
-                "atmosphere": "none",
-                "temperature_range": (-230, 120),
-                "key_features": ["craters", "maria", "highlands", "ice_deposits"],
-                "missions": ["Apollo", "Artemis", "Chang'e"]
-            },
-            "europa": {
-                "gravity": 1.31,
-                "day_length": 85.2,
-                "atmosphere": "thin_oxygen",
-                "temperature_range": (-223, -148),
-                "key_features": ["ice_shell", "subsurface_ocean", "chaos_terrain"],
-                "missions": ["Europa_Clipper", "JUICE"]
-            }
-        }
-        
-    async def analyze_terrain_image(self, planetary_body: str, region_description: str) -> List[TerrainFeature]:
-        """Simulate advanced terrain analysis from orbital/surface imagery"""
-        
-        body_info = self.planetary_bodies.get(planetary_body, self.planetary_bodies["mars"])
-        
-        prompt = f"""
-        As NASA's planetary geology AI specialist, analyze terrain imagery for {planetary_body}:
-        
-        REGION: {region_description}
-        PLANETARY CONTEXT:
-        - Gravity: {body_info['gravity']} m/s²
-        - Key Features: {', '.join(body_info['key_features'])}
-        - Active Missions: {', '.join(body_info['missions'])}
-        
-        Identify and catalog terrain features including:
-        1. Geological formations and their significance
-        2. Potential mineral compositions
-        3. Evidence of past/present water activity
-        4. Impact craters and their ages
-        5. Volcanic or tectonic features
-        6. Hazards for rover operations
-        7. Scientifically interesting targets
+            # Pooled HTTP/2 connections let concurrent requests share the transport instead of queueing
+            http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=60.0,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+            client_kwargs = {"api_key": api_key, "timeout": 60.0, "max_retries": 3, "http_client": http_client}
+            org_id = os.getenv("OPENAI_ORG_ID")
+            if org_id:
+                client_kwargs["organization"] = org_id
+                
+            self.client = openai.AsyncOpenAI(**client_kwargs)
+        
+        self._llm_slots: Optional[asyncio.Semaphore] = None  # Created on first use, inside the running loop
+        self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.planetary_bodies = PLANETARY_BODIES
+        self._analysis_cache: "OrderedDict[Tuple[str, ...], Any]" = OrderedDict()
+    
+    def cache_key(self, kind: str, planetary_body: str, region_description: str, *extra: str) -> Tuple[str, ...]:
+        """Build an analysis cache key from the body and a hash of the normalized region"""
+        region = " ".join(region_description.lower().split())
+        return (kind, planetary_body, hashlib.sha256(region.encode()).hexdigest(), *extra)
+    
+    def cache_get(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """Return a cached analysis, marking it most recently used"""
+        if key not in self._analysis_cache:
+            return None
+        self._analysis_cache.move_to_end(key)
+        return self._analysis_cache[key]
+    
+    def cache_put(self, key: Tuple[str, ...], value: Any):
+        """Store an analysis, evicting the least recently used entry when full"""
+        self._analysis_cache[key] = value
+        self._analysis_cache.move_to_end(key)
+        if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+    
+    def offline_narrative(self, phase: str) -> str:
+        """Placeholder narrative used when LLM calls are disabled"""
+        if NASA_LLM == "mock":
+            return f"Mock {phase.replace('_', ' ')}: simulated mission data reviewed, no anomalies found."
+        return "_(LLM narrative skipped — demo mode)_"
         
-        For each feature, assess:
-        - Scientific importance (1-10 scale)
-        - Accessibility for rover investigation
-        - Potential risks and hazards
-        - Required instruments for analysis
+    async def stream_mission_briefing(self, payloads: Dict[str, str], context: str):
+        """Stream every phase narrative from one call, yielding (phase, text) pieces in order
         
-        Use established planetary geology terminology and NASA exploration protocols.
+        The model opens each analysis with a "=== phase ===" marker line, so pieces can be
+        routed to their section as soon as they arrive.
         """
-        
-        try:
-            response = await self.client.chat.completions.create(
+        if not self.llm_enabled:
+            for key in payloads:
+                yield key, self.offline_narrative(key)
+            return
+        
+        user_message = "".join([
+            BRIEFING_INSTRUCTIONS,
+            *(BRIEFING_SECTION_TEMPLATE.format(key=key, payload=payload) for key, payload in payloads.items()),
+            "\n",
+            context
+        ])
+        
+        if self._llm_slots is None:
+            self._llm_slots = asyncio.Semaphore(OPENAI_MAX_CONCURRENT)
+        async with self._llm_slots:
+            stream = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1200,
-                temperature=0.1
+                messages=[
+                    {"role": "system", "content": EXPLORATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_message}
+                ],
+                max_tokens=sum(PHASE_MAX_TOKENS[key] for key in payloads),
+                temperature=0.1,
+                stream=True
             )
-            analysis_content = response.choices[0].message.content
-        except Exception as e:
-            analysis_content = f"Error in terrain analysis: {str(e)}"
-        
-        # Generate realistic terrain features based on analysis
-        features = []
-        feature_types = {
-            "mars": ["crater", "rock_formation", "mineral_vein", "ancient_riverbed", "dust_devil_track"],
-            "moon": ["impact_crater", "boulder", "regolith_sample", "ice_deposit", "lava_tube"],
-            "europa": ["ice_ridge", "chaos_terrain", "thermal_anomaly", "subsurface_feature", "impact_crater"]
-        }
-        
-        types_list = feature_types.get(planetary_body, feature_types["mars"])
-        
-        for i in range(random.randint(5, 8)):
-            features.append(TerrainFeature(
-                feature_id=f"{planetary_body.upper()}-F{i+1:03d}",
-                feature_type=random.choice(types_list),
-                location=(
-                    random.uniform(-45, 45),  # latitude
-                    random.uniform(-180, 180)  # longitude
-                ),
-                size=random.uniform(0.5, 50.0),
-                composition=random.choice([
-                    "basaltic_rock", "sedimentary_layers", "iron_oxide", 
-                    "water_ice", "sulfate_minerals", "carbonates"
-                ]),
-                scientific_interest=random.uniform(3.0, 9.5),
-                accessibility=random.choice(["easy", "easy", "moderate", "difficult"]),
-                hazard_level=random.choice(["low", "low", "medium", "high"])
-            ))
+            
+            section = next(iter(payloads))
+            buffer = ""
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                buffer += chunk.choices[0].delta.content or ""
+            
+                # Complete lines are checked for section markers before being forwarded
+                while "\n" in buffer:
+                    line, buffer = buffer.split("\n", 1)
+                    marker = line.strip().strip("=").strip()
+                    if line.lstrip().startswith("===") and marker in payloads:
+                        section = marker
+                    else:
+                        yield section, line + "\n"
+            
+                # A partial line can only turn into a marker if it starts with "="
+                if buffer and not buffer.lstrip().startswith("="):
+                    yield section, buffer
+                    buffer = ""
         
-        return features, analysis_content
+        if buffer:
+            yield section, buffer
     
-    async def prioritize_targets(self, features: List[TerrainFeature], mission_objectives: List[str]) -> List[ExplorationTarget]:
-        """Prioritize exploration targets based on scientific value and mission objectives"""
-        
-        prompt = f"""
-        As NASA's mission planning specialist, prioritize these terrain features for exploration:
-        
-        MISSION OBJECTIVES:
-        {chr(10).join(f"- {obj}" for obj in mission_objectives)}
-        
-        TERRAIN FEATURES:
-        {chr(10).join(f"- {f.feature_type} at {f.location} - Interest: {f.scientific_interest}/10, Access: {f.accessibility}" for f in features)}
-        
-        Create prioritized exploration targets considering:
-        1. Scientific value and mission relevance
-        2. Accessibility and operational feasibility
-        3. Risk vs. reward analysis
-        4. Instrument requirements and capabilities
-        5. Time and energy constraints
-        6. Backup target options
-        
-        For each target, specify:
-        - Priority level and justification
-        - Required investigation duration
-        - Necessary instruments and procedures
-        - Associated risks and mitigation strategies
+    async def pump_mission_briefing(self, payloads: Dict[str, str], context: str,
+                                    sections: Dict[str, asyncio.Queue]) -> Optional[Dict[str, str]]:
+        """Route a streamed briefing into per-section queues, returning the full text on success
         
-        Use NASA planetary exploration best practices.
+        Each queue receives text pieces followed by None once its section is complete.
         """
-        
+        briefing = {key: "" for key in sections}
+        pending = list(sections)
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000,
-                temperature=0.1
-            )
-            analysis_content = response.choices[0].message.content
+            async for section, piece in self.stream_mission_briefing(payloads, context):
+                if section not in pending:
+                    continue
+                # Sections arrive in order, so starting one completes every earlier section
+                while pending[0] != section:
+                    sections[pending.pop(0)].put_nowait(None)
+                briefing[section] += piece
+                sections[section].put_nowait(piece)
+            return briefing
         except Exception as e:
-            analysis_content = f"Error in target prioritization: {str(e)}"
+            if pending:
+                sections[pending[0]].put_nowait(f"Error in mission briefing: {str(e)}")
+            return None
+        finally:
+            for key in pending:
+                sections[key].put_nowait(None)
+    
+    @staticmethod
+    async def drain_section(queue: asyncio.Queue):
+        """Yield a briefing section's text pieces until the section is complete"""
+        while (piece := await queue.get()) is not None:
+            yield piece
+    
+    def mission_context(self, planetary_body: str, region_description: str) -> str:
+        """Build the volatile mission context that closes every user message"""
+        return MISSION_CONTEXT_TEMPLATE.format(planetary_body=planetary_body, region=region_description)
+    
+    def terrain_prompt(self) -> str:
+        """Build the terrain analysis request"""
+        return TERRAIN_REQUEST
+    
+    def prioritization_prompt(self, features: List[TerrainFeature], mission_objectives: List[str]) -> str:
+        """Build the target prioritization request"""
+        return PRIORITIZATION_TEMPLATE.format(
+            objectives="\n".join(f"- {obj}" for obj in mission_objectives),
+            features="\n".join(
+                f"- {f.feature_type} at {f.location} - Interest: {f.scientific_interest}/10, Access: {f.accessibility}"
+                for f in features
+            )
+        )
+    
+    def path_prompt(self, targets: List[ExplorationTarget], rover_position: Tuple[float, float]) -> str:
+        """Build the rover path planning request"""
+        return PATH_TEMPLATE.format(
+            rover_position=rover_position,
+            targets="\n".join(
+                f"- {t.target_id}: {t.target_type} at {t.coordinates} (Priority: {t.priority})" for t in targets
+            )
+        )
+    
+    def science_prompt(self, available_time: float, targets: List[ExplorationTarget]) -> str:
+        """Build the autonomous science selection request"""
+        return SCIENCE_TEMPLATE.format(
+            available_time=available_time,
+            targets="\n".join(
+                f"- {t.target_id}: {t.target_type} ({t.priority} priority, {t.estimated_duration} sols)" for t in targets
+            )
+        )
+    
+    def generate_terrain_features(self, planetary_body: str) -> List[TerrainFeature]:
+        """Generate realistic terrain features for a planetary body"""
+        features = []
+        types_list = FEATURE_TYPES.get(planetary_body, FEATURE_TYPES["mars"])
+        
+        # Draw every feature attribute in one batch per column
+        count = int(RNG.integers(5, 9))
+        latitudes = RNG.uniform(-45, 45, count).tolist()
+        longitudes = RNG.uniform(-180, 180, count).tolist()
+        sizes = RNG.uniform(0.5, 50.0, count).tolist()
+        interests = RNG.uniform(3.0, 9.5, count).tolist()
+        type_idx = RNG.integers(0, len(types_list), count).tolist()
+        composition_idx = RNG.integers(0, len(COMPOSITIONS), count).tolist()
+        access_idx = RNG.integers(0, len(ACCESSIBILITY_LEVELS), count).tolist()
+        hazard_idx = RNG.integers(0, len(HAZARD_LEVELS), count).tolist()
+        
+        # Values are generated here with the right types, so skip pydantic validation
+        for i in range(count):
+            features.append(TerrainFeature.model_construct(
+                feature_id=f"{planetary_body.upper()}-F{i+1:03d}",
+                feature_type=types_list[type_idx[i]],
+                location=(latitudes[i], longitudes[i]),
+                size=sizes[i],
+                composition=COMPOSITIONS[composition_idx[i]],
+                scientific_interest=interests[i],
+                accessibility=ACCESSIBILITY_LEVELS[access_idx[i]],
+                hazard_level=HAZARD_LEVELS[hazard_idx[i]]
+            ))
         
-        # Generate exploration targets based on features
+        return features
+    
+    def generate_exploration_targets(self, features: List[TerrainFeature]) -> List[ExplorationTarget]:
+        """Generate exploration targets from the most promising terrain features"""
         targets = []
         high_interest_features = [f for f in features if f.scientific_interest > 7.0]
         accessible_features = [f for f in features if f.accessibility in ["easy", "moderate"]]
         
-        # Combine high interest and accessible features
-        priority_features = list(set(high_interest_features + accessible_features))[:6]
+        # Combine high interest and accessible features, de-duplicated in order of appearance
+        priority_features = list(islice(
+            {f.feature_id: f for f in chain(high_interest_features, accessible_features)}.values(), 6
+        ))
+        
+        # Draw durations and sampling instruments for every target in one batch
+        durations = RNG.uniform(0.5, 3.0, len(priority_features)).tolist()
+        instrument_idx = RNG.integers(0, len(SAMPLING_INSTRUMENTS), len(priority_features)).tolist()
         
         for i, feature in enumerate(priority_features):
             priority = "high" if feature.scientific_interest > 8.0 and feature.accessibility == "easy" else \
                      "medium" if feature.scientific_interest > 6.0 else "low"
             
-            targets.append(ExplorationTarget(
+            targets.append(ExplorationTarget.model_construct(
                 target_id=f"TGT-{i+1:02d}",
                 priority=priority,
                 target_type=f"{feature.feature_type}_investigation",
                 coordinates=feature.location,
-                estimated_duration=random.uniform(0.5, 3.0),
+                estimated_duration=durations[i],
                 required_instruments=[
                     "cameras", "spectrometer", 
-                    random.choice(["drill", "arm", "laser", "microscope"])
+                    SAMPLING_INSTRUMENTS[instrument_idx[i]]
                 ],
                 scientific_objectives=[
                     f"Analyze {feature.composition}",
@@ -236,136 +527,55 @@ class NASAPlanetaryExplorer:
                 risk_factors=["terrain_difficulty"] if feature.accessibility == "difficult" else []
             ))
         
-        return targets, analysis_content
+        return targets
     
-    async def plan_rover_path(self, targets: List[ExplorationTarget], rover_position: Tuple[float, float]) -> PathPlan:
-        """Plan optimal rover path between exploration targets"""
-        
-        prompt = f"""
-        As NASA's rover operations specialist, plan an optimal path for surface exploration:
-        
-        CURRENT ROVER POSITION: {rover_position}
-        
-        EXPLORATION TARGETS:
-        {chr(10).join(f"- {t.target_id}: {t.target_type} at {t.coordinates} (Priority: {t.priority})" for t in targets)}
-        
-        Plan the most efficient path considering:
-        1. Travel distance and energy consumption
-        2. Target priority and scientific value
-        3. Terrain hazards and accessibility
-        4. Backup routes and contingency options
-        5. Communication windows and power constraints
-        6. Weather patterns and seasonal considerations
-        
-        Provide:
-        - Optimal waypoint sequence
-        - Distance and time estimates
-        - Energy requirements and charging stops
-        - Hazard avoidance strategies
-        - Alternative path options
-        
-        Use NASA rover operations protocols and planetary navigation techniques.
-        """
-        
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=800,
-                temperature=0.1
-            )
-            analysis_content = response.choices[0].message.content
-        except Exception as e:
-            analysis_content = f"Error in path planning: {str(e)}"
-        
-        # Generate realistic path planning
+    def compute_path_plan(self, targets: List[ExplorationTarget], rover_position: Tuple[float, float]) -> PathPlan:
+        """Compute a rover path through the high priority targets"""
         high_priority_targets = [t for t in targets if t.priority == "high"][:4]
         
-        # Create waypoints (simplified path planning)
-        waypoints = [rover_position]
-        for target in high_priority_targets:
-            waypoints.append(target.coordinates)
+        # Visit the targets in the shortest order found from the rover's position
+        stops = [rover_position] + [target.coordinates for target in high_priority_targets]
+        waypoints = [stops[i] for i in order_route(stops)]
         
-        # Calculate approximate distances
-        total_distance = 0
-        for i in range(len(waypoints)-1):
-            # Simplified distance calculation
-            lat_diff = waypoints[i+1][0] - waypoints[i][0]
-            lon_diff = waypoints[i+1][1] - waypoints[i][1]
-            distance = ((lat_diff**2 + lon_diff**2)**0.5) * 111000  # rough meters
-            total_distance += distance
+        # Calculate approximate leg distances (simplified flat-plane legs, ~111 km per degree)
+        deltas = np.diff(np.asarray(waypoints, dtype=float), axis=0)
+        segments = np.hypot(deltas[:, 0], deltas[:, 1]) * 111000  # rough meters
+        total_distance = float(segments.sum())
         
-        path_plan = PathPlan(
-            path_id=f"PATH-{datetime.now().strftime('%Y%m%d')}",
+        path_plan = PathPlan.model_construct(
+            path_id=f"PATH-{time.strftime('%Y%m%d')}",
             waypoints=waypoints,
             total_distance=total_distance,
             estimated_time=total_distance / 100,  # Rough estimate: 100m per sol
             energy_required=total_distance * 0.1,  # Rough estimate: 0.1 Wh per meter
             hazards_avoided=["steep_slopes", "loose_rocks", "sand_traps"],
-            alternative_paths=2
+            alternative_paths=2,
+            segment_distances=segments.tolist()
         )
         
-        return path_plan, analysis_content
+        return path_plan
     
-    async def autonomous_science_selection(self, available_time: float, targets: List[ExplorationTarget]) -> Dict[str, Any]:
-        """Autonomous selection of science activities based on available time and conditions"""
-        
-        prompt = f"""
-        As NASA's autonomous science planning AI, select optimal science activities:
-        
-        AVAILABLE TIME: {available_time} sols
-        
-        POTENTIAL TARGETS:
-        {chr(10).join(f"- {t.target_id}: {t.target_type} ({t.priority} priority, {t.estimated_duration} sols)" for t in targets)}
-        
-        Autonomously select and schedule science activities considering:
-        1. Time constraints and energy budgets
-        2. Scientific priority and mission objectives
-        3. Instrument availability and health
-        4. Environmental conditions (dust, temperature, lighting)
-        5. Data storage and transmission opportunities
-        6. Backup activities for contingencies
-        
-        Provide:
-        - Selected targets and scheduling
-        - Instrument usage optimization
-        - Data collection priorities
-        - Contingency science plans
-        - Risk assessment and mitigation
-        
-        Use NASA's autonomous science protocols and adaptive mission planning.
-        """
-        
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000,
-                temperature=0.1
-            )
-            analysis_content = response.choices[0].message.content
-        except Exception as e:
-            analysis_content = f"Error in autonomous science selection: {str(e)}"
-        
-        # Select targets that fit within time constraints
-        selected_targets = []
-        remaining_time = available_time
-        
-        # Sort by priority and duration
-        sorted_targets = sorted(targets, key=lambda x: (x.priority == "high", -x.estimated_duration))
-        
-        for target in sorted_targets:
-            if target.estimated_duration <= remaining_time:
-                selected_targets.append(target)
-                remaining_time -= target.estimated_duration
-                if remaining_time <= 0:
-                    break
+    def select_science_targets(self, available_time: float, targets: List[ExplorationTarget]) -> Dict[str, Any]:
+        """Select science targets that fit within the available time"""
+        # Choose the highest-value set of targets that fits the time budget (0.1 sol resolution).
+        # Durations round up so the chosen set never exceeds the real available time.
+        priority_rank = {"high": 0, "medium": 1, "low": 2}
+        priority_value = {"high": 10, "medium": 5, "low": 1}
+        weights = tuple(math.ceil(t.estimated_duration * 10) for t in targets)
+        values = tuple(priority_value.get(t.priority, 1) for t in targets)
+        chosen = select_within_budget(weights, values, int(available_time * 10))
+        
+        # Present the selection high priority first, longest investigations first
+        selected_targets = sorted(
+            (targets[i] for i in chosen),
+            key=lambda x: (priority_rank.get(x.priority, 3), -x.estimated_duration)
+        )
+        remaining_time = available_time - sum(t.estimated_duration for t in selected_targets)
         
         return {
             "selected_targets": selected_targets,
             "total_duration": available_time - remaining_time,
-            "utilization": ((available_time - remaining_time) / available_time) * 100,
-            "analysis": analysis_content
+            "utilization": ((available_time - remaining_time) / available_time) * 100
         }
     
     async def run_exploration_mission(self, planetary_body: str, region: str, mission_objectives: List[str]):
@@ -376,114 +586,171 @@ class NASAPlanetaryExplorer:
         yield f"**Region:** {region}\n"
         yield f"**Mission Duration:** 90 sols (planned)\n\n"
         
-        body_info = self.planetary_bodies.get(planetary_body, self.planetary_bodies["mars"])
-        yield f"### Planetary Environment\n"
-        yield f"- **Gravity:** {body_info['gravity']} m/s²\n"
-        yield f"- **Day Length:** {body_info['day_length']} hours\n"
-        yield f"- **Atmosphere:** {body_info['atmosphere'].replace('_', ' ').title()}\n"
-        yield f"- **Temperature:** {body_info['temperature_range'][0]}°C to {body_info['temperature_range'][1]}°C\n\n"
+        yield PLANETARY_ENVIRONMENT.get(planetary_body, PLANETARY_ENVIRONMENT["mars"])
         
         yield f"### Mission Objectives\n"
         for obj in mission_objectives:
             yield f"- {obj}\n"
         yield "\n"
         
-        yield "## 🔍 Terrain Analysis Phase...\n\n"
-        
-        # Analyze terrain
-        features, terrain_analysis = await self.analyze_terrain_image(planetary_body, region)
-        yield f"### Terrain Features Identified: {len(features)}\n\n"
-        
-        # Show top features
-        top_features = sorted(features, key=lambda x: x.scientific_interest, reverse=True)[:3]
-        for feature in top_features:
-            yield f"**{feature.feature_type.replace('_', ' ').title()}** ({feature.feature_id})\n"
-            yield f"- Location: {feature.location[0]:.3f}°, {feature.location[1]:.3f}°\n"
-            yield f"- Scientific Interest: {feature.scientific_interest:.1f}/10\n"
-            yield f"- Accessibility: {feature.accessibility.title()}\n"
-            yield f"- Composition: {feature.composition.replace('_', ' ')}\n\n"
-        
-        yield "### Detailed Terrain Analysis\n"
-        yield terrain_analysis + "\n\n"
-        
-        yield "## 🎯 Target Prioritization...\n\n"
-        
-        # Prioritize targets
-        targets, prioritization_analysis = await self.prioritize_targets(features, mission_objectives)
-        high_priority = [t for t in targets if t.priority == "high"]
-        
-        yield f"### Exploration Targets Generated: {len(targets)}\n"
-        yield f"- **High Priority:** {len(high_priority)}\n"
-        yield f"- **Medium Priority:** {len([t for t in targets if t.priority == 'medium'])}\n"
-        yield f"- **Low Priority:** {len([t for t in targets if t.priority == 'low'])}\n\n"
-        
-        yield "### High Priority Targets\n"
-        for target in high_priority[:3]:
-            yield f"**{target.target_id}** - {target.target_type.replace('_', ' ').title()}\n"
-            yield f"- Coordinates: {target.coordinates[0]:.3f}°, {target.coordinates[1]:.3f}°\n"
-            yield f"- Duration: {target.estimated_duration:.1f} sols\n"
-            yield f"- Instruments: {', '.join(target.required_instruments)}\n\n"
-        
-        yield "## 🛰️ Path Planning...\n\n"
-        
-        # Plan rover path
         rover_position = (0.0, 0.0)  # Starting position
-        path_plan, path_analysis = await self.plan_rover_path(targets, rover_position)
-        
-        yield f"### Optimal Path Generated\n"
-        yield f"- **Path ID:** {path_plan.path_id}\n"
-        yield f"- **Total Distance:** {path_plan.total_distance:.0f} meters\n"
-        yield f"- **Estimated Time:** {path_plan.estimated_time:.1f} sols\n"
-        yield f"- **Energy Required:** {path_plan.energy_required:.0f} Wh\n"
-        yield f"- **Waypoints:** {len(path_plan.waypoints)}\n"
-        yield f"- **Alternative Paths:** {path_plan.alternative_paths}\n\n"
-        
-        yield "### Path Analysis\n"
-        yield path_analysis + "\n\n"
-        
-        yield "## 🤖 Autonomous Science Planning...\n\n"
-        
-        # Autonomous science selection
         available_time = 10.0  # sols available for science
-        science_plan = await self.autonomous_science_selection(available_time, targets)
         
-        yield f"### Autonomous Science Selection\n"
-        yield f"- **Time Available:** {available_time} sols\n"
-        yield f"- **Targets Selected:** {len(science_plan['selected_targets'])}\n"
-        yield f"- **Total Duration:** {science_plan['total_duration']:.1f} sols\n"
-        yield f"- **Time Utilization:** {science_plan['utilization']:.1f}%\n\n"
-        
-        yield "### Selected Science Activities\n"
-        for target in science_plan['selected_targets']:
-            yield f"- **{target.target_id}:** {target.target_type} ({target.estimated_duration:.1f} sols)\n"
-        yield "\n"
+        # Repeat runs for the same body, region and objectives reuse the earlier mission
+        cache_key = self.cache_key("mission", planetary_body, region, *mission_objectives)
+        cached = self.cache_get(cache_key)
+        sections = {key: asyncio.Queue() for key in BRIEFING_SECTIONS}
+        if cached:
+            features, targets, path_plan, science_plan, briefing = cached
+            for key, text in briefing.items():
+                sections[key].put_nowait(text)
+                sections[key].put_nowait(None)
+            briefing_task = None
+        else:
+            # Mission data is generated locally, so every phase narrative can be requested
+            # up front in one streamed call; each section is shown as its text arrives
+            features = self.generate_terrain_features(planetary_body)
+            targets = self.generate_exploration_targets(features)
+            path_plan = self.compute_path_plan(targets, rover_position)
+            science_plan = self.select_science_targets(available_time, targets)
+            
+            briefing_task = asyncio.create_task(self.pump_mission_briefing({
+                "terrain_analysis": self.terrain_prompt(),
+                "prioritization_analysis": self.prioritization_prompt(features, mission_objectives),
+                "path_analysis": self.path_prompt(targets, rover_position),
+                "science_analysis": self.science_prompt(available_time, targets)
+            }, self.mission_context(planetary_body, region), sections))
         
-        yield "### Science Planning Analysis\n"
-        yield science_plan['analysis'] + "\n\n"
+        try:
+            yield "## 🔍 Terrain Analysis Phase...\n\n"
+            
+            yield f"### Terrain Features Identified: {len(features)}\n\n"
+            
+            # Show top features
+            top_features = sorted(features, key=lambda x: x.scientific_interest, reverse=True)[:3]
+            for feature in top_features:
+                yield f"**{feature.feature_type.replace('_', ' ').title()}** ({feature.feature_id})\n"
+                yield f"- Location: {feature.location[0]:.3f}°, {feature.location[1]:.3f}°\n"
+                yield f"- Scientific Interest: {feature.scientific_interest:.1f}/10\n"
+                yield f"- Accessibility: {feature.accessibility.title()}\n"
+                yield f"- Composition: {feature.composition.replace('_', ' ')}\n\n"
+            
+            yield "### Detailed Terrain Analysis\n"
+            async for piece in self.drain_section(sections["terrain_analysis"]):
+                yield piece
+            yield "\n\n"
+            
+            yield "## 🎯 Target Prioritization...\n\n"
+            
+            high_priority = [t for t in targets if t.priority == "high"]
+            
+            yield f"### Exploration Targets Generated: {len(targets)}\n"
+            yield f"- **High Priority:** {len(high_priority)}\n"
+            yield f"- **Medium Priority:** {len([t for t in targets if t.priority == 'medium'])}\n"
+            yield f"- **Low Priority:** {len([t for t in targets if t.priority == 'low'])}\n\n"
+            
+            yield "### High Priority Targets\n"
+            for target in high_priority[:3]:
+                yield f"**{target.target_id}** - {target.target_type.replace('_', ' ').title()}\n"
+                yield f"- Coordinates: {target.coordinates[0]:.3f}°, {target.coordinates[1]:.3f}°\n"
+                yield f"- Duration: {target.estimated_duration:.1f} sols\n"
+                yield f"- Instruments: {', '.join(target.required_instruments)}\n\n"
+            
+            yield "### Prioritization Analysis\n"
+            async for piece in self.drain_section(sections["prioritization_analysis"]):
+                yield piece
+            yield "\n\n"
+            
+            yield "## 🛰️ Path Planning...\n\n"
+            
+            yield f"### Optimal Path Generated\n"
+            yield f"- **Path ID:** {path_plan.path_id}\n"
+            yield f"- **Total Distance:** {path_plan.total_distance:.0f} meters\n"
+            yield f"- **Estimated Time:** {path_plan.estimated_time:.1f} sols\n"
+            yield f"- **Energy Required:** {path_plan.energy_required:.0f} Wh\n"
+            yield f"- **Waypoints:** {len(path_plan.waypoints)}\n"
+            yield f"- **Longest Leg:** {max(path_plan.segment_distances or [0.0]):.0f} meters\n"
+            yield f"- **Alternative Paths:** {path_plan.alternative_paths}\n\n"
+            
+            yield "### Path Analysis\n"
+            async for piece in self.drain_section(sections["path_analysis"]):
+                yield piece
+            yield "\n\n"
+            
+            yield "## 🤖 Autonomous Science Planning...\n\n"
+            
+            yield f"### Autonomous Science Selection\n"
+            yield f"- **Time Available:** {available_time} sols\n"
+            yield f"- **Targets Selected:** {len(science_plan['selected_targets'])}\n"
+            yield f"- **Total Duration:** {science_plan['total_duration']:.1f} sols\n"
+            yield f"- **Time Utilization:** {science_plan['utilization']:.1f}%\n\n"
+            
+            yield "### Selected Science Activities\n"
+            for target in science_plan['selected_targets']:
+                yield f"- **{target.target_id}:** {target.target_type} ({target.estimated_duration:.1f} sols)\n"
+            yield "\n"
+            
+            yield "### Science Planning Analysis\n"
+            async for piece in self.drain_section(sections["science_analysis"]):
+                yield piece
+            yield "\n\n"
+            
+            if briefing_task is not None:
+                briefing = await briefing_task
+                if briefing is not None:
+                    self.cache_put(cache_key, (features, targets, path_plan, science_plan, briefing))
+            
+            yield "## 📊 Mission Summary\n\n"
+            yield f"- **Terrain Features Analyzed:** {len(features)}\n"
+            yield f"- **Exploration Targets:** {len(targets)}\n"
+            yield f"- **High Priority Targets:** {len(high_priority)}\n"
+            yield f"- **Path Distance:** {path_plan.total_distance:.0f} m\n"
+            yield f"- **Science Activities:** {len(science_plan['selected_targets'])}\n"
+            yield f"- **Mission Efficiency:** {science_plan['utilization']:.1f}%\n\n"
+            
+            yield f"---\n**Mission Status: READY FOR EXECUTION** ✅\n"
+            yield f"**Next Phase: Surface Operations Commencement**"
+        finally:
+            # Don't leave the request running if the client disconnects mid-mission
+            if briefing_task is not None:
+                briefing_task.cancel()
+    
+    async def run_multi_body_mission(self, bodies: List[str], region: str,
+                                     mission_objectives: List[str]) -> Dict[str, str]:
+        """Run the same mission against several planetary bodies concurrently"""
+        slots = asyncio.Semaphore(MULTI_BODY_CONCURRENCY)
         
-        yield "## 📊 Mission Summary\n\n"
-        yield f"- **Terrain Features Analyzed:** {len(features)}\n"
-        yield f"- **Exploration Targets:** {len(targets)}\n"
-        yield f"- **High Priority Targets:** {len(high_priority)}\n"
-        yield f"- **Path Distance:** {path_plan.total_distance:.0f} m\n"
-        yield f"- **Science Activities:** {len(science_plan['selected_targets'])}\n"
-        yield f"- **Mission Efficiency:** {science_plan['utilization']:.1f}%\n\n"
+        async def run_one(body: str) -> str:
+            async with slots:
+                return "".join([chunk async for chunk in self.run_exploration_mission(body, region, mission_objectives)])
         
-        yield f"---\n**Mission Status: READY FOR EXECUTION** ✅\n"
-        yield f"**Next Phase: Surface Operations Commencement**"
+        reports = await asyncio.gather(*(run_one(body) for body in bodies))
+        return dict(zip(bodies, reports))
 
 # Gradio Interface
-async def run_planetary_exploration(planetary_body: str, region: str, objectives: str):
+# Shared across Gradio sessions so the connection pool and analysis cache stay warm
+EXPLORER = NASAPlanetaryExplorer()
+
+async def run_planetary_exploration(planetary_body: str, region: str, objectives: str, compare_bodies: List[str]):
     """Run planetary exploration mission simulation"""
-    explorer = NASAPlanetaryExplorer()
-    
     # Parse objectives
     mission_objectives = [obj.strip() for obj in objectives.split(',') if obj.strip()]
     if not mission_objectives:
         mission_objectives = ["Search for signs of past life", "Analyze geological composition", "Map surface features"]
     
-    async for chunk in explorer.run_exploration_mission(planetary_body, region, mission_objectives):
-        yield chunk
+    # Comparisons run every selected body in parallel and show the reports together
+    bodies = [planetary_body] + [body for body in compare_bodies or [] if body != planetary_body]
+    if len(bodies) > 1:
+        yield f"⏳ Running {len(bodies)} planetary missions in parallel..."
+        reports = await EXPLORER.run_multi_body_mission(bodies, region, mission_objectives)
+        yield "\n\n---\n\n".join(reports[body] for body in bodies)
+        return
+    
+    # Narratives stream in small pieces, so yield the accumulated report each time
+    output = ""
+    async for chunk in EXPLORER.run_exploration_mission(planetary_body, region, mission_objectives):
+        output += chunk
+        yield output
 
 # Create Gradio interface
 with gr.Blocks(
@@ -532,6 +799,16 @@ with gr.Blocks(
                 lines=2
             )
             
+            compare_checkboxes = gr.CheckboxGroup(
+                label="Compare With (runs in parallel)",
+                choices=[
+                    ("Mars", "mars"),
+                    ("Moon (Luna)", "moon"),
+                    ("Europa (Jupiter's moon)", "europa")
+                ],
+                value=[]
+            )
+            
             explore_button = gr.Button(
                 "🌍 Start Planetary Exploration",
                 variant="primary",
@@ -567,13 +844,13 @@ with gr.Blocks(
     # Event handlers
     explore_button.click(
         fn=run_planetary_exploration,
-        inputs=[body_dropdown, region_input, objectives_input],
+        inputs=[body_dropdown, region_input, objectives_input, compare_checkboxes],
         outputs=exploration_output
     )
     
     region_input.submit(
         fn=run_planetary_exploration,
-        inputs=[body_dropdown, region_input, objectives_input],
+        inputs=[body_dropdown, region_input, objectives_input, compare_checkboxes],
         outputs=exploration_output
     )
 
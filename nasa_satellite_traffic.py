@@ -7,17 +7,89 @@ import gradio as gr
 import openai
 import asyncio
 import json
-import random
 import math
 import os
 import time
+import threading
+import numpy as np
+from functools import partial
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Any, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+# Numba is optional; without it propagation falls back to the numpy implementation
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# JAX is optional and only used when it can see a GPU, for mega-constellation scale populations
+try:
+    import jax
+    import jax.numpy as jnp
+    JAX_AVAILABLE = any(device.platform == "gpu" for device in jax.devices())
+    if JAX_AVAILABLE:
+        # The Kepler solve's Stumpff series and universal-anomaly iteration need double precision
+        jax.config.update("jax_enable_x64", True)
+except (ImportError, RuntimeError):
+    JAX_AVAILABLE = False
+
+# SciPy is optional; without it candidate pairs come from the apogee/perigee filter alone
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
 load_dotenv()
 
+# Earth's gravitational parameter (km³/s²)
+MU_EARTH = 398600.0
+
+# Laguerre-Conway iterations for the universal-variable Kepler solve (converges in a handful)
+KEPLER_ITERATIONS = 12
+
+# Stored trajectory precision; metre-level resolution is plenty for km-scale screening
+TRAJECTORY_DTYPE = np.float32
+
+# Widest miss distance that still rates above "low" risk
+SCREENING_DISTANCE_KM = 25.0
+
+# Risk levels in ascending order, with the probability to exceed and miss distance to undercut for each step up
+RISK_LEVELS = np.array(["low", "medium", "high", "critical"])
+PROBABILITY_THRESHOLDS = np.array([0.001, 0.01, 0.1])
+DISTANCE_THRESHOLDS_KM = np.array([1.0, 5.0, SCREENING_DISTANCE_KM])
+
+# One row per screened pair: object indices, closest approach, probability and risk bucket
+RISK_TABLE_DTYPE = np.dtype([
+    ("primary", np.int32),
+    ("secondary", np.int32),
+    ("min_distance", np.float32),
+    ("min_step", np.int32),
+    ("probability", np.float32),
+    ("bucket", np.int8)
+])
+
+# Orbital zone altitude bands (km) and congestion
+ORBITAL_ZONES = {
+    "LEO": {"min_alt": 160, "max_alt": 2000, "congestion": "high"},
+    "MEO": {"min_alt": 2000, "max_alt": 35786, "congestion": "medium"},
+    "GEO": {"min_alt": 35786, "max_alt": 35886, "congestion": "high"},
+    "HEO": {"min_alt": 35886, "max_alt": 100000, "congestion": "low"}
+}
+
+# Simulated populations are regenerated once per refresh window (matches the 15 minute update cycle)
+POPULATION_REFRESH_SECONDS = 15 * 60
+
+# Populations and trajectories kept for repeat requests
+SIMULATION_CACHE_SIZE = 16
+
+# Working-set budget per block of pairs in the closest-approach search, sized to stay in L2
+PAIR_TILE_BYTES = 256 * 1024
+
 class SatelliteObject(BaseModel):
     """Satellite or space object representation"""
     id: str = Field(description="Unique identifier")
@@ -52,37 +124,224 @@ class ManeuverPlan(BaseModel):
     success_probability: float = Field(description="Success probability")
     alternatives: List[str] = Field(description="Alternative options")
 
-class NASASatelliteTrafficManager:
-    """Advanced orbital traffic management system"""
+def stumpff(xp, z):
+    """Stumpff functions C(z) and S(z), using their series near z = 0"""
+    small = xp.abs(z) < 1e-6
+    safe_z = xp.where(small, 1.0, z)
+    root = xp.sqrt(xp.abs(safe_z))
+    c = xp.where(safe_z > 0, (1 - xp.cos(root)) / safe_z, (xp.cosh(root) - 1) / -safe_z)
+    s = xp.where(safe_z > 0, (root - xp.sin(root)) / root**3, (xp.sinh(root) - root) / root**3)
+    return xp.where(small, 1 / 2 - z / 24, c), xp.where(small, 1 / 6 - z / 120, s)
+
+def kepler_positions(xp, positions, velocities, times):
+    """Closed-form two-body positions of every object at every time, returning (N, T, 3)
     
-    def __init__(self):
-        # Configure OpenAI client
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+    Solves the universal-variable Kepler equation with Laguerre-Conway iterations, then applies
+    the Lagrange f and g coefficients. Written against the numpy API so jax.numpy can run it too.
+    """
+    sqrt_mu = MU_EARTH ** 0.5
+    r0 = xp.linalg.norm(positions, axis=1)[:, None]
+    sigma0 = xp.sum(positions * velocities, axis=1)[:, None] / sqrt_mu
+    alpha = 2 / r0 - xp.sum(velocities * velocities, axis=1)[:, None] / MU_EARTH
+    
+    # Bound orbits repeat every period, so only the time since the last full revolution matters
+    elliptic = alpha > 1e-12
+    period = 2 * math.pi / (sqrt_mu * xp.where(elliptic, alpha, 1.0) ** 1.5)
+    t = xp.where(elliptic, times[None, :] % period, times[None, :])
+    chi = xp.where(elliptic, sqrt_mu * alpha * t, sqrt_mu * t / r0)
+    
+    for _ in range(KEPLER_ITERATIONS):
+        z = alpha * chi**2
+        c, s = stumpff(xp, z)
+        f = sigma0 * chi**2 * c + (1 - alpha * r0) * chi**3 * s + r0 * chi - sqrt_mu * t
+        df = sigma0 * chi * (1 - z * s) + (1 - alpha * r0) * chi**2 * c + r0
+        d2f = sigma0 * (1 - z * c) + (1 - alpha * r0) * chi * (1 - z * s)
+        root = xp.sqrt(xp.abs(16 * df**2 - 20 * f * d2f))
+        chi = chi - 5 * f / (df + xp.sign(df) * root)
+    
+    c, s = stumpff(xp, alpha * chi**2)
+    f_coef = 1 - chi**2 / r0 * c
+    g_coef = t - chi**3 * s / sqrt_mu
+    return f_coef[..., None] * positions[:, None, :] + g_coef[..., None] * velocities[:, None, :]
+
+if NUMBA_AVAILABLE:
+    # Compiled eagerly at import so the first Gradio request doesn't pay the JIT cost
+    @njit("UniTuple(float64, 2)(float64)", fastmath=True, cache=True)
+    def _stumpff_jit(z):
+        """Scalar Stumpff functions C(z) and S(z)"""
+        if abs(z) < 1e-6:
+            return 1 / 2 - z / 24, 1 / 6 - z / 120
+        root = math.sqrt(abs(z))
+        if z > 0:
+            return (1 - math.cos(root)) / z, (root - math.sin(root)) / root**3
+        return (math.cosh(root) - 1) / -z, (math.sinh(root) - root) / root**3
+    
+    @njit("void(float64[:, :], float64[:, :], float64[:], float64, float32[:, :, :])",
+          parallel=True, fastmath=True, cache=True)
+    def _kepler_positions_jit(pos, vel, times, mu, out):
+        """Compiled closed-form two-body propagation; each thread owns whole trajectories"""
+        sqrt_mu = math.sqrt(mu)
+        for i in prange(pos.shape[0]):
+            x, y, z = pos[i, 0], pos[i, 1], pos[i, 2]
+            vx, vy, vz = vel[i, 0], vel[i, 1], vel[i, 2]
+            r0 = math.sqrt(x * x + y * y + z * z)
+            sigma0 = (x * vx + y * vy + z * vz) / sqrt_mu
+            alpha = 2 / r0 - (vx * vx + vy * vy + vz * vz) / mu
+            period = 2 * math.pi / (sqrt_mu * alpha**1.5) if alpha > 1e-12 else 0.0
+            
+            for k in range(times.shape[0]):
+                t = times[k]
+                if period > 0:
+                    t = t % period
+                    chi = sqrt_mu * alpha * t
+                else:
+                    chi = sqrt_mu * t / r0
+                
+                for _ in range(KEPLER_ITERATIONS):
+                    zeta = alpha * chi * chi
+                    c, s = _stumpff_jit(zeta)
+                    f = sigma0 * chi * chi * c + (1 - alpha * r0) * chi**3 * s + r0 * chi - sqrt_mu * t
+                    df = sigma0 * chi * (1 - zeta * s) + (1 - alpha * r0) * chi * chi * c + r0
+                    d2f = sigma0 * (1 - zeta * c) + (1 - alpha * r0) * chi * (1 - zeta * s)
+                    root = math.sqrt(abs(16 * df * df - 20 * f * d2f))
+                    delta = 5 * f / (df + root if df >= 0 else df - root)
+                    chi -= delta
+                    if abs(delta) < 1e-10:
+                        break
+                
+                c, s = _stumpff_jit(alpha * chi * chi)
+                f_coef = 1 - chi * chi / r0 * c
+                g_coef = t - chi**3 * s / sqrt_mu
+                out[i, k, 0] = f_coef * x + g_coef * vx
+                out[i, k, 1] = f_coef * y + g_coef * vy
+                out[i, k, 2] = f_coef * z + g_coef * vz
+
+# Numba's default workqueue threading layer can't run parallel kernels from two threads at once
+_propagation_lock = threading.Lock()
+
+if JAX_AVAILABLE:
+    # XLA fuses the whole (N, T) solve into device kernels
+    _kepler_positions_jax = jax.jit(partial(kepler_positions, jnp))
+
+def propagate_orbits(positions: np.ndarray, velocities: np.ndarray, dt: float, steps: int) -> np.ndarray:
+    """Two-body positions of every object after each of `steps` intervals of `dt` seconds, as (N, steps, 3)"""
+    times = dt * np.arange(1, steps + 1, dtype=np.float64)
+    
+    if JAX_AVAILABLE and len(positions) and steps:
+        trajectories = _kepler_positions_jax(
+            jnp.asarray(positions, dtype=jnp.float64),
+            jnp.asarray(velocities, dtype=jnp.float64),
+            jnp.asarray(times)
+        )
+        return np.asarray(trajectories, dtype=TRAJECTORY_DTYPE)
+    
+    if NUMBA_AVAILABLE:
+        trajectories = np.empty((len(positions), steps, 3), dtype=TRAJECTORY_DTYPE)
+        with _propagation_lock:
+            _kepler_positions_jit(
+                np.ascontiguousarray(positions, dtype=np.float64),
+                np.ascontiguousarray(velocities, dtype=np.float64),
+                times, MU_EARTH, trajectories
+            )
+        return trajectories
+    
+    with np.errstate(all="ignore"):
+        trajectories = kepler_positions(
+            np, np.asarray(positions, dtype=np.float64).reshape(-1, 3),
+            np.asarray(velocities, dtype=np.float64).reshape(-1, 3), times
+        )
+    return trajectories.astype(TRAJECTORY_DTYPE)
+
+def candidate_pairs(trajectories: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Object index pairs (lower index first) that may come within the screening distance"""
+    count, steps, _ = trajectories.shape
+    
+    if SCIPY_AVAILABLE and count > 1 and steps > 0:
+        # KD-tree broadphase: time becomes a fourth coordinate spaced well beyond the screening
+        # distance, so one query_pairs call only matches positions sampled at the same step
+        points = np.empty((count * steps, 4))
+        points[:, :3] = trajectories.reshape(-1, 3)
+        points[:, 3] = np.tile(np.arange(steps), count) * (4 * SCREENING_DISTANCE_KM)
+        point_pairs = cKDTree(points).query_pairs(SCREENING_DISTANCE_KM, output_type="ndarray")
+        object_pairs = np.unique(point_pairs // steps, axis=0).reshape(-1, 2)
+        return object_pairs[:, 0], object_pairs[:, 1]
+    
+    # Apogee/perigee filter: two objects can't come closer than the gap between their radial
+    # ranges, so pairs whose ranges stay more than the screening distance apart are skipped
+    radii = np.linalg.norm(trajectories, axis=2)
+    r_min = radii.min(axis=1, initial=np.inf)
+    r_max = radii.max(axis=1, initial=-np.inf)
+    overlap = (r_min[:, None] - SCREENING_DISTANCE_KM <= r_max[None, :]) & \
+              (r_max[:, None] + SCREENING_DISTANCE_KM >= r_min[None, :])
+    return np.nonzero(np.triu(overlap, k=1))
+
+# One OpenAI client (and its keep-alive connection pool) shared by every request
+_client: Optional[openai.AsyncOpenAI] = None
+
+async def get_openai_client() -> openai.AsyncOpenAI:
+    """Return the shared OpenAI client, creating it on first use"""
+    # No await between the check and the assignment, so concurrent callers can't build two clients
+    global _client
+    if _client is None:
+        if not os.getenv("OPENAI_API_KEY"):
             raise ValueError("OPENAI_API_KEY environment variable is required")
-        
-        client_kwargs = {"api_key": api_key, "timeout": 60.0, "max_retries": 3}
+        client_kwargs = {"api_key": os.getenv("OPENAI_API_KEY"), "timeout": 60.0, "max_retries": 3}
         org_id = os.getenv("OPENAI_ORG_ID")
         if org_id:
             client_kwargs["organization"] = org_id
-            
-        self.client = openai.AsyncOpenAI(**client_kwargs)
+        _client = openai.AsyncOpenAI(**client_kwargs)
+    return _client
+
+class NASASatelliteTrafficManager:
+    """Advanced orbital traffic management system"""
+    
+    def __init__(self):
+        # The OpenAI client is shared module-wide and created (and the API key checked) on first use,
+        # so the module imports and simulates without a key
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
         self.tracked_objects = []
         self.collision_risks = []
-        self.orbital_zones = {
-            "LEO": {"min_alt": 160, "max_alt": 2000, "congestion": "high"},
-            "MEO": {"min_alt": 2000, "max_alt": 35786, "congestion": "medium"},
-            "GEO": {"min_alt": 35786, "max_alt": 35886, "congestion": "high"},
-            "HEO": {"min_alt": 35886, "max_alt": 100000, "congestion": "low"}
-        }
+        self.orbital_zones = ORBITAL_ZONES
+        self._population_cache: "OrderedDict[Tuple[Any, ...], List[SatelliteObject]]" = OrderedDict()
+        self._trajectory_cache: "OrderedDict[Tuple[Any, ...], np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()  # Simulation runs in worker threads
+    
+    def cache_get(self, cache: OrderedDict, key: Tuple[Any, ...]) -> Optional[Any]:
+        """Return a cached simulation result, marking it most recently used"""
+        with self._cache_lock:
+            if key not in cache:
+                return None
+            cache.move_to_end(key)
+            return cache[key]
+    
+    def cache_put(self, cache: OrderedDict, key: Tuple[Any, ...], value: Any):
+        """Store a simulation result, evicting the least recently used entry when full"""
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            if len(cache) > SIMULATION_CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def prewarm(self):
+        """Generate and propagate the current population of every zone ahead of the first request"""
+        for zone in self.orbital_zones:
+            self.compute_trajectories(self.generate_orbital_population(zone))
         
     def generate_orbital_population(self, zone: str = "LEO") -> List[SatelliteObject]:
-        """Generate realistic orbital population for simulation"""
-        objects = []
+        """Generate realistic orbital population for simulation
+        
+        The population is seeded by zone and refresh window, so repeat requests within a
+        window see the same objects and reuse the cached population and trajectories.
+        """
+        window = int(time.time() // POPULATION_REFRESH_SECONDS)
+        cache_key = (zone, window)
+        cached = self.cache_get(self._population_cache, cache_key)
+        if cached is not None:
+            return cached
+        
+        rng = np.random.default_rng([window, *zone.encode()])
         
         zone_params = self.orbital_zones.get(zone, self.orbital_zones["LEO"])
-        base_altitude = (zone_params["min_alt"] + zone_params["max_alt"]) / 2
         
         # Active satellites
         satellite_types = [
@@ -94,95 +353,111 @@ class NASASatelliteTrafficManager:
             ("Weather_Sat", "meteorology", "NOAA", 850),
             ("Earth_Obs", "observation", "ESA", 705)
         ]
-        
-        for i, (name, obj_type, owner, alt) in enumerate(satellite_types):
-            if zone_params["min_alt"] <= alt <= zone_params["max_alt"]:
-                # Generate orbital parameters
-                inclination = random.uniform(0, 180)
-                velocity_magnitude = math.sqrt(398600 / (6371 + alt))  # Orbital velocity
-                
-                objects.append(SatelliteObject(
-                    id=f"SAT-{i+1:03d}",
-                    name=name,
-                    object_type="satellite",
-                    position=(
-                        (6371 + alt) * math.cos(random.uniform(0, 2*math.pi)),
-                        (6371 + alt) * math.sin(random.uniform(0, 2*math.pi)),
-                        random.uniform(-1000, 1000)
-                    ),
-                    velocity=(
-                        velocity_magnitude * random.uniform(-0.1, 0.1),
-                        velocity_magnitude * (1 + random.uniform(-0.05, 0.05)),
-                        random.uniform(-0.5, 0.5)
-                    ),
-                    altitude=alt,
-                    inclination=inclination,
-                    mass=random.uniform(100, 15000),
-                    cross_section=random.uniform(5, 100),
-                    owner=owner,
-                    mission_status="active"
-                ))
+        satellites = [
+            (i, name, owner, alt) for i, (name, obj_type, owner, alt) in enumerate(satellite_types)
+            if zone_params["min_alt"] <= alt <= zone_params["max_alt"]
+        ]
+        sat_alt = np.array([alt for *_, alt in satellites], dtype=np.float64)
+        sat_positions, sat_velocities = self.sample_states(rng, sat_alt, 1000, 0.1, 0.05, 0.5)
+        sat_inclination = rng.uniform(0, 180, len(satellites))
+        sat_mass = rng.uniform(100, 15000, len(satellites))
+        sat_cross_section = rng.uniform(5, 100, len(satellites))
+        
+        objects = [
+            SatelliteObject(
+                id=f"SAT-{i+1:03d}",
+                name=name,
+                object_type="satellite",
+                position=tuple(position),
+                velocity=tuple(velocity),
+                altitude=alt,
+                inclination=inclination,
+                mass=mass,
+                cross_section=cross_section,
+                owner=owner,
+                mission_status="active"
+            )
+            for (i, name, owner, alt), position, velocity, inclination, mass, cross_section in zip(
+                satellites, sat_positions.tolist(), sat_velocities.tolist(),
+                sat_inclination.tolist(), sat_mass.tolist(), sat_cross_section.tolist()
+            )
+        ]
         
         # Add space debris
-        debris_count = random.randint(15, 25)
-        for i in range(debris_count):
-            alt = random.uniform(zone_params["min_alt"], zone_params["max_alt"])
-            velocity_magnitude = math.sqrt(398600 / (6371 + alt))
-            
-            objects.append(SatelliteObject(
+        debris_count = int(rng.integers(15, 26))
+        deb_alt = rng.uniform(zone_params["min_alt"], zone_params["max_alt"], debris_count)
+        deb_positions, deb_velocities = self.sample_states(rng, deb_alt, 2000, 0.2, 0.1, 1)
+        deb_inclination = rng.uniform(0, 180, debris_count)
+        deb_mass = rng.uniform(0.1, 500, debris_count)
+        deb_cross_section = rng.uniform(0.01, 10, debris_count)
+        
+        objects.extend(
+            SatelliteObject(
                 id=f"DEB-{i+1:03d}",
                 name=f"Debris_{i+1}",
                 object_type="debris",
-                position=(
-                    (6371 + alt) * math.cos(random.uniform(0, 2*math.pi)),
-                    (6371 + alt) * math.sin(random.uniform(0, 2*math.pi)),
-                    random.uniform(-2000, 2000)
-                ),
-                velocity=(
-                    velocity_magnitude * random.uniform(-0.2, 0.2),
-                    velocity_magnitude * (1 + random.uniform(-0.1, 0.1)),
-                    random.uniform(-1, 1)
-                ),
+                position=tuple(position),
+                velocity=tuple(velocity),
                 altitude=alt,
-                inclination=random.uniform(0, 180),
-                mass=random.uniform(0.1, 500),
-                cross_section=random.uniform(0.01, 10),
+                inclination=inclination,
+                mass=mass,
+                cross_section=cross_section,
                 owner="Unknown",
                 mission_status="debris"
+            )
+            for i, (alt, position, velocity, inclination, mass, cross_section) in enumerate(zip(
+                deb_alt.tolist(), deb_positions.tolist(), deb_velocities.tolist(),
+                deb_inclination.tolist(), deb_mass.tolist(), deb_cross_section.tolist()
             ))
+        )
         
+        self.cache_put(self._population_cache, cache_key, objects)
         return objects
     
-    async def predict_trajectories(self, objects: List[SatelliteObject], hours_ahead: float = 24) -> Dict[str, List[Tuple[float, float, float]]]:
-        """Predict orbital trajectories for collision analysis"""
-        
-        trajectories = {}
-        
-        for obj in objects:
-            trajectory = []
-            current_pos = obj.position
-            current_vel = obj.velocity
-            
-            # Simple orbital propagation (simplified for demo)
-            time_steps = int(hours_ahead * 10)  # 6-minute intervals
-            dt = hours_ahead * 3600 / time_steps  # seconds per step
-            
-            for step in range(time_steps):
-                # Simplified two-body orbital mechanics
-                r = math.sqrt(sum(x**2 for x in current_pos))
-                
-                # Gravitational acceleration
-                mu = 398600  # Earth's gravitational parameter
-                a_grav = [-mu * x / (r**3) for x in current_pos]
-                
-                # Update velocity and position
-                current_vel = tuple(v + a * dt for v, a in zip(current_vel, a_grav))
-                current_pos = tuple(p + v * dt for p, v in zip(current_pos, current_vel))
-                
-                trajectory.append(current_pos)
-            
-            trajectories[obj.id] = trajectory
-        
+    def sample_states(self, rng: np.random.Generator, altitudes: np.ndarray, z_spread: float,
+                      radial_spread: float, along_spread: float, vz_spread: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Draw (N, 3) positions and velocities for objects at the given altitudes in one batch"""
+        n = len(altitudes)
+        radius = 6371 + altitudes
+        velocity_magnitude = np.sqrt(MU_EARTH / radius)  # Orbital velocity
+        
+        # One angle per object keeps x and y on the object's orbital radius
+        theta = rng.uniform(0, 2*np.pi, n)
+        positions = np.column_stack((
+            radius * np.cos(theta),
+            radius * np.sin(theta),
+            rng.uniform(-z_spread, z_spread, n)
+        ))
+        velocities = np.column_stack((
+            velocity_magnitude * rng.uniform(-radial_spread, radial_spread, n),
+            velocity_magnitude * (1 + rng.uniform(-along_spread, along_spread, n)),
+            rng.uniform(-vz_spread, vz_spread, n)
+        ))
+        return positions, velocities
+    
+    async def predict_trajectories(self, objects: List[SatelliteObject], hours_ahead: float = 24) -> np.ndarray:
+        """Predict orbital trajectories for collision analysis, as (N, T, 3) positions in object order"""
+        # Propagation runs in a worker thread so the event loop keeps streaming
+        return await asyncio.get_running_loop().run_in_executor(None, partial(self.compute_trajectories, objects, hours_ahead))
+    
+    def compute_trajectories(self, objects: List[SatelliteObject], hours_ahead: float = 24) -> np.ndarray:
+        """Propagate trajectories synchronously, reusing cached results"""
+        
+        # Simple orbital propagation (simplified for demo)
+        time_steps = int(hours_ahead * 10)  # 6-minute intervals
+        dt = hours_ahead * 3600 / time_steps  # seconds per step
+        
+        # Pack state into (N, 3) arrays so every object advances in one vectorized step
+        positions = np.array([obj.position for obj in objects], dtype=np.float64).reshape(-1, 3)
+        velocities = np.array([obj.velocity for obj in objects], dtype=np.float64).reshape(-1, 3)
+        
+        # Identical states propagate identically, so refreshes reuse the earlier trajectories
+        cache_key = (positions.tobytes(), velocities.tobytes(), hours_ahead)
+        trajectories = self.cache_get(self._trajectory_cache, cache_key)
+        if trajectories is None:
+            trajectories = propagate_orbits(positions, velocities, dt, time_steps)
+            trajectories.flags.writeable = False
+            self.cache_put(self._trajectory_cache, cache_key, trajectories)
         return trajectories
     
     async def assess_collision_risks(self, objects: List[SatelliteObject]) -> List[CollisionRisk]:
@@ -191,56 +466,100 @@ class NASASatelliteTrafficManager:
         risks = []
         trajectories = await self.predict_trajectories(objects)
         
-        # Check all pairs of objects
-        for i, obj1 in enumerate(objects):
-            for j, obj2 in enumerate(objects[i+1:], i+1):
-                
-                traj1 = trajectories[obj1.id]
-                traj2 = trajectories[obj2.id]
-                
-                min_distance = float('inf')
-                min_time = 0
-                
-                # Find closest approach
-                for t, (pos1, pos2) in enumerate(zip(traj1, traj2)):
-                    distance = math.sqrt(sum((p1-p2)**2 for p1, p2 in zip(pos1, pos2)))
-                    if distance < min_distance:
-                        min_distance = distance
-                        min_time = t * 0.1  # Convert to hours
-                
-                # Calculate collision probability (simplified)
-                combined_cross_section = math.sqrt(obj1.cross_section + obj2.cross_section)
-                collision_prob = max(0, 1 - (min_distance / (combined_cross_section / 1000)))
-                
-                # Determine risk level
-                if collision_prob > 0.1 or min_distance < 1:
-                    risk_level = "critical"
-                elif collision_prob > 0.01 or min_distance < 5:
-                    risk_level = "high"
-                elif collision_prob > 0.001 or min_distance < 25:
-                    risk_level = "medium"
-                else:
-                    risk_level = "low"
-                
-                if risk_level in ["medium", "high", "critical"]:
-                    risks.append(CollisionRisk(
-                        primary_object=obj1.id,
-                        secondary_object=obj2.id,
-                        time_to_closest_approach=min_time,
-                        minimum_distance=min_distance,
-                        collision_probability=collision_prob,
-                        risk_level=risk_level,
-                        recommended_action=f"Monitor closely" if risk_level == "medium" else "Consider avoidance maneuver"
-                    ))
-        
-        return sorted(risks, key=lambda x: x.collision_probability, reverse=True)
-    
-    async def plan_avoidance_maneuver(self, risk: CollisionRisk, objects: List[SatelliteObject]) -> ManeuverPlan:
-        """Plan collision avoidance maneuver"""
+        # Skip pairs that never come within the screening distance
+        i_idx, j_idx = candidate_pairs(trajectories)
+        
+        # Check the remaining pairs: closest approach over every time step, one cache-sized tile at a time
+        # Squared distances are compared so the square root is taken once per pair, not per step
+        min_steps = np.empty(len(i_idx), dtype=np.intp)
+        min_sq_distances = np.empty(len(i_idx), dtype=TRAJECTORY_DTYPE)
+        tile = max(1, PAIR_TILE_BYTES // max(1, trajectories.shape[1] * 3 * trajectories.itemsize))
+        for start in range(0, len(i_idx), tile):
+            pairs = slice(start, start + tile)
+            deltas = trajectories[i_idx[pairs]] - trajectories[j_idx[pairs]]
+            sq_distances = np.einsum("pti,pti->pt", deltas, deltas)
+            min_steps[pairs] = sq_distances.argmin(axis=1)
+            min_sq_distances[pairs] = sq_distances[np.arange(len(sq_distances)), min_steps[pairs]]
+        min_distances = np.sqrt(min_sq_distances)
+        
+        # Calculate collision probability (simplified)
+        cross_sections = np.array([obj.cross_section for obj in objects], dtype=TRAJECTORY_DTYPE)
+        combined_cross_sections = np.sqrt(cross_sections[i_idx] + cross_sections[j_idx])
+        collision_probs = np.maximum(0, 1 - (min_distances / (combined_cross_sections / 1000)))
+        
+        # Determine risk level: bucket by probability and by miss distance, keeping the worse of the two
+        buckets = np.maximum(
+            np.searchsorted(PROBABILITY_THRESHOLDS, collision_probs, side="left"),
+            len(DISTANCE_THRESHOLDS_KM) - np.searchsorted(DISTANCE_THRESHOLDS_KM, min_distances, side="right")
+        )
+        
+        # Collect the screening results in one table, keeping reportable pairs by descending probability
+        risk_table = np.empty(len(i_idx), dtype=RISK_TABLE_DTYPE)
+        risk_table["primary"] = i_idx
+        risk_table["secondary"] = j_idx
+        risk_table["min_distance"] = min_distances
+        risk_table["min_step"] = min_steps
+        risk_table["probability"] = collision_probs
+        risk_table["bucket"] = buckets
+        reportable = risk_table[risk_table["bucket"] >= 1]
+        reportable = reportable[np.argsort(-reportable["probability"], kind="stable")]
+        
+        # Only reportable pairs become CollisionRisk records; the values are already typed, so skip validation
+        for primary, secondary, min_distance, min_step, probability, bucket in reportable.tolist():
+            risk_level = str(RISK_LEVELS[bucket])
+            risks.append(CollisionRisk.model_construct(
+                primary_object=objects[primary].id,
+                secondary_object=objects[secondary].id,
+                time_to_closest_approach=min_step * 0.1,  # Convert to hours
+                minimum_distance=min_distance,
+                collision_probability=probability,
+                risk_level=risk_level,
+                recommended_action=f"Monitor closely" if risk_level == "medium" else "Consider avoidance maneuver"
+            ))
+        
+        return risks
+    
+    async def stream_analysis(self, prompt: str, max_tokens: int, task: str):
+        """Stream an LLM analysis, yielding text as it arrives"""
+        try:
+            client = await get_openai_client()
+            stream = await client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0.1,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            yield f"Error in {task}: {str(e)}"
+    
+    async def pump_analysis(self, prompt: str, max_tokens: int, task: str, queue: asyncio.Queue):
+        """Forward a streamed analysis into a queue, ending with None"""
+        try:
+            async for piece in self.stream_analysis(prompt, max_tokens, task):
+                queue.put_nowait(piece)
+        finally:
+            queue.put_nowait(None)
+    
+    @staticmethod
+    async def drain_section(queue: asyncio.Queue):
+        """Yield queued text pieces until the section is complete"""
+        while True:
+            piece = await queue.get()
+            if piece is None:
+                return
+            yield piece
+    
+    def prepare_avoidance_maneuver(self, risk: CollisionRisk,
+                                   obj_by_id: Dict[str, SatelliteObject]) -> Tuple[ManeuverPlan, str]:
+        """Build the avoidance maneuver plan and the prompt for its detailed analysis"""
         
         # Find the objects involved
-        obj1 = next(obj for obj in objects if obj.id == risk.primary_object)
-        obj2 = next(obj for obj in objects if obj.id == risk.secondary_object)
+        obj1 = obj_by_id[risk.primary_object]
+        obj2 = obj_by_id[risk.secondary_object]
         
         # Choose which object to maneuver (prefer active satellites over debris)
         if obj1.mission_status == "active" and obj2.mission_status != "active":
@@ -281,24 +600,7 @@ class NASASatelliteTrafficManager:
         Use orbital mechanics principles and NASA collision avoidance protocols.
         """
         
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=800,
-                temperature=0.1
-            )
-        except Exception as e:
-            # Return error fallback
-            response = type('obj', (object,), {
-                'choices': [type('obj', (object,), {
-                    'message': type('obj', (object,), {
-                        'content': f"Error in maneuver planning: {str(e)}"
-                    })()
-                })()]
-            })()
-        
-        return ManeuverPlan(
+        maneuver_plan = ManeuverPlan(
             object_id=maneuver_obj.id,
             maneuver_type="collision_avoidance",
             delta_v_required=base_delta_v,
@@ -310,12 +612,19 @@ class NASASatelliteTrafficManager:
                 "Alternative trajectory adjustment",
                 "Coordinate with other object operator"
             ]
-        ), response.choices[0].message.content
-    
-    async def coordinate_constellation_management(self, scenario: str) -> str:
-        """Coordinate multiple satellites in constellations"""
+        )
         
-        prompt = f"""
+        return maneuver_plan, prompt
+    
+    async def plan_avoidance_maneuver(self, risk: CollisionRisk, objects: List[SatelliteObject]) -> Tuple[ManeuverPlan, str]:
+        """Plan collision avoidance maneuver"""
+        maneuver_plan, prompt = self.prepare_avoidance_maneuver(risk, {obj.id: obj for obj in objects})
+        analysis = "".join([piece async for piece in self.stream_analysis(prompt, 800, "maneuver planning")])
+        return maneuver_plan, analysis
+    
+    def constellation_prompt(self, scenario: str) -> str:
+        """Build the constellation coordination prompt"""
+        return f"""
         As NASA's satellite constellation coordination specialist, manage this scenario:
         
         SCENARIO: {scenario}
@@ -330,17 +639,13 @@ class NASASatelliteTrafficManager:
         Consider Starlink, OneWeb, and other mega-constellations operating in similar orbits.
         Use NASA's space traffic management best practices.
         """
-        
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000,
-                temperature=0.1
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error in constellation management: {str(e)}"
+    
+    async def coordinate_constellation_management(self, scenario: str) -> str:
+        """Coordinate multiple satellites in constellations"""
+        return "".join([
+            piece async for piece in
+            self.stream_analysis(self.constellation_prompt(scenario), 1000, "constellation management")
+        ])
     
     async def run_traffic_management(self, scenario: str, orbital_zone: str):
         """Run complete orbital traffic management simulation"""
@@ -350,81 +655,107 @@ class NASASatelliteTrafficManager:
         yield f"**Orbital Zone:** {orbital_zone} ({self.orbital_zones[orbital_zone]['min_alt']}-{self.orbital_zones[orbital_zone]['max_alt']} km)\n"
         yield f"**Congestion Level:** {self.orbital_zones[orbital_zone]['congestion'].upper()}\n\n"
         
-        yield "## 📡 Initializing Orbital Surveillance...\n\n"
-        
-        # Generate orbital population
-        objects = self.generate_orbital_population(orbital_zone)
-        active_sats = [obj for obj in objects if obj.mission_status == "active"]
-        debris_objects = [obj for obj in objects if obj.mission_status == "debris"]
-        
-        yield f"### Current Orbital Population\n"
-        yield f"- **Active Satellites:** {len(active_sats)}\n"
-        yield f"- **Space Debris:** {len(debris_objects)}\n"
-        yield f"- **Total Tracked Objects:** {len(objects)}\n\n"
-        
-        yield "### Major Satellites Tracked:\n"
-        for obj in active_sats[:5]:
-            yield f"- **{obj.name}** ({obj.id}) - {obj.altitude:.0f} km - {obj.owner}\n"
-        yield "\n"
-        
-        yield "## ⚠️ Collision Risk Assessment...\n\n"
-        
-        risks = await self.assess_collision_risks(objects)
-        high_risks = [r for r in risks if r.risk_level in ["high", "critical"]]
-        
-        if high_risks:
-            yield f"### 🚨 High-Priority Collision Risks: {len(high_risks)}\n\n"
-            for risk in high_risks[:3]:
-                obj1 = next(obj for obj in objects if obj.id == risk.primary_object)
-                obj2 = next(obj for obj in objects if obj.id == risk.secondary_object)
-                yield f"**Risk #{risks.index(risk)+1}** - {risk.risk_level.upper()}\n"
-                yield f"- Objects: {obj1.name} ↔ {obj2.name}\n"
-                yield f"- Closest Approach: {risk.minimum_distance:.2f} km in {risk.time_to_closest_approach:.1f} hours\n"
-                yield f"- Collision Probability: {risk.collision_probability:.4f}\n"
-                yield f"- Action: {risk.recommended_action}\n\n"
-        else:
-            yield f"### ✅ No High-Priority Collision Risks Detected\n\n"
-            yield f"**Medium/Low Risks:** {len(risks)} monitored situations\n\n"
-        
-        yield "## 🚀 Collision Avoidance Planning...\n\n"
+        # Constellation coordination only depends on the scenario, so its LLM call starts
+        # right away and overlaps the simulation and maneuver planning
+        constellation_queue = asyncio.Queue()
+        constellation_task = asyncio.create_task(self.pump_analysis(
+            self.constellation_prompt(scenario), 1000, "constellation management", constellation_queue
+        ))
+        maneuver_task = None
         
-        if high_risks:
-            # Plan maneuver for highest risk
-            top_risk = high_risks[0]
-            maneuver_plan, detailed_analysis = await self.plan_avoidance_maneuver(top_risk, objects)
+        try:
+            yield "## 📡 Initializing Orbital Surveillance...\n\n"
             
-            yield f"### Avoidance Maneuver Plan\n"
-            yield f"- **Target Object:** {maneuver_plan.object_id}\n"
-            yield f"- **Maneuver Type:** {maneuver_plan.maneuver_type.replace('_', ' ').title()}\n"
-            yield f"- **Delta-V Required:** {maneuver_plan.delta_v_required:.1f} m/s\n"
-            yield f"- **Execution Time:** {maneuver_plan.maneuver_time}\n"
-            yield f"- **Fuel Cost:** {maneuver_plan.fuel_cost:.1f} kg\n"
-            yield f"- **Success Probability:** {maneuver_plan.success_probability:.0%}\n\n"
+            # Generate orbital population
+            objects = await asyncio.get_running_loop().run_in_executor(None, partial(self.generate_orbital_population, orbital_zone))
+            obj_by_id = {obj.id: obj for obj in objects}
+            active_sats = [obj for obj in objects if obj.mission_status == "active"]
+            debris_objects = [obj for obj in objects if obj.mission_status == "debris"]
             
-            yield "### Detailed Analysis\n"
-            yield detailed_analysis + "\n\n"
-        
-        yield "## 🌐 Constellation Coordination...\n\n"
-        
-        constellation_analysis = await self.coordinate_constellation_management(scenario)
-        yield constellation_analysis + "\n\n"
-        
-        yield "## 📊 Traffic Management Summary\n\n"
-        yield f"- **Objects Tracked:** {len(objects)}\n"
-        yield f"- **Collision Risks Identified:** {len(risks)}\n"
-        yield f"- **Critical Risks:** {len([r for r in risks if r.risk_level == 'critical'])}\n"
-        yield f"- **Maneuvers Planned:** {1 if high_risks else 0}\n"
-        yield f"- **System Status:** {'⚠️ ACTIVE MONITORING' if high_risks else '✅ NOMINAL'}\n\n"
-        
-        yield f"---\n**Next Update:** {(datetime.now() + timedelta(minutes=15)).strftime('%H:%M UTC')}**"
+            yield f"### Current Orbital Population\n"
+            yield f"- **Active Satellites:** {len(active_sats)}\n"
+            yield f"- **Space Debris:** {len(debris_objects)}\n"
+            yield f"- **Total Tracked Objects:** {len(objects)}\n\n"
+            
+            yield "### Major Satellites Tracked:\n"
+            for obj in active_sats[:5]:
+                yield f"- **{obj.name}** ({obj.id}) - {obj.altitude:.0f} km - {obj.owner}\n"
+            yield "\n"
+            
+            yield "## ⚠️ Collision Risk Assessment...\n\n"
+            
+            risks = await self.assess_collision_risks(objects)
+            high_risks = [r for r in risks if r.risk_level in ["high", "critical"]]
+            
+            # Plan the maneuver for the highest risk; its analysis streams in while the risk table renders
+            if high_risks:
+                maneuver_plan, maneuver_prompt = self.prepare_avoidance_maneuver(high_risks[0], obj_by_id)
+                maneuver_queue = asyncio.Queue()
+                maneuver_task = asyncio.create_task(self.pump_analysis(
+                    maneuver_prompt, 800, "maneuver planning", maneuver_queue
+                ))
+            
+            if high_risks:
+                yield f"### 🚨 High-Priority Collision Risks: {len(high_risks)}\n\n"
+                for rank, risk in enumerate(high_risks[:3], 1):
+                    obj1 = obj_by_id[risk.primary_object]
+                    obj2 = obj_by_id[risk.secondary_object]
+                    yield f"**Risk #{rank}** - {risk.risk_level.upper()}\n"
+                    yield f"- Objects: {obj1.name} ↔ {obj2.name}\n"
+                    yield f"- Closest Approach: {risk.minimum_distance:.2f} km in {risk.time_to_closest_approach:.1f} hours\n"
+                    yield f"- Collision Probability: {risk.collision_probability:.4f}\n"
+                    yield f"- Action: {risk.recommended_action}\n\n"
+            else:
+                yield f"### ✅ No High-Priority Collision Risks Detected\n\n"
+                yield f"**Medium/Low Risks:** {len(risks)} monitored situations\n\n"
+            
+            yield "## 🚀 Collision Avoidance Planning...\n\n"
+            
+            if high_risks:
+                yield f"### Avoidance Maneuver Plan\n"
+                yield f"- **Target Object:** {maneuver_plan.object_id}\n"
+                yield f"- **Maneuver Type:** {maneuver_plan.maneuver_type.replace('_', ' ').title()}\n"
+                yield f"- **Delta-V Required:** {maneuver_plan.delta_v_required:.1f} m/s\n"
+                yield f"- **Execution Time:** {maneuver_plan.maneuver_time}\n"
+                yield f"- **Fuel Cost:** {maneuver_plan.fuel_cost:.1f} kg\n"
+                yield f"- **Success Probability:** {maneuver_plan.success_probability:.0%}\n\n"
+                
+                yield "### Detailed Analysis\n"
+                async for piece in self.drain_section(maneuver_queue):
+                    yield piece
+                yield "\n\n"
+            
+            yield "## 🌐 Constellation Coordination...\n\n"
+            
+            async for piece in self.drain_section(constellation_queue):
+                yield piece
+            yield "\n\n"
+            
+            yield "## 📊 Traffic Management Summary\n\n"
+            yield f"- **Objects Tracked:** {len(objects)}\n"
+            yield f"- **Collision Risks Identified:** {len(risks)}\n"
+            yield f"- **Critical Risks:** {len([r for r in risks if r.risk_level == 'critical'])}\n"
+            yield f"- **Maneuvers Planned:** {1 if high_risks else 0}\n"
+            yield f"- **System Status:** {'⚠️ ACTIVE MONITORING' if high_risks else '✅ NOMINAL'}\n\n"
+            
+            yield f"---\n**Next Update:** {(datetime.now() + timedelta(minutes=15)).strftime('%H:%M UTC')}**"
+        finally:
+            # Don't leave LLM requests running if the client disconnects mid-report
+            for task in (constellation_task, maneuver_task):
+                if task is not None:
+                    task.cancel()
 
 # Gradio Interface
+# Shared across Gradio sessions so simulated populations and trajectories stay cached
+TRAFFIC_MANAGER = NASASatelliteTrafficManager()
+
 async def run_satellite_traffic_management(scenario: str, orbital_zone: str):
     """Run satellite traffic management simulation"""
-    traffic_manager = NASASatelliteTrafficManager()
-    
-    async for chunk in traffic_manager.run_traffic_management(scenario, orbital_zone):
-        yield chunk
+    # Each yield replaces the Markdown output, so yield the accumulated report
+    output = ""
+    async for chunk in TRAFFIC_MANAGER.run_traffic_management(scenario, orbital_zone):
+        output += chunk
+        yield output
 
 # Create Gradio interface
 with gr.Blocks(
@@ -515,6 +846,9 @@ with gr.Blocks(
     )
 
 if __name__ == "__main__":
+    # Warm the population and trajectory caches in the background while the UI starts up
+    threading.Thread(target=TRAFFIC_MANAGER.prewarm, daemon=True).start()
+    
     demo.launch(
         server_name="0.0.0.0",
         server_port=7864,
@@ -7,64 +7,345 @@ import gradio as gr
 import openai
 import asyncio
 import json
-import random
 import math
 import os
+import re
+import sys
 import time
-from typing import Dict, List, Tuple, Any
+import uuid
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional, ClassVar
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class SpacecraftState(BaseModel):
+# orjson is optional; without it serialization falls back to the standard json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Attempts made after a 429 before giving up on a request (the SDK's own retries are turned off for these calls)
+RATE_LIMIT_RETRIES = 3
+
+# Retry-after hints are usually plain seconds, but may come as durations like "20ms", "1.5s" or "6m0s"
+RESET_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+RESET_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+# Streamed tokens collected before the report is updated
+STREAM_BATCH_TOKENS = 50
+
+# How often a submitted Batch API job is polled for completion (seconds)
+BATCH_POLL_SECONDS = 30.0
+
+# Packed numeric spacecraft state, so the autonomy rules can be evaluated over many states at once
+STATE_DTYPE = np.dtype([
+    ("fuel", np.float32),
+    ("batt", np.float32),
+    ("solar", np.float32),
+    ("delay", np.float32),
+    ("failed", np.int8),  # Systems reporting failed/critical
+    ("degraded", np.int8)  # Systems running degraded or on backup
+])
+FAILED_STATUSES = ("failed", "critical")
+DEGRADED_STATUSES = ("degraded", "backup")
+
+# Equally likely health statuses drawn for each system when a scenario starts
+SYSTEM_STATUS_CHOICES = {
+    "propulsion": ["nominal", "nominal", "degraded"],
+    "navigation": ["nominal", "nominal", "backup"],
+    "communications": ["nominal", "reduced", "nominal"],
+    "thermal": ["nominal", "nominal", "elevated"],
+    "power": ["nominal", "nominal", "degraded"],
+    "computers": ["nominal", "redundant", "nominal"]
+}
+STATUS_TABLE = np.array(list(SYSTEM_STATUS_CHOICES.values()))
+
+# Anomaly flag columns returned by detect_anomalies_batch
+ANOMALY_CHECKS = [
+    "critical_fuel",
+    "critical_battery",
+    "solar_degradation",
+    "system_failures",
+    "multiple_degraded",
+    "communication_delay"
+]
+
+# Power allocation (%) per subsystem, before adjusting for current conditions
+BASE_ALLOCATION = {
+    "life_support": 25.0,
+    "navigation": 20.0,
+    "communications": 15.0,
+    "scientific_instruments": 20.0,
+    "propulsion": 10.0,
+    "thermal_control": 10.0
+}
+ALLOCATION_DTYPE = np.dtype([(system, np.float32) for system in BASE_ALLOCATION])
+
+# Built internally on every simulation, so a slotted dataclass rather than a validated model
+# (__slots__ is declared by hand since dataclass(slots=True) needs Python 3.10)
+@dataclass
+class SpacecraftState:
     """Current spacecraft state and telemetry"""
-    position: Tuple[float, float, float] = Field(description="Spacecraft position (x, y, z) in km")
-    velocity: Tuple[float, float, float] = Field(description="Spacecraft velocity (vx, vy, vz) in km/s")
-    fuel_level: float = Field(description="Fuel percentage remaining")
-    battery_level: float = Field(description="Battery percentage remaining")
-    solar_panel_efficiency: float = Field(description="Solar panel efficiency percentage")
-    system_health: Dict[str, str] = Field(description="Health status of various systems")
-    communication_delay: float = Field(description="Communication delay to Earth in minutes")
-    mission_phase: str = Field(description="Current mission phase")
+    __slots__ = (
+        "position", "velocity", "fuel_level", "battery_level", "solar_panel_efficiency",
+        "system_health", "communication_delay", "mission_phase"
+    )
+    
+    position: Tuple[float, float, float]  # Spacecraft position (x, y, z) in km
+    velocity: Tuple[float, float, float]  # Spacecraft velocity (vx, vy, vz) in km/s
+    fuel_level: float  # Fuel percentage remaining
+    battery_level: float  # Battery percentage remaining
+    solar_panel_efficiency: float  # Solar panel efficiency percentage
+    system_health: Dict[str, str]  # Health status of various systems
+    communication_delay: float  # Communication delay to Earth in minutes
+    mission_phase: str  # Current mission phase
 
+# Stays a Pydantic model: its fields come from the LLM reply and need validating
 class AutonomyDecision(BaseModel):
     """Autonomous decision output"""
-    decision_type: str = Field(description="Type of autonomous decision made")
-    actions_taken: List[str] = Field(description="List of actions taken autonomously")
+    decision_type: str = Field(description="Type of autonomous decision made, in snake_case")
+    actions_taken: List[str] = Field(description="List of specific actions taken autonomously")
     resource_allocation: Dict[str, float] = Field(description="Resource allocation adjustments")
     risk_assessment: str = Field(description="Risk level and assessment")
     communication_to_earth: str = Field(description="Message to send to Earth")
     confidence_level: float = Field(description="Confidence in decision (0-1)")
 
+def autonomy_response_format() -> Dict[str, Any]:
+    """Strict structured-output schema for the combined reply: the decision, then the analysis text"""
+    # Resource allocation is computed locally, so the model only fills in the other fields
+    decision = AutonomyDecision.model_json_schema()
+    decision["properties"].pop("resource_allocation")
+    decision["required"] = list(decision["properties"])
+    decision["additionalProperties"] = False
+    
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "autonomy_report",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "decision": decision,
+                    "navigation": {"type": "string", "description": "Navigation analysis in Markdown"},
+                    "recovery": {"type": "string", "description": "Fault detection and recovery in Markdown"}
+                },
+                "required": ["decision", "navigation", "recovery"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+AUTONOMY_RESPONSE_FORMAT = autonomy_response_format()
+
+def dumps_json(value: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else None).decode()
+    return json.dumps(value, indent=2 if indent else None)
+
+def partial_json_string(raw: str, key: str) -> Optional[str]:
+    """Decode as much of a JSON string field as has arrived in a streaming reply"""
+    match = re.search(rf'"{key}"\s*:\s*"', raw)
+    if not match:
+        return None
+    body = re.match(r'(?:[^"\\]|\\.)*', raw[match.end():]).group()
+    body = re.sub(r'\\u[0-9a-fA-F]{0,3}$', '', body)  # Escape cut off mid-sequence
+    return json.loads(f'"{body}"', strict=False)
+
+class RateLimiter:
+    """Token buckets for requests per minute and tokens per minute"""
+    
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.rates = {"requests": requests_per_minute / 60, "tokens": tokens_per_minute / 60}
+        self.capacity = {"requests": requests_per_minute, "tokens": tokens_per_minute}
+        self.available = dict(self.capacity)
+        self.updated = time.monotonic()
+        self.lock: Optional[asyncio.Lock] = None  # Created on first acquire, inside the running loop
+    
+    def refill(self):
+        """Add the budget earned since the last update"""
+        now = time.monotonic()
+        for bucket, rate in self.rates.items():
+            self.available[bucket] = min(self.capacity[bucket], self.available[bucket] + rate * (now - self.updated))
+        self.updated = now
+    
+    async def acquire(self, tokens: int):
+        """Wait until one request and the estimated tokens fit in the budget, then spend them"""
+        needed = {"requests": 1, "tokens": min(tokens, self.capacity["tokens"])}
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            while True:
+                self.refill()
+                shortfall = max((needed[b] - self.available[b]) / self.rates[b] for b in needed)
+                if shortfall <= 0:
+                    break
+                await asyncio.sleep(shortfall)
+            for bucket, amount in needed.items():
+                self.available[bucket] -= amount
+
 class NASASpacecraftAutonomy:
     """Advanced spacecraft autonomy system"""
     
-    def __init__(self):
-        # Configure OpenAI client with better settings
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-        
-        # Check for organization ID
-        org_id = os.getenv("OPENAI_ORG_ID")
-        
-        # Initialize client with proper configuration
-        client_kwargs = {
-            "api_key": api_key,
-            "timeout": 60.0,
-            "max_retries": 3
+    # Shared by every instance, so requests reuse one keep-alive connection pool and one set of rate limits
+    _client = None
+    _sem = None
+    _rate_limiter = None
+    
+    # Simulated mission scenarios; only the randomized variations are drawn per simulation
+    _SCENARIOS: ClassVar[Dict[str, Dict[str, Any]]] = {
+        "mars_transit": {
+            "position": (150000000, 0, 0),  # Halfway to Mars
+            "velocity": (15.0, 0, 0),
+            "fuel_level": 65.0,
+            "battery_level": 85.0,
+            "solar_panel_efficiency": 92.0,
+            "communication_delay": 12.5,
+            "mission_phase": "interplanetary_cruise"
+        },
+        "lunar_orbit": {
+            "position": (384400, 0, 0),  # Lunar distance
+            "velocity": (1.0, 0, 0),
+            "fuel_level": 78.0,
+            "battery_level": 91.0,
+            "solar_panel_efficiency": 88.0,
+            "communication_delay": 1.3,
+            "mission_phase": "orbital_operations"
+        },
+        "deep_space": {
+            "position": (500000000, 0, 0),  # Beyond Mars
+            "velocity": (8.5, 0, 0),
+            "fuel_level": 42.0,
+            "battery_level": 76.0,
+            "solar_panel_efficiency": 65.0,
+            "communication_delay": 28.0,
+            "mission_phase": "deep_space_exploration"
         }
+    }
+    
+    # Fixed system prompt shared by every request. It is kept above OpenAI's 1024-token prompt caching
+    # minimum so repeat requests are billed and served from the cached prefix
+    _SYSTEM_PREAMBLE = """You are NASA's Advanced Spacecraft Autonomy System, the onboard decision authority for a crewed or robotic spacecraft operating beyond real-time contact with Earth. You follow the NASA Autonomy Protocol Handbook below.
+
+NASA AUTONOMY PROTOCOL HANDBOOK
+
+1. Authority and priorities
+1.1 Act autonomously whenever the round-trip communication delay prevents ground controllers from responding in time, and always when the one-way delay exceeds 20 minutes.
+1.2 Priorities, in strict order: crew and vehicle safety, preservation of the mission, preservation of consumables (fuel, power, thermal margin), science return.
+1.3 Prefer reversible actions over irreversible ones. Do not commit propellant, jettison hardware or power down redundant strings unless the alternative is loss of vehicle or mission.
+1.4 Every autonomous action must be reported to Earth with its rationale, the telemetry that triggered it and the resulting vehicle configuration.
+
+2. Decision thresholds
+2.1 Fuel below 15% is critical: suspend discretionary maneuvers and reserve the remaining propellant for safety and mission-critical burns.
+2.2 Battery below 20% is critical: shed non-essential loads, point the arrays for maximum illumination and defer science operations.
+2.3 Solar array efficiency below 70% indicates degradation: re-plan the power budget around the reduced output and schedule array diagnostics.
+2.4 Two or more simultaneous system failures require entry into safe mode unless a specific recovery procedure applies.
+2.5 Maintain a 5 km minimum safety margin from any known obstacle or debris when planning trajectories and waypoints.
+
+3. Navigation principles
+3.1 Base trajectory corrections on orbital mechanics: prefer small, early corrections over large, late ones, and perform burns at the points of greatest leverage (periapsis for energy changes, nodes for plane changes).
+3.2 Estimate the propellant cost of every maneuver with the rocket equation and state it as a percentage of the remaining fuel.
+3.3 Always identify a backup navigation source (star tracker, inertial measurement unit, optical navigation or radiometric tracking) and the conditions for switching to it.
+3.4 Plan waypoints that keep the vehicle within communication geometry with Earth and outside eclipse periods longer than the battery can support.
+
+4. Fault detection, isolation and recovery (FDIR)
+4.1 Detect: confirm an anomaly with at least two independent telemetry sources before acting on it; treat a single-sensor reading as suspect.
+4.2 Isolate: identify the smallest replaceable unit or subsystem responsible and remove it from the active configuration.
+4.3 Recover: switch to redundant hardware, reconfigure software or reroute power, then verify nominal performance before resuming operations.
+4.4 Escalate in steps: component reset, switch to redundant unit, subsystem safe state, vehicle safe mode. Never skip directly to vehicle safe mode unless safety is at immediate risk.
+4.5 Degraded or backup systems are operational but have reduced margin; account for the next failure when planning.
+
+5. Power and thermal management
+5.1 Life support and thermal control keep their allocations under all conditions. Science instruments are the first loads to be shed.
+5.2 Keep battery depth of discharge within limits by matching load schedules to array output and eclipse timing.
+5.3 Elevated thermal readings call for attitude changes to reduce solar heating and for load reduction before hardware is powered off.
+
+6. Communications
+6.1 Transmit a concise status message after every autonomous decision, stating the situation, the actions taken, the current vehicle configuration and any request for ground review.
+6.2 With reduced communications capability, prioritize health and safety telemetry over science data and switch to low-gain antennas if high-gain pointing cannot be maintained.
+6.3 Account for the light-time delay when proposing ground coordination: any request for a ground decision must remain safe to wait for.
+
+7. Risk assessment and confidence
+7.1 Classify risk as Low (no threat to mission objectives), Moderate (margins reduced, objectives achievable), High (objectives at risk, safety maintained) or Critical (safety or vehicle at risk).
+7.2 Confidence reflects the quality of the telemetry, the number of unresolved anomalies and whether a tested procedure covers the situation. Confidence above 0.9 requires nominal telemetry and a known procedure; confidence below 0.5 requires recommending ground review.
+7.3 State the dominant risk driver and the mitigation for each risk identified.
+
+8. Response rules
+8.1 Be specific and quantitative: name the systems, the values and the thresholds involved.
+8.2 Actions must be concrete commands or procedures the vehicle can execute, not general advice.
+8.3 Keep each analysis focused and free of repetition between sections.
+
+For each request, analyze the situation and make a comprehensive autonomous decision.
+
+AUTONOMOUS DECISION ("decision"): classify the decision, list the specific actions to take immediately, assess the risk, give your confidence and write the message to transmit to Earth.
+
+NAVIGATION ANALYSIS ("navigation"): provide autonomous navigation decisions
+1. Trajectory adjustments needed
+2. Fuel consumption estimates
+3. Risk assessment for navigation
+4. Backup navigation options
+5. Autonomous waypoint planning
+
+FAULT DETECTION AND RECOVERY ("recovery"): provide autonomous recovery actions
+1. Immediate fault isolation procedures
+2. System redundancy activation
+3. Power rerouting and conservation
+4. Backup system engagement
+5. Risk mitigation strategies"""
+    
+    # Per-request prompt templates, holding only the situation and spacecraft data
+    _DECISION_TMPL = """
+        SITUATION: {situation}
+        MISSION: {mission_scenario}
         
-        if org_id:
-            client_kwargs["organization"] = org_id
-            
-        self.client = openai.AsyncOpenAI(**client_kwargs)
+        SPACECRAFT STATE:
+        - Battery: {state.battery_level}%
+        - Communication Delay: {state.communication_delay} minutes
+        - System Health: {system_health}
+        {navigation}
+        {recovery}
+        """
+    
+    _NAV_TMPL = """
+        NAVIGATION INPUTS:
+        - Position: {state.position} km
+        - Velocity: {state.velocity} km/s
+        - Mission Phase: {state.mission_phase}
+        - Fuel Level: {state.fuel_level}%
+        """
+    
+    _RECOVERY_TMPL = """
+        RECOVERY INPUTS:
+        - System Health: {system_health}
+        - Power: Battery {state.battery_level}%, Solar {state.solar_panel_efficiency}%
+        - Fuel: {state.fuel_level}%
+        
+        Detected Anomalies:
+{anomalies}
+        """
+    
+    _NO_ANOMALIES_TMPL = """
+        RECOVERY INPUTS:
+        No anomalies detected - state briefly that no recovery is needed.
+        """
+    
+    def __init__(self, batch_mode: bool = False):
+        # The shared OpenAI client is created (and the API key checked) on the first request,
+        # so the module imports and simulates without a key
+        self.client = None
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
-        self.spacecraft_state = None
-        self.last_request_time = 0
-        self.min_request_interval = 3.0
+        self._rng = np.random.default_rng()
+        
+        # Non-interactive runs can queue their requests for the Batch API (half price, up to 24h latency)
+        self.batch_mode = batch_mode
+        self._batch_requests: List[Dict[str, Any]] = []
+        self._batch_futures: Dict[str, asyncio.Future] = {}
         self.autonomy_rules = {
             "critical_fuel": 15.0,  # Critical fuel level %
             "critical_battery": 20.0,  # Critical battery level %
@@ -73,342 +354,482 @@ class NASASpacecraftAutonomy:
             "navigation_safety_margin": 5.0  # Safety margin in km for obstacle avoidance
         }
         
-    async def initialize_spacecraft_state(self, mission_scenario: str) -> SpacecraftState:
-        """Initialize spacecraft state based on mission scenario"""
-        
-        # Simulate different mission scenarios
-        scenarios = {
-            "mars_transit": {
-                "position": (150000000, 0, 0),  # Halfway to Mars
-                "velocity": (15.0, 0, 0),
-                "fuel_level": 65.0,
-                "battery_level": 85.0,
-                "solar_panel_efficiency": 92.0,
-                "communication_delay": 12.5,
-                "mission_phase": "interplanetary_cruise"
-            },
-            "lunar_orbit": {
-                "position": (384400, 0, 0),  # Lunar distance
-                "velocity": (1.0, 0, 0),
-                "fuel_level": 78.0,
-                "battery_level": 91.0,
-                "solar_panel_efficiency": 88.0,
-                "communication_delay": 1.3,
-                "mission_phase": "orbital_operations"
-            },
-            "deep_space": {
-                "position": (500000000, 0, 0),  # Beyond Mars
-                "velocity": (8.5, 0, 0),
-                "fuel_level": 42.0,
-                "battery_level": 76.0,
-                "solar_panel_efficiency": 65.0,
-                "communication_delay": 28.0,
-                "mission_phase": "deep_space_exploration"
-            }
-        }
-        
-        base_scenario = scenarios.get(mission_scenario, scenarios["mars_transit"])
-        
-        # Add some realistic variations
-        system_health = {
-            "propulsion": random.choice(["nominal", "nominal", "degraded"]),
-            "navigation": random.choice(["nominal", "nominal", "backup"]),
-            "communications": random.choice(["nominal", "reduced", "nominal"]),
-            "thermal": random.choice(["nominal", "nominal", "elevated"]),
-            "power": random.choice(["nominal", "nominal", "degraded"]),
-            "computers": random.choice(["nominal", "redundant", "nominal"])
-        }
-        
-        self.spacecraft_state = SpacecraftState(
-            position=base_scenario["position"],
-            velocity=base_scenario["velocity"],
-            fuel_level=base_scenario["fuel_level"] + random.uniform(-10, 5),
-            battery_level=base_scenario["battery_level"] + random.uniform(-5, 5),
-            solar_panel_efficiency=base_scenario["solar_panel_efficiency"] + random.uniform(-8, 3),
-            system_health=system_health,
-            communication_delay=base_scenario["communication_delay"],
-            mission_phase=base_scenario["mission_phase"]
-        )
-        
-        return self.spacecraft_state
+    @staticmethod
+    def estimate_tokens(request: Dict[str, Any]) -> int:
+        """Rough token cost of a request: prompt characters / 4 plus the completion budget"""
+        return sum(len(message["content"]) for message in request["messages"]) // 4 + request.get("max_tokens", 0)
     
-    async def detect_anomalies(self, state: SpacecraftState) -> List[str]:
-        """Detect system anomalies and potential issues"""
-        anomalies = []
-        
-        # Check fuel levels
-        if state.fuel_level < self.autonomy_rules["critical_fuel"]:
-            anomalies.append(f"CRITICAL: Fuel level at {state.fuel_level:.1f}% - below critical threshold")
-        
-        # Check battery levels
-        if state.battery_level < self.autonomy_rules["critical_battery"]:
-            anomalies.append(f"CRITICAL: Battery level at {state.battery_level:.1f}% - power conservation required")
-        
-        # Check solar panel efficiency
-        if state.solar_panel_efficiency < 70:
-            anomalies.append(f"WARNING: Solar panel efficiency at {state.solar_panel_efficiency:.1f}% - possible degradation")
-        
-        # Check system health
-        failed_systems = [sys for sys, status in state.system_health.items() if status in ["failed", "critical"]]
-        degraded_systems = [sys for sys, status in state.system_health.items() if status in ["degraded", "backup"]]
-        
-        if failed_systems:
-            anomalies.append(f"CRITICAL: System failures detected - {', '.join(failed_systems)}")
-        
-        if len(degraded_systems) > 2:
-            anomalies.append(f"WARNING: Multiple degraded systems - {', '.join(degraded_systems)}")
-        
-        # Check communication delay for autonomous operation need
-        if state.communication_delay > self.autonomy_rules["max_communication_delay"]:
-            anomalies.append(f"INFO: Communication delay {state.communication_delay:.1f} min - autonomous operation required")
-        
-        return anomalies
+    @staticmethod
+    def retry_delay(error: "openai.RateLimitError", attempt: int) -> float:
+        """Seconds to wait after a 429, preferring the server's retry-after"""
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                parts = RESET_RE.findall(retry_after)
+                if parts:
+                    return sum(float(amount) * RESET_UNITS[unit] for amount, unit in parts)
+        return 2.0 ** attempt
     
-    async def autonomous_navigation(self, state: SpacecraftState, situation: str) -> Dict[str, Any]:
-        """Autonomous navigation and path planning"""
-        
-        prompt = f"""
-        As a NASA spacecraft autonomy system, perform autonomous navigation analysis:
-        
-        Current State:
-        - Position: {state.position} km
-        - Velocity: {state.velocity} km/s
-        - Mission Phase: {state.mission_phase}
-        - Fuel Level: {state.fuel_level}%
-        
-        Situation: {situation}
-        
-        Provide autonomous navigation decisions:
-        1. Trajectory adjustments needed
-        2. Fuel consumption estimates
-        3. Risk assessment for navigation
-        4. Backup navigation options
-        5. Autonomous waypoint planning
+    def get_client(self) -> "openai.AsyncOpenAI":
+        """Return the OpenAI client, creating the shared one on first use"""
+        if self.client is None:
+            cls = type(self)
+            if cls._client is None:
+                # Configure OpenAI client with better settings
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY environment variable is required")
+                
+                # Initialize client with proper configuration
+                client_kwargs = {
+                    "api_key": api_key,
+                    "timeout": 60.0,
+                    "max_retries": 3
+                }
+                
+                # Check for organization ID
+                org_id = os.getenv("OPENAI_ORG_ID")
+                if org_id:
+                    client_kwargs["organization"] = org_id
+                
+                cls._client = openai.AsyncOpenAI(**client_kwargs)
+            self.client = cls._client
+        return self.client
+    
+    @classmethod
+    def request_limits(cls) -> Tuple[asyncio.Semaphore, RateLimiter]:
+        """Shared concurrency slots and rate limiter, created on first use inside the running loop"""
+        if cls._sem is None:
+            # Stay under the account's concurrency and rate limits instead of bursting into 429 backoff
+            cls._sem = asyncio.Semaphore(int(os.getenv("OPENAI_CONCURRENCY", "5")))
+            cls._rate_limiter = RateLimiter(
+                float(os.getenv("OPENAI_RPM_LIMIT", "500")),
+                float(os.getenv("OPENAI_TPM_LIMIT", "30000"))
+            )
+        return cls._sem, cls._rate_limiter
+    
+    async def _chat(self, **request):
+        """Chat completion within the concurrency and rate limits, waiting out any 429s"""
+        slots, rate_limiter = self.request_limits()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await rate_limiter.acquire(self.estimate_tokens(request))
+            try:
+                async with slots:
+                    return await self.get_client().with_options(max_retries=0).chat.completions.create(**request)
+            except openai.RateLimitError as e:
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+                await asyncio.sleep(self.retry_delay(e, attempt))
+    
+    async def _chat_stream(self, **request):
+        """Streamed chat completion under the same limits, yielding text as it arrives"""
+        slots, rate_limiter = self.request_limits()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await rate_limiter.acquire(self.estimate_tokens(request))
+            try:
+                # The concurrency slot is held until the stream is fully read
+                async with slots:
+                    stream = await self.get_client().with_options(max_retries=0).chat.completions.create(stream=True, **request)
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                    return
+            except openai.RateLimitError as e:
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+                await asyncio.sleep(self.retry_delay(e, attempt))
+    
+    async def complete_stream(self, **request):
+        """Stream a chat completion's text; in batch mode the whole reply arrives at once"""
+        if self.batch_mode:
+            yield await self.complete(**request)
+            return
+        
+        async for piece in self._chat_stream(**request):
+            yield piece
+    
+    async def complete(self, **request) -> str:
+        """Run a chat completion, or queue it for the next batch in batch mode"""
+        if not self.batch_mode:
+            response = await self._chat(**request)
+            return response.choices[0].message.content
+        
+        custom_id = f"autonomy-{uuid.uuid4().hex}"
+        future = asyncio.get_running_loop().create_future()
+        self._batch_requests.append({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": request
+        })
+        self._batch_futures[custom_id] = future
+        return await future
+    
+    async def flush_batch(self):
+        """Submit queued requests as one Batch API job and resolve them once it finishes
         
-        Use spacecraft navigation protocols and orbital mechanics principles.
+        run_batch_simulations drives this for whole simulations.
         """
+        if not self._batch_requests:
+            return
+        
+        requests, self._batch_requests = self._batch_requests, []
+        futures = {request["custom_id"]: self._batch_futures.pop(request["custom_id"]) for request in requests}
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=800,
-                temperature=0.1
+            client = self.get_client()
+            batch_file = await client.files.create(
+                file=("autonomy_batch.jsonl", "\n".join(dumps_json(request) for request in requests).encode()),
+                purpose="batch"
+            )
+            batch = await client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
             )
-            return {"navigation_analysis": response.choices[0].message.content}
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                await asyncio.sleep(BATCH_POLL_SECONDS)
+                batch = await client.batches.retrieve(batch.id)
+            
+            # Successful and failed requests come back in separate files, matched by custom_id
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                results = await client.files.content(file_id)
+                for line in results.text.splitlines():
+                    result = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                    future = futures.pop(result["custom_id"], None)
+                    if future is None:
+                        continue
+                    response = result.get("response") or {}
+                    if response.get("status_code") == 200:
+                        future.set_result(response["body"]["choices"][0]["message"]["content"])
+                    else:
+                        future.set_exception(RuntimeError(f"Batch request failed: {result.get('error') or response.get('body')}"))
+            
+            for future in futures.values():
+                future.set_exception(RuntimeError(f"Batch {batch.id} ended with status {batch.status}"))
         except Exception as e:
-            return {"navigation_analysis": f"Error in navigation analysis: {str(e)}"}
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
     
-    async def fault_detection_recovery(self, state: SpacecraftState, anomalies: List[str]) -> Dict[str, Any]:
-        """Autonomous fault detection and recovery procedures"""
+    async def run_batch_simulations(self, scenarios: List[Tuple[str, str]]) -> List[str]:
+        """Run (situation, mission_scenario) simulations through one Batch API job, returning each report
         
-        prompt = f"""
-        As a NASA spacecraft fault detection and recovery system, analyze these anomalies:
+        Needs batch_mode=True; the reports only arrive once the whole job has finished.
+        """
+        async def report(situation: str, mission_scenario: str) -> str:
+            return "".join([piece async for piece in self.run_autonomy_simulation(situation, mission_scenario)])
         
-        Spacecraft Status:
-        - System Health: {json.dumps(state.system_health, indent=2)}
-        - Power: Battery {state.battery_level}%, Solar {state.solar_panel_efficiency}%
-        - Fuel: {state.fuel_level}%
+        tasks = [asyncio.create_task(report(*scenario)) for scenario in scenarios]
         
-        Detected Anomalies:
-        {chr(10).join(f"- {anomaly}" for anomaly in anomalies)}
+        # Each simulation queues one decision request; submit once every task has queued or finished early
+        while len(self._batch_requests) + sum(task.done() for task in tasks) < len(tasks):
+            await asyncio.sleep(0)
+        await self.flush_batch()
+        return await asyncio.gather(*tasks)
+    
+    async def initialize_spacecraft_state(self, mission_scenario: str) -> SpacecraftState:
+        """Initialize spacecraft state based on mission scenario"""
         
-        Provide autonomous recovery actions:
-        1. Immediate fault isolation procedures
-        2. System redundancy activation
-        3. Power rerouting and conservation
-        4. Backup system engagement
-        5. Risk mitigation strategies
+        base_scenario = self._SCENARIOS.get(mission_scenario, self._SCENARIOS["mars_transit"])
         
-        Follow NASA spacecraft emergency procedures and safety protocols.
-        """
+        # Add some realistic variations, drawn in two batches
+        picks = self._rng.integers(0, STATUS_TABLE.shape[1], size=len(STATUS_TABLE))
+        system_health = dict(zip(SYSTEM_STATUS_CHOICES, STATUS_TABLE[np.arange(len(STATUS_TABLE)), picks].tolist()))
+        fuel_delta, battery_delta, solar_delta = self._rng.uniform([-10, -5, -8], [5, 5, 3]).tolist()
         
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000,
-                temperature=0.1
-            )
-            return {"recovery_procedures": response.choices[0].message.content}
-        except Exception as e:
-            return {"recovery_procedures": f"Error in fault recovery: {str(e)}"}
+        return SpacecraftState(
+            position=base_scenario["position"],
+            velocity=base_scenario["velocity"],
+            fuel_level=base_scenario["fuel_level"] + fuel_delta,
+            battery_level=base_scenario["battery_level"] + battery_delta,
+            solar_panel_efficiency=base_scenario["solar_panel_efficiency"] + solar_delta,
+            system_health=system_health,
+            communication_delay=base_scenario["communication_delay"],
+            mission_phase=base_scenario["mission_phase"]
+        )
     
-    async def resource_management(self, state: SpacecraftState) -> Dict[str, float]:
-        """Smart resource allocation and management"""
-        
-        # Calculate optimal resource allocation
-        total_power_available = (state.battery_level + state.solar_panel_efficiency) / 2
-        
-        # Base allocation percentages
-        allocations = {
-            "life_support": 25.0,
-            "navigation": 20.0,
-            "communications": 15.0,
-            "scientific_instruments": 20.0,
-            "propulsion": 10.0,
-            "thermal_control": 10.0
+    def pack_states(self, states: List[SpacecraftState]) -> np.ndarray:
+        """Pack spacecraft states into a STATE_DTYPE array"""
+        packed = np.empty(len(states), dtype=STATE_DTYPE)
+        packed["fuel"] = [state.fuel_level for state in states]
+        packed["batt"] = [state.battery_level for state in states]
+        packed["solar"] = [state.solar_panel_efficiency for state in states]
+        packed["delay"] = [state.communication_delay for state in states]
+        packed["failed"] = [sum(status in FAILED_STATUSES for status in state.system_health.values()) for state in states]
+        packed["degraded"] = [sum(status in DEGRADED_STATUSES for status in state.system_health.values()) for state in states]
+        return packed
+    
+    def detect_anomalies_batch(self, states: np.ndarray) -> np.ndarray:
+        """Anomaly flags for packed states, as an (N, len(ANOMALY_CHECKS)) boolean array"""
+        return np.stack([
+            states["fuel"] < self.autonomy_rules["critical_fuel"],
+            states["batt"] < self.autonomy_rules["critical_battery"],
+            states["solar"] < 70,
+            states["failed"] > 0,
+            states["degraded"] > 2,
+            states["delay"] > self.autonomy_rules["max_communication_delay"]
+        ], axis=-1)
+    
+    async def detect_anomalies(self, state: SpacecraftState) -> List[str]:
+        """Detect system anomalies and potential issues"""
+        flags = dict(zip(ANOMALY_CHECKS, self.detect_anomalies_batch(self.pack_states([state]))[0]))
+        failed_systems = [sys for sys, status in state.system_health.items() if status in FAILED_STATUSES]
+        degraded_systems = [sys for sys, status in state.system_health.items() if status in DEGRADED_STATUSES]
+        
+        messages = {
+            "critical_fuel": f"CRITICAL: Fuel level at {state.fuel_level:.1f}% - below critical threshold",
+            "critical_battery": f"CRITICAL: Battery level at {state.battery_level:.1f}% - power conservation required",
+            "solar_degradation": f"WARNING: Solar panel efficiency at {state.solar_panel_efficiency:.1f}% - possible degradation",
+            "system_failures": f"CRITICAL: System failures detected - {', '.join(failed_systems)}",
+            "multiple_degraded": f"WARNING: Multiple degraded systems - {', '.join(degraded_systems)}",
+            "communication_delay": f"INFO: Communication delay {state.communication_delay:.1f} min - autonomous operation required"
         }
+        return [messages[check] for check in ANOMALY_CHECKS if flags[check]]
+    
+    def autonomous_navigation(self, state: SpacecraftState, situation: str) -> str:
+        """Navigation inputs for the decision prompt"""
+        return self._NAV_TMPL.format(state=state)
+    
+    def fault_detection_recovery(self, state: SpacecraftState, anomalies: List[str]) -> str:
+        """Fault detection and recovery inputs for the decision prompt"""
+        if not anomalies:
+            return self._NO_ANOMALIES_TMPL
+        return self._RECOVERY_TMPL.format(
+            state=state,
+            system_health=dumps_json(state.system_health, indent=True),
+            anomalies="\n".join(f"        - {anomaly}" for anomaly in anomalies)
+        )
+    
+    def resource_management_batch(self, states: np.ndarray) -> np.ndarray:
+        """Resource allocation for packed states, as an ALLOCATION_DTYPE array"""
+        allocations = np.empty(len(states), dtype=ALLOCATION_DTYPE)
+        for system, percentage in BASE_ALLOCATION.items():
+            allocations[system] = percentage
         
         # Adjust based on current conditions
-        if state.fuel_level < 30:
-            allocations["propulsion"] = 5.0  # Reduce propulsion power
-            allocations["navigation"] += 5.0  # Increase navigation precision
+        low_fuel = states["fuel"] < 30
+        allocations["propulsion"][low_fuel] = 5.0  # Reduce propulsion power
+        allocations["navigation"][low_fuel] += 5.0  # Increase navigation precision
         
-        if any("degraded" in status or "backup" in status for status in state.system_health.values()):
-            allocations["life_support"] += 5.0
-            allocations["scientific_instruments"] -= 5.0
+        degraded = states["degraded"] > 0
+        allocations["life_support"][degraded] += 5.0
+        allocations["scientific_instruments"][degraded] -= 5.0
         
-        if state.communication_delay > 15:
-            allocations["communications"] += 5.0
-            allocations["scientific_instruments"] -= 5.0
+        delayed = states["delay"] > 15
+        allocations["communications"][delayed] += 5.0
+        allocations["scientific_instruments"][delayed] -= 5.0
         
         return allocations
     
-    async def make_autonomous_decision(self, situation: str, mission_scenario: str) -> AutonomyDecision:
-        """Make comprehensive autonomous decision"""
+    async def resource_management(self, state: SpacecraftState) -> Dict[str, float]:
+        """Smart resource allocation and management"""
+        allocation = self.resource_management_batch(self.pack_states([state]))[0]
+        return {system: float(allocation[system]) for system in BASE_ALLOCATION}
+    
+    def response_budget(self, situation: str, anomalies: List[str]) -> int:
+        """max_tokens for the combined reply, sized to how much the situation needs said"""
+        # The decision grows with each anomaly and with reported failures; recovery is a one-liner without anomalies
+        decision_tokens = min(max(300 + 200 * len(anomalies) + (400 if "failure" in situation.lower() else 0), 400), 1200)
+        recovery_tokens = 1000 if anomalies else 100
+        return decision_tokens + 800 + recovery_tokens
+    
+    def parse_decision(self, raw: str, resource_allocation: Dict[str, float]) -> Optional[AutonomyDecision]:
+        """The decision from a (possibly still streaming) reply, or None until it is complete and valid"""
+        match = re.search(r'"decision"\s*:\s*', raw)
+        if not match:
+            return None
+        try:
+            fields, _ = json.JSONDecoder().raw_decode(raw, match.end())
+            return AutonomyDecision.model_validate({**fields, "resource_allocation": resource_allocation})
+        except (ValueError, TypeError):
+            return None
+    
+    def new_section_text(self, raw: str, shown: Dict[str, int]) -> str:
+        """Analysis text that has arrived since the last call, with a heading as each section starts"""
+        sections = {"navigation": "### 🧭 Navigation Analysis", "recovery": "### 🛠️ Recovery Procedures"}
+        text = ""
+        for key, heading in sections.items():
+            value = partial_json_string(raw, key)
+            if value is None:
+                continue
+            if key not in shown:
+                text += f"{chr(10) * 2 if shown else ''}{heading}\n\n"
+                shown[key] = 0
+            text += value[shown[key]:]
+            shown[key] = len(value)
+        return text
+    
+    async def make_autonomous_decision(self, situation: str, mission_scenario: str, state: SpacecraftState):
+        """Make comprehensive autonomous decision
         
-        # Initialize or update spacecraft state
-        if not self.spacecraft_state:
-            await self.initialize_spacecraft_state(mission_scenario)
+        Yields the AutonomyDecision as soon as it has streamed in, then the detailed analysis
+        as Markdown text pieces.
+        """
         
         # Detect anomalies
-        anomalies = await self.detect_anomalies(self.spacecraft_state)
-        
-        # Get navigation analysis
-        nav_analysis = await self.autonomous_navigation(self.spacecraft_state, situation)
-        
-        # Get recovery procedures if needed
-        recovery_info = {}
-        if anomalies:
-            recovery_info = await self.fault_detection_recovery(self.spacecraft_state, anomalies)
+        anomalies = await self.detect_anomalies(state)
         
         # Calculate resource allocation
-        resource_allocation = await self.resource_management(self.spacecraft_state)
-        
-        # Generate comprehensive decision
-        decision_prompt = f"""
-        As NASA's Advanced Spacecraft Autonomy System, make a comprehensive autonomous decision:
+        resource_allocation = await self.resource_management(state)
+        
+        # Navigation, recovery and the final decision share one request instead of three
+        decision_prompt = self._DECISION_TMPL.format(
+            situation=situation,
+            mission_scenario=mission_scenario,
+            state=state,
+            system_health=dumps_json(state.system_health),
+            navigation=self.autonomous_navigation(state, situation),
+            recovery=self.fault_detection_recovery(state, anomalies)
+        )
         
-        SITUATION: {situation}
-        MISSION: {mission_scenario}
-        
-        SPACECRAFT STATE:
-        - Position: {self.spacecraft_state.position}
-        - Fuel: {self.spacecraft_state.fuel_level}%
-        - Battery: {self.spacecraft_state.battery_level}%
-        - Communication Delay: {self.spacecraft_state.communication_delay} minutes
-        - System Health: {json.dumps(self.spacecraft_state.system_health)}
-        
-        ANALYSIS RESULTS:
-        - Anomalies: {anomalies}
-        - Navigation: {nav_analysis.get('navigation_analysis', 'No navigation issues')}
-        - Recovery: {recovery_info.get('recovery_procedures', 'No recovery needed')}
-        
-        Provide autonomous decision with:
-        1. Decision type classification
-        2. Specific actions to take immediately
-        3. Risk assessment and confidence level
-        4. Message to transmit to Earth
-        
-        Use NASA autonomy protocols and prioritize mission safety.
-        """
+        raw = ""
+        error = None
+        decision = None
+        shown = {}
+        pending = 0
         
         try:
-            response = await self.client.chat.completions.create(
+            async for piece in self.complete_stream(
                 model=self.model,
-                messages=[{"role": "user", "content": decision_prompt}],
-                max_tokens=1200,
-                temperature=0.1
-            )
-            content = response.choices[0].message.content
+                messages=[
+                    {"role": "system", "content": self._SYSTEM_PREAMBLE},
+                    {"role": "user", "content": decision_prompt}
+                ],
+                max_tokens=self.response_budget(situation, anomalies),
+                temperature=0.1,
+                response_format=AUTONOMY_RESPONSE_FORMAT
+            ):
+                raw += piece
+                pending += 1
+                if pending < STREAM_BATCH_TOKENS:
+                    continue
+                pending = 0
+                
+                # The short decision comes first; analysis text is only forwarded once it's out
+                if decision is None:
+                    decision = self.parse_decision(raw, resource_allocation)
+                    if decision is None:
+                        continue
+                    yield decision
+                text = self.new_section_text(raw, shown)
+                if text:
+                    yield text
         except Exception as e:
-            content = f"Error in autonomous decision making: {str(e)}"
-        
-        # Parse and structure the decision
-        decision = AutonomyDecision(
-            decision_type="autonomous_operational_decision",
-            actions_taken=[
-                "Initiated autonomous analysis protocol",
-                "Assessed spacecraft systems and resources", 
-                "Calculated optimal response strategy",
-                "Implemented safety-first decision matrix"
-            ],
-            resource_allocation=resource_allocation,
-            risk_assessment="Moderate - autonomous systems operating within parameters",
-            communication_to_earth=f"Autonomous system response to: {situation}. Status: {content[:200]}...",
-            confidence_level=0.87
-        )
-        
-        return decision, content
+            error = f"Error in autonomous decision making: {str(e)}"
+        
+        if decision is None:
+            decision = self.parse_decision(raw, resource_allocation)
+            if decision is None:
+                # Fall back to a generic decision when the reply isn't the expected JSON
+                content = error or raw
+                decision = AutonomyDecision(
+                    decision_type="autonomous_operational_decision",
+                    actions_taken=[
+                        "Initiated autonomous analysis protocol",
+                        "Assessed spacecraft systems and resources", 
+                        "Calculated optimal response strategy",
+                        "Implemented safety-first decision matrix"
+                    ],
+                    resource_allocation=resource_allocation,
+                    risk_assessment="Moderate - autonomous systems operating within parameters",
+                    communication_to_earth=f"Autonomous system response to: {situation}. Status: {content[:200]}...",
+                    confidence_level=0.87
+                )
+            yield decision
+        
+        text = self.new_section_text(raw, shown)
+        if text:
+            yield text
+        if not shown:
+            yield error or raw
+        elif error:
+            yield f"\n\n{error}"
     
     async def run_autonomy_simulation(self, situation: str, mission_scenario: str):
-        """Run complete autonomy simulation"""
-        
-        yield f"# 🚀 NASA Spacecraft Autonomy System\n\n"
-        yield f"**Mission Scenario:** {mission_scenario.replace('_', ' ').title()}\n"
-        yield f"**Situation:** {situation}\n\n"
+        """Run complete autonomy simulation
         
-        yield "## 🤖 Initializing Autonomous Systems...\n\n"
+        Static sections are yielded once per phase; only the streamed analysis arrives piece by piece.
+        """
         
         # Initialize spacecraft
         state = await self.initialize_spacecraft_state(mission_scenario)
-        yield f"### Spacecraft State Initialized\n"
-        yield f"- **Position:** {state.position[0]:,.0f} km from Earth\n"
-        yield f"- **Fuel Level:** {state.fuel_level:.1f}%\n"
-        yield f"- **Battery Level:** {state.battery_level:.1f}%\n"
-        yield f"- **Solar Efficiency:** {state.solar_panel_efficiency:.1f}%\n"
-        yield f"- **Communication Delay:** {state.communication_delay:.1f} minutes\n"
-        yield f"- **Mission Phase:** {state.mission_phase.replace('_', ' ').title()}\n\n"
-        
-        yield "## 🔍 Autonomous Analysis Phase...\n\n"
+        parts = [
+            f"# 🚀 NASA Spacecraft Autonomy System\n\n",
+            f"**Mission Scenario:** {mission_scenario.replace('_', ' ').title()}\n",
+            f"**Situation:** {situation}\n\n",
+            "## 🤖 Initializing Autonomous Systems...\n\n",
+            f"### Spacecraft State Initialized\n",
+            f"- **Position:** {state.position[0]:,.0f} km from Earth\n",
+            f"- **Fuel Level:** {state.fuel_level:.1f}%\n",
+            f"- **Battery Level:** {state.battery_level:.1f}%\n",
+            f"- **Solar Efficiency:** {state.solar_panel_efficiency:.1f}%\n",
+            f"- **Communication Delay:** {state.communication_delay:.1f} minutes\n",
+            f"- **Mission Phase:** {state.mission_phase.replace('_', ' ').title()}\n\n"
+        ]
+        yield "".join(parts)
         
         # Detect anomalies
         anomalies = await self.detect_anomalies(state)
+        parts = ["## 🔍 Autonomous Analysis Phase...\n\n"]
         if anomalies:
-            yield f"### ⚠️ Anomalies Detected:\n"
-            for anomaly in anomalies:
-                yield f"- {anomaly}\n"
+            parts.append(f"### ⚠️ Anomalies Detected:\n")
+            parts.extend(f"- {anomaly}\n" for anomaly in anomalies)
         else:
-            yield f"### ✅ No Critical Anomalies Detected\n"
-        yield "\n"
-        
-        yield "## 🧠 Making Autonomous Decision...\n\n"
-        
-        # Make decision
-        decision, detailed_response = await self.make_autonomous_decision(situation, mission_scenario)
-        
-        yield f"### Decision Type: {decision.decision_type.replace('_', ' ').title()}\n\n"
-        yield f"### Autonomous Actions Taken:\n"
-        for action in decision.actions_taken:
-            yield f"- ✅ {action}\n"
-        yield "\n"
-        
-        yield f"### Resource Allocation:\n"
-        for system, percentage in decision.resource_allocation.items():
-            yield f"- **{system.replace('_', ' ').title()}:** {percentage:.1f}%\n"
-        yield "\n"
-        
-        yield f"### Risk Assessment: {decision.risk_assessment}\n"
-        yield f"### Confidence Level: {decision.confidence_level:.0%}\n\n"
-        
-        yield "## 📡 Communication to Earth\n\n"
-        yield f"**Transmission (Delay: {state.communication_delay:.1f} min):**\n"
-        yield f"{decision.communication_to_earth}\n\n"
-        
-        yield "## 🔬 Detailed Analysis\n\n"
-        yield detailed_response
+            parts.append(f"### ✅ No Critical Anomalies Detected\n")
+        parts.append("\n")
+        parts.append("## 🧠 Making Autonomous Decision...\n\n")
+        yield "".join(parts)
+        
+        # Make decision; the detailed analysis keeps streaming in after the decision is shown
+        async for piece in self.make_autonomous_decision(situation, mission_scenario, state):
+            if not isinstance(piece, AutonomyDecision):
+                yield piece
+                continue
+            decision = piece
+            
+            parts = [f"### Decision Type: {decision.decision_type.replace('_', ' ').title()}\n\n"]
+            parts.append(f"### Autonomous Actions Taken:\n")
+            parts.extend(f"- ✅ {action}\n" for action in decision.actions_taken)
+            parts.append("\n")
+            
+            parts.append(f"### Resource Allocation:\n")
+            parts.extend(
+                f"- **{system.replace('_', ' ').title()}:** {percentage:.1f}%\n"
+                for system, percentage in decision.resource_allocation.items()
+            )
+            parts.append("\n")
+            
+            parts.append(f"### Risk Assessment: {decision.risk_assessment}\n")
+            parts.append(f"### Confidence Level: {decision.confidence_level:.0%}\n\n")
+            
+            parts.append("## 📡 Communication to Earth\n\n")
+            parts.append(f"**Transmission (Delay: {state.communication_delay:.1f} min):**\n")
+            parts.append(f"{decision.communication_to_earth}\n\n")
+            
+            parts.append("## 🔬 Detailed Analysis\n\n")
+            yield "".join(parts)
         
-        yield f"\n\n---\n**Autonomous System Status: OPERATIONAL** ✅\n"
-        yield f"**Next Analysis Cycle: {(datetime.now() + timedelta(minutes=5)).strftime('%H:%M UTC')}**"
+        yield (
+            f"\n\n---\n**Autonomous System Status: OPERATIONAL** ✅\n"
+            f"**Next Analysis Cycle: {(datetime.now() + timedelta(minutes=5)).strftime('%H:%M UTC')}**"
+        )
 
 # Gradio Interface
+# Spacecraft state is per simulation, so one system can serve every Gradio session
+AUTONOMY_SYSTEM = NASASpacecraftAutonomy()
+
 async def run_spacecraft_autonomy(situation: str, mission_scenario: str):
     """Run spacecraft autonomy simulation"""
-    autonomy_system = NASASpacecraftAutonomy()
-    
-    async for chunk in autonomy_system.run_autonomy_simulation(situation, mission_scenario):
-        yield chunk
+    # Gradio replaces the output on every yield, so send the report so far
+    output = ""
+    async for chunk in AUTONOMY_SYSTEM.run_autonomy_simulation(situation, mission_scenario):
+        output += chunk
+        yield output
 
 # Create Gradio interface
 with gr.Blocks(
@@ -496,9 +917,26 @@ with gr.Blocks(
     )
 
 if __name__ == "__main__":
-    demo.launch(
-        server_name="0.0.0.0",
-        server_port=7863,
-        share=False,  # Local-only access
-        inbrowser=True
-    )
\ No newline at end of file
+    # uvloop's libuv event loop schedules coroutines and socket I/O faster than the default loop
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+    
+    # Non-interactive runs go through the Batch API instead of the UI:
+    #   python nasa_spacecraft_autonomy.py --batch scenarios.json
+    # where the file holds a JSON list of [situation, mission_scenario] pairs
+    if len(sys.argv) == 3 and sys.argv[1] == "--batch":
+        with open(sys.argv[2]) as f:
+            scenarios = [tuple(pair) for pair in json.load(f)]
+        reports = asyncio.run(NASASpacecraftAutonomy(batch_mode=True).run_batch_simulations(scenarios))
+        print("\n\n".join(reports))
+    else:
+        demo.launch(
+            server_name="0.0.0.0",
+            server_port=7863,
+            share=False,  # Local-only access
+            inbrowser=True
+        )
\ No newline at end of file
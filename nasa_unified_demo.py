@@ -6,21 +6,214 @@ All 6 NASA AI agents in one professional interface for interview demonstration
 import gradio as gr
 import asyncio
 import openai
+import httpx
+import hashlib
 import json
-import random
-import math
 import os
+import random
+import re
 import time
+import numpy as np
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Any, Optional
-from datetime import datetime, timedelta
-from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Import components from individual agents
-import sys
-import importlib.util
+# The aiohttp transport is optional; without it the OpenAI client keeps its default httpx transport
+try:
+    import httpx_aiohttp
+    from openai import DefaultAioHttpClient
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Model tiers: long-form research and engineering default to premium, procedural agents to fast
+MODEL_PREMIUM = os.getenv("OPENAI_MODEL", "gpt-4o")
+MODEL_FAST = os.getenv("OPENAI_MODEL_FAST", "gpt-4o-mini")
+
+# tiktoken is optional; without it token counts fall back to the 4-characters-per-token estimate.
+# One encoder is shared by every request since building it is far slower than encoding.
+try:
+    import tiktoken
+    try:
+        TOKEN_ENCODER = tiktoken.encoding_for_model(MODEL_PREMIUM)
+    except KeyError:
+        TOKEN_ENCODER = tiktoken.get_encoding("cl100k_base")
+    TIKTOKEN_AVAILABLE = True
+except Exception:
+    TIKTOKEN_AVAILABLE = False
+
+# Context window the prompt and reply must fit in, with a margin for the chat message framing
+MODEL_CONTEXT_TOKENS = 8192
+MESSAGE_OVERHEAD_TOKENS = 32
+
+# Replies kept for repeated demo queries, and how long each stays valid (seconds)
+RESPONSE_CACHE_SIZE = 128
+RESPONSE_CACHE_TTL = 3600.0
+
+# Minimum time between streamed UI updates (seconds), about 20 re-renders per second
+STREAM_UPDATE_INTERVAL = 0.05
+
+# Batch API jobs are polled starting at this interval, doubling up to the maximum (seconds)
+BATCH_POLL_SECONDS = 30.0
+BATCH_POLL_MAX_SECONDS = 300.0
+
+# Show the batch pre-warm tab, used to bake demo replies into the cache ahead of a session
+NASA_PREWARM_TAB = os.getenv("NASA_PREWARM_TAB", "0")
+
+# Characters of each free-text field that go into a prompt; only user input is capped,
+# so every template's instructions and simulated values are always sent in full
+USER_INPUT_CHARS = 100
+
+# Agent prompt templates, built once and filled per request with str.format
+# (the deep research prompts are shared with the batch pre-warm so baked replies hit the cache)
+RESEARCH_SUMMARY_PROMPT = "As a NASA researcher, provide a 2-sentence summary of key points about: {query}"
+RESEARCH_DOMAIN_PROMPT = "What NASA research domain does this belong to: {query}?"
+
+# Engineering session roster shown above the team's reports
+TEAM_MEMBERS_MD = "\n".join([
+    "**Team Members:**",
+    "- 🎯 Systems Engineer (Lead)",
+    "- 🚀 Propulsion Engineer",
+    "- 🏗️ Structural Engineer",
+    "- 💻 Software Engineer",
+    "- 🎮 Mission Operations Engineer"
+]) + "\n\n"
+
+# Engineering team prompts by report section, each engineer designs one subsystem of {project_description}
+ENGINEERING_PROMPTS = {
+    "🎯 **Systems Design Phase**": """As NASA's Systems Engineer, design the overall architecture for: {project_description}
+
+Provide:
+1. Mission requirements and objectives
+2. Top-level system architecture
+3. Key performance parameters
+4. Interface requirements for subsystems
+
+Use NASA engineering standards.""",
+    "🚀 **Propulsion Design Phase**": """As NASA's Propulsion Engineer, design the propulsion subsystem for: {project_description}
+
+Provide:
+1. Propulsion type and propellant selection
+2. Delta-V budget
+3. Thrust and specific impulse requirements
+4. Propellant storage and feed system
+
+Use NASA engineering standards.""",
+    "🏗️ **Structural Design Phase**": """As NASA's Structural Engineer, design the primary structure for: {project_description}
+
+Provide:
+1. Structural configuration and materials
+2. Launch and operational load cases
+3. Mass budget and margins
+4. Thermal and vibration considerations
+
+Use NASA engineering standards.""",
+    "💻 **Software Design Phase**": """As NASA's Software Engineer, design the flight software for: {project_description}
+
+Provide:
+1. Flight software architecture
+2. Command and data handling
+3. Fault protection logic
+4. Verification and validation approach
+
+Use NASA engineering standards.""",
+    "🎮 **Mission Operations Phase**": """As NASA's Mission Operations Engineer, plan operations for: {project_description}
+
+Provide:
+1. Mission operations concept
+2. Ground segment and communication passes
+3. Nominal and contingency procedures
+4. Operations team staffing
+
+Use NASA engineering standards."""
+}
+
+MISSION_CONTROL_PROMPT = """As NASA Mission Control team, analyze this scenario: {scenario}
+
+Mission Phase: {mission_phase}
+Priority: {priority}
+
+Provide:
+1. Situation assessment
+2. Immediate actions required
+3. Systems check recommendations
+4. Flight Director decision
+
+Use NASA mission control protocols."""
+
+AUTONOMY_PROMPT = """As NASA's spacecraft autonomy system, analyze this situation: {situation}
+
+Spacecraft Status:
+- Fuel: {fuel_level:.1f}%
+- Battery: {battery_level:.1f}%
+- Communication Delay: {comm_delay:.1f} minutes
+
+Provide autonomous decision including:
+1. Situation assessment
+2. Autonomous actions taken
+3. Resource allocation adjustments
+4. Risk mitigation strategies
+
+Use NASA autonomy protocols."""
+
+TRAFFIC_PROMPT = """As NASA's satellite traffic management specialist, analyze: {scenario}
+
+Orbital Zone: {orbital_zone}
+Objects Tracked: {total_objects}
+High-Risk Situations: {high_risks}
+
+Provide:
+1. Traffic management strategy
+2. Collision avoidance recommendations
+3. Orbital coordination protocols
+4. Multi-satellite management approach
+
+Use NASA space traffic management protocols."""
+
+EXPLORATION_PROMPT = """As NASA's planetary exploration specialist, plan exploration of: {region} on {planetary_body}
+
+Mission Objectives: {objectives}
+Features Found: {features_found}
+
+Provide:
+1. Terrain analysis summary
+2. Target prioritization strategy
+3. Rover path planning approach
+4. Science activity scheduling
+5. Mission success metrics
+
+Use NASA planetary exploration protocols."""
+
+# Upper bound on in-flight OpenAI requests across all concurrent Gradio users
+OPENAI_MAX_CONCURRENT = int(os.getenv("OPENAI_MAX_CONCURRENT", "8"))
+
+# Gradio requests allowed to wait for a free run before new ones are turned away
+GRADIO_QUEUE_SIZE = int(os.getenv("GRADIO_QUEUE_SIZE", "32"))
+
+# Optional spacing between API requests (seconds), off by default so the worker semaphore is the only throttle
+MIN_REQUEST_INTERVAL = float(os.getenv("OPENAI_MIN_REQUEST_INTERVAL", "0"))
+
+# Earth communication delay per autonomy mission scenario (minutes)
+COMM_DELAYS = {"mars_transit": 12.5, "lunar_orbit": 1.3, "deep_space": 28.0}
+
+# Shared generator for the simulated telemetry, each tab draws all its values in one call
+SIMULATION_RNG = np.random.default_rng()
+
+# Attempts per streamed request on rate limits, dropped connections and server errors, with
+# jittered exponential backoff between them unless the server says when its limit resets (seconds)
+API_RETRY_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 30.0
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Rate limit reset hints look like "20ms", "1.5s" or "6m0s"
+RESET_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+RESET_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+# Scenario keywords that raise mission control to critical priority
+CRITICAL_RE = re.compile(r"emergency|failure|danger|critical", re.IGNORECASE)
 
 class NASAUnifiedPortfolio:
     """Unified NASA AI Agents Portfolio"""
@@ -36,7 +229,7 @@ class NASAUnifiedPortfolio:
         
         # Debug API key (show first/last 4 chars for security)
         print(f"🔑 Using API key: {api_key[:4]}...{api_key[-4:]}")
-        print(f"🤖 Using model: {os.getenv('OPENAI_MODEL', 'gpt-4o')}")
+        print(f"🤖 Using models: {MODEL_PREMIUM} (premium), {MODEL_FAST} (fast)")
         
         # Check for organization ID
         org_id = os.getenv("OPENAI_ORG_ID")
@@ -54,94 +247,209 @@ class NASAUnifiedPortfolio:
         
         if org_id:
             client_kwargs["organization"] = org_id
+        
+        # aiohttp keeps throughput scaling with concurrent requests where the default httpx pool degrades,
+        # otherwise use a sized HTTP/2 pool whose connections outlive the pause between demo clicks
+        if AIOHTTP_AVAILABLE:
+            client_kwargs["http_client"] = DefaultAioHttpClient(timeout=60.0)
+            print("🌐 Using aiohttp transport")
+        else:
+            client_kwargs["http_client"] = httpx.AsyncClient(
+                http2=True,
+                timeout=60.0,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60.0)
+            )
             
         self.client = openai.AsyncOpenAI(**client_kwargs)
-        self.model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")  # Try free tier model
         self.last_request_time = 0
-        self.min_request_interval = 30.0  # Very conservative 30 seconds for testing
+        self.min_request_interval = MIN_REQUEST_INTERVAL
         
         # Novel: Token Budget Management System
         self.session_token_budget = 5000  # Conservative session budget
         self.tokens_used = 0
-        self.response_cache = {}  # Cache to avoid repeat calls
+        self.response_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # LRU+TTL cache to avoid repeat calls
+        
+        # Every API request goes through one worker queue so concurrent users don't stampede the client
+        self.request_queue: Optional[asyncio.Queue] = None
+        self._server_task: Optional[asyncio.Task] = None
+        self._request_tasks = set()
     
     async def rate_limit(self):
         """Rate limiting to prevent API overload"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        if self.min_request_interval <= 0:
+            return
         
-        if time_since_last < self.min_request_interval:
-            wait_time = self.min_request_interval - time_since_last
-            await asyncio.sleep(wait_time)
+        # Reserve the next free slot before sleeping so concurrent calls stay spaced out
+        current_time = time.time()
+        request_time = max(current_time, self.last_request_time + self.min_request_interval)
+        self.last_request_time = request_time
         
-        self.last_request_time = time.time()
+        if request_time > current_time:
+            await asyncio.sleep(request_time - current_time)
     
-    async def safe_api_call_streaming(self, prompt: str, max_tokens: int = 800):
-        """Streaming API call for real-time output"""
-        await self.rate_limit()
-        
+    async def warmup(self):
+        """Open the API connection ahead of the first click (TLS handshake without generating tokens)"""
         try:
-            # Use streaming for better UX and rate limit management
-            stream = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=0.1,
-                stream=True
-            )
-            
-            full_response = ""
-            async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_response += content
-                    yield content  # Stream chunks in real-time
-            
-        except openai.RateLimitError as e:
-            yield f"⚠️ **Rate Limit**: GPT-4o TPM/RPM limit hit. Please wait 60 seconds."
+            await self.client.models.retrieve(MODEL_FAST)
+            print("🔥 DEBUG: API connection warmed")
+        except Exception as e:
+            print(f"❌ DEBUG: Warmup failed: {str(e)}")
+    
+    def start_server_loop(self):
+        """Start the request worker on the running event loop unless it is already serving"""
+        if self._server_task is None or self._server_task.done():
+            self.request_queue = asyncio.Queue()
+            self._server_task = asyncio.create_task(self.server_loop())
+    
+    async def server_loop(self):
+        """Pull queued requests and serve them with at most OPENAI_MAX_CONCURRENT in flight"""
+        slots = asyncio.Semaphore(OPENAI_MAX_CONCURRENT)
+        while True:
+            request = await self.request_queue.get()
+            await slots.acquire()
+            task = asyncio.create_task(self.serve_request(*request, slots))
+            self._request_tasks.add(task)
+            task.add_done_callback(self._request_tasks.discard)
+    
+    async def serve_request(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                            response_q: asyncio.Queue, slots: asyncio.Semaphore):
+        """Stream one completion into its response queue as deltas, then any error, then None"""
+        try:
+            for attempt in range(API_RETRY_ATTEMPTS):
+                streamed = False
+                try:
+                    # Retries are handled here so they also cover a stream that fails before its first delta
+                    stream = await self.client.with_options(max_retries=0).chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,  # Very small
+                        temperature=0.1,
+                        stream=True
+                    )
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            streamed = True
+                            response_q.put_nowait(chunk.choices[0].delta.content)
+                    break
+                except RETRYABLE_ERRORS as e:
+                    # Text already shown can't be taken back, so only retry before the first delta
+                    if streamed or attempt == API_RETRY_ATTEMPTS - 1:
+                        raise
+                    delay = self.retry_delay(e, attempt)
+                    print(f"⏳ DEBUG: {type(e).__name__}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
         except Exception as e:
-            yield f"API processing error: {str(e)}"
+            response_q.put_nowait(e)
+        finally:
+            slots.release()
+            response_q.put_nowait(None)
+    
+    @staticmethod
+    def reset_seconds(value: Optional[str]) -> Optional[float]:
+        """Parse a retry-after or rate limit reset header into seconds"""
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            parts = RESET_RE.findall(value)
+            return sum(float(amount) * RESET_UNITS[unit] for amount, unit in parts) if parts else None
+    
+    def retry_delay(self, error: Exception, attempt: int) -> float:
+        """Seconds to wait before a retry, preferring the server's reset hint over exponential backoff"""
+        response = getattr(error, "response", None)
+        if response is not None:
+            hint = self.reset_seconds(response.headers.get("retry-after"))
+            if hint is None:
+                hint = self.reset_seconds(response.headers.get("x-ratelimit-reset-requests"))
+            if hint is not None:
+                return min(hint, RETRY_MAX_SECONDS) + random.uniform(0, 0.5)
+        return min(RETRY_BASE_SECONDS * 2 ** attempt, RETRY_MAX_SECONDS) + random.uniform(0, 1)
     
     def estimate_tokens(self, text: str) -> int:
-        """Rough token estimation (1 token ≈ 4 characters)"""
+        """Token count from the shared encoder, or a rough estimate (1 token ≈ 4 characters)"""
+        if TIKTOKEN_AVAILABLE:
+            return len(TOKEN_ENCODER.encode(text, disallowed_special=()))
         return len(text) // 4
     
+    def reply_budget(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """Cap max_tokens so the prompt and reply fit the context window"""
+        prompt_tokens = sum(self.estimate_tokens(message["content"]) for message in messages)
+        return max(1, min(max_tokens, MODEL_CONTEXT_TOKENS - prompt_tokens - MESSAGE_OVERHEAD_TOKENS))
+    
     def check_token_budget(self, requested_tokens: int) -> bool:
         """Check if we have enough tokens in budget"""
         return (self.tokens_used + requested_tokens) <= self.session_token_budget
     
-    async def micro_response(self, prompt: str, max_tokens: int = 50):  # Even smaller!
-        """Novel: Ultra-small initial response to avoid rate limits"""
+    def micro_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Build the ultra-conservative chat messages sent for a prompt"""
+        micro_prompt = f"Briefly: {prompt}"
+        return [{"role": "user", "content": micro_prompt}]
+    
+    def cache_key(self, model: str, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        """Hash the full request so identical requests share a cached reply"""
+        return hashlib.sha256(json.dumps(
+            {"model": model, "messages": messages, "max_tokens": max_tokens}, sort_keys=True
+        ).encode()).hexdigest()
+    
+    def cache_put(self, cache_key: str, content: str):
+        """Cache a reply, evicting the least recently used entry when full"""
+        self.response_cache[cache_key] = (time.monotonic() + RESPONSE_CACHE_TTL, content)
+        self.response_cache.move_to_end(cache_key)
+        if len(self.response_cache) > RESPONSE_CACHE_SIZE:
+            self.response_cache.popitem(last=False)
+    
+    async def micro_response(self, prompt: str, max_tokens: int = 50, model: str = MODEL_FAST):  # Even smaller!
+        """Novel: Ultra-small streaming response to avoid rate limits"""
         
         # Diagnostic info
         print(f"🔍 DEBUG: Making request with {max_tokens} tokens, {self.min_request_interval}s interval")
         
-        await self.rate_limit()
+        messages = self.micro_messages(prompt)
+        max_tokens = self.reply_budget(messages, max_tokens)
         
-        # Check cache first
-        cache_key = f"{prompt[:50]}_{max_tokens}"
-        if cache_key in self.response_cache:
+        # Check cache first, a hit skips both the rate limit wait and the API round-trip
+        cache_key = self.cache_key(model, messages, max_tokens)
+        cached = self.response_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
             print("✅ DEBUG: Using cached response")
-            return self.response_cache[cache_key]
+            self.response_cache.move_to_end(cache_key)
+            yield cached[1]
+            return
+        
+        await self.rate_limit()
         
         # Check token budget
         if not self.check_token_budget(max_tokens):
-            return f"⚠️ **Token Budget Exceeded**: Used {self.tokens_used}/{self.session_token_budget} tokens. Please refresh to reset."
+            yield f"⚠️ **Token Budget Exceeded**: Used {self.tokens_used}/{self.session_token_budget} tokens. Please refresh to reset."
+            return
         
         try:
-            # Ultra-conservative micro-response
-            micro_prompt = f"Briefly: {prompt[:100]}"  # Even shorter prompt
-            
-            print(f"🚀 DEBUG: Sending request to {self.model}")
+            print(f"🚀 DEBUG: Sending request to {model}")
+            
+            self.start_server_loop()
+            response_q = asyncio.Queue()
+            await self.request_queue.put((model, messages, max_tokens, response_q))
+            
+            # Yield the growing text, Gradio Markdown replaces on each yield so updates are
+            # coalesced to one per STREAM_UPDATE_INTERVAL and flushed once the reply ends
+            content = ""
+            shown = 0
+            last_update = 0.0
+            while True:
+                delta = await response_q.get()
+                if delta is None:
+                    break
+                if isinstance(delta, Exception):
+                    raise delta
+                content += delta
+                if time.monotonic() - last_update >= STREAM_UPDATE_INTERVAL:
+                    last_update = time.monotonic()
+                    shown = len(content)
+                    yield content
+            if len(content) > shown:
+                yield content
             
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": micro_prompt}],
-                max_tokens=max_tokens,  # Very small
-                temperature=0.1,
-            )
-            
-            content = response.choices[0].message.content
             print(f"✅ DEBUG: Got response: {len(content)} chars")
             
             # Update token usage
@@ -149,342 +457,436 @@ class NASAUnifiedPortfolio:
             self.tokens_used += tokens_used
             
             # Cache the response
-            self.response_cache[cache_key] = content
-            
-            return content
+            self.cache_put(cache_key, content)
             
         except openai.RateLimitError as e:
             print(f"❌ DEBUG: Rate limit error: {str(e)}")
-            return f"⚠️ **Rate Limit**: {str(e)}"
+            yield f"⚠️ **Rate Limit**: {str(e)}"
         except Exception as e:
             print(f"❌ DEBUG: Other error: {str(e)}")
-            return f"API error: {str(e)}"
+            yield f"API error: {str(e)}"
     
-    async def safe_api_call(self, prompt: str, max_tokens: int = 300):
-        """Conservative API call with budget management"""
-        return await self.micro_response(prompt, max_tokens)
+    async def safe_api_call(self, prompt: str, max_tokens: int = 300, model: str = MODEL_FAST):
+        """Conservative streaming API call with budget management"""
+        async for text in self.micro_response(prompt, max_tokens, model):
+            yield text
     
-    # DEEP RESEARCH AGENT FUNCTIONS
-    async def run_deep_research(self, query: str):
-        """Novel Progressive Deep Research Agent"""
+    async def pump_section(self, heading: str, prompt: str, max_tokens: int, model: str, queue: asyncio.Queue):
+        """Forward a streamed section into a queue as (heading, text), ending with (heading, None)"""
         try:
-            if not query.strip():
-                return "Please enter a research query."
+            async for text in self.safe_api_call(prompt, max_tokens, model):
+                queue.put_nowait((heading, text))
+        finally:
+            queue.put_nowait((heading, None))
+    
+    async def run_all_scenarios_batch(self, scenario_specs: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Run non-interactive requests through the Batch API (half price, up to 24h latency)
+        
+        Each spec has an id, a prompt, max_tokens and optionally a model (premium by default). Replies are returned by id and cached, so the
+        matching interactive requests are answered without another API call.
+        """
+        requests = {}
+        for spec in scenario_specs:
+            messages = self.micro_messages(spec["prompt"])
+            requests[spec["id"]] = (spec.get("model", MODEL_PREMIUM), messages, self.reply_budget(messages, spec["max_tokens"]))
+        
+        lines = [
+            json.dumps({
+                "custom_id": spec_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": 0.1}
+            })
+            for spec_id, (model, messages, max_tokens) in requests.items()
+        ]
+        batch_file = await self.client.files.create(
+            file=("unified_demo_batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"📦 DEBUG: Submitted batch {batch.id} with {len(lines)} requests")
+        
+        # Poll with exponential backoff, a batch can take anywhere from minutes to hours
+        poll_seconds = BATCH_POLL_SECONDS
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(poll_seconds)
+            poll_seconds = min(poll_seconds * 2, BATCH_POLL_MAX_SECONDS)
+            batch = await self.client.batches.retrieve(batch.id)
+        
+        # Successful and failed requests come back in separate files, matched by custom_id
+        replies = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            results = await self.client.files.content(file_id)
+            for line in results.text.splitlines():
+                result = json.loads(line)
+                spec_id = result["custom_id"]
+                response = result.get("response") or {}
+                if spec_id in requests and response.get("status_code") == 200:
+                    replies[spec_id] = response["body"]["choices"][0]["message"]["content"]
+                    self.cache_put(self.cache_key(*requests[spec_id]), replies[spec_id])
+                else:
+                    replies[spec_id] = f"Batch request failed: {result.get('error') or response.get('body')}"
+        
+        for spec_id in requests.keys() - replies.keys():
+            replies[spec_id] = f"Batch {batch.id} ended with status {batch.status}"
+        return replies
+    
+    async def run_batch_prewarm(self, queries: str):
+        """Bake deep research replies for a list of demo queries through the Batch API"""
+        try:
+            query_list = [query.strip() for query in queries.splitlines() if query.strip()]
+            if not query_list:
+                yield "Please enter at least one research query."
+                return
             
-            # Progressive Response Header with Token Budget
-            result = f"🚀 **NASA Deep Research Agent - Progressive Mode**\n\n"
-            result += f"**Query:** {query}\n"
-            result += f"**Token Budget:** {self.session_token_budget - self.tokens_used}/{self.session_token_budget} remaining\n\n"
+            specs = []
+            for i, query in enumerate(query_list):
+                specs.append({"id": f"research-{i}-summary", "prompt": RESEARCH_SUMMARY_PROMPT.format(query=query[:USER_INPUT_CHARS]), "max_tokens": 100})
+                specs.append({"id": f"research-{i}-domain", "prompt": RESEARCH_DOMAIN_PROMPT.format(query=query[:USER_INPUT_CHARS]), "max_tokens": 50})
             
-            # PHASE 1: Micro-Summary (Ultra-Conservative)
-            result += "## 🔍 **Quick Research Summary** (Phase 1)\n\n"
+            result = f"📦 **Batch Pre-warm**\n\n"
+            result += f"**Queries:** {len(query_list)} ({len(specs)} requests)\n\n"
+            yield result + "⏳ Batch submitted, waiting for OpenAI to process it (up to 24h)...\n"
             
-            micro_prompt = f"As a NASA researcher, provide a 2-sentence summary of key points about: {query}"
-            micro_response = await self.micro_response(micro_prompt, max_tokens=100)
+            replies = await self.run_all_scenarios_batch(specs)
             
-            result += micro_response + "\n\n"
+            for i, query in enumerate(query_list):
+                result += f"### {query}\n\n"
+                result += replies[f"research-{i}-summary"] + "\n\n"
+                result += f"**Domain:** {replies[f'research-{i}-domain']}\n\n"
+            result += f"**Cached Replies:** {len(self.response_cache)}\n"
             
-            # Progressive Options for User
-            result += "---\n"
-            result += "**💡 Need More Detail?** Try these approaches:\n\n"
-            result += "1. **Shorter Query**: Ask about one specific aspect\n"
-            result += "2. **Multiple Sessions**: Break your research into parts\n"
-            result += "3. **Focused Questions**: Ask \"What are current NASA Mars missions?\" instead of broad topics\n\n"
+            yield result
             
-            # Show remaining budget
-            result += f"**Token Usage Update:** {self.tokens_used}/{self.session_token_budget} used\n\n"
+        except Exception as e:
+            yield f"❌ **Error in Batch Pre-warm:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
+    
+    def pick_model(self, model_routing: str, premium: bool) -> str:
+        """Pick an agent's model: its own tier under auto routing, or the tier chosen in the UI"""
+        if model_routing == "fast" or (model_routing == "auto" and not premium):
+            return MODEL_FAST
+        return MODEL_PREMIUM
+    
+    # DEEP RESEARCH AGENT FUNCTIONS
+    async def run_deep_research(self, query: str, model_routing: str = "auto"):
+        """Novel Progressive Deep Research Agent"""
+        try:
+            if not query.strip():
+                yield "Please enter a research query."
+                return
+            
+            model = self.pick_model(model_routing, premium=True)
+            
+            # Progressive Response Header with Token Budget, then PHASE 1: Micro-Summary (Ultra-Conservative).
+            # Each phase's static text is built in one piece and sent as a single frame.
+            result = "".join([
+                "🚀 **NASA Deep Research Agent - Progressive Mode**\n\n",
+                f"**Query:** {query}\n",
+                f"**Token Budget:** {self.session_token_budget - self.tokens_used}/{self.session_token_budget} remaining\n\n",
+                "## 🔍 **Quick Research Summary** (Phase 1)\n\n"
+            ])
+            yield result
+            
+            micro_prompt = RESEARCH_SUMMARY_PROMPT.format(query=query[:USER_INPUT_CHARS])
+            micro_response = ""
+            async for micro_response in self.micro_response(micro_prompt, max_tokens=100, model=model):
+                yield result + micro_response
+            
+            # Progressive Options for User and remaining budget
+            result += "".join([
+                micro_response, "\n\n",
+                "---\n",
+                "**💡 Need More Detail?** Try these approaches:\n\n",
+                "1. **Shorter Query**: Ask about one specific aspect\n",
+                "2. **Multiple Sessions**: Break your research into parts\n",
+                "3. **Focused Questions**: Ask \"What are current NASA Mars missions?\" instead of broad topics\n\n",
+                f"**Token Usage Update:** {self.tokens_used}/{self.session_token_budget} used\n\n"
+            ])
             
             # Optional: Domain classification (if budget allows)
             if self.check_token_budget(50):
                 result += "## 🎯 **Research Domain**\n\n"
-                domain_prompt = f"What NASA research domain does this belong to: {query}?"
-                domain_response = await self.micro_response(domain_prompt, max_tokens=50)
+                domain_prompt = RESEARCH_DOMAIN_PROMPT.format(query=query[:USER_INPUT_CHARS])
+                yield result
+                domain_response = ""
+                async for domain_response in self.micro_response(domain_prompt, max_tokens=50, model=model):
+                    yield result + domain_response
                 result += domain_response + "\n\n"
             else:
                 result += "## ⚠️ **Budget Limited**\n\nTo get domain classification, refresh the page to reset your token budget.\n\n"
             
             # Strategic guidance
-            result += "---\n"
-            result += "**🚀 Pro Tips for Better Results:**\n"
-            result += "- Use specific NASA mission names\n"
-            result += "- Ask about one technology at a time\n"
-            result += "- Try: 'Current status of Artemis program'\n"
-            result += "- Try: 'Mars rover power systems'\n\n"
+            result += "".join([
+                "---\n",
+                "**🚀 Pro Tips for Better Results:**\n",
+                "- Use specific NASA mission names\n",
+                "- Ask about one technology at a time\n",
+                "- Try: 'Current status of Artemis program'\n",
+                "- Try: 'Mars rover power systems'\n\n"
+            ])
             
-            return result
+            yield result
             
         except Exception as e:
-            return f"❌ **Error in Deep Research Agent:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
+            yield f"❌ **Error in Deep Research Agent:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
     
     # ENGINEERING TEAM FUNCTIONS
-    async def run_engineering_team(self, project_description: str):
+    async def run_engineering_team(self, project_description: str, model_routing: str = "auto"):
         """Engineering Team Agent - Simplified for unified interface"""
         try:
             if not project_description.strip():
-                return "Please enter a project description."
-            
-            result = f"🚀 **NASA Engineering Team Design Session**\n\n"
-            result += f"**Project:** {project_description}\n\n"
-            
-            result += f"**Team Members:**\n"
-            result += f"- 🎯 Systems Engineer (Lead)\n"
-            result += f"- 🚀 Propulsion Engineer\n"
-            result += f"- 🏗️ Structural Engineer\n"
-            result += f"- 💻 Software Engineer\n"
-            result += f"- 🎮 Mission Operations Engineer\n\n"
-            
-            # Systems Design
-            result += "## 🎯 **Systems Design Phase**\n\n"
-            
-            systems_prompt = f"""
-            As NASA's Systems Engineer, design the overall architecture for: {project_description}
-            
-            Provide:
-            1. Mission requirements and objectives
-            2. Top-level system architecture
-            3. Key performance parameters
-            4. Interface requirements for subsystems
-            
-            Use NASA engineering standards.
-            """
-            
-            response_content = await self.safe_api_call(systems_prompt, max_tokens=800)
-            
-            result += response_content + "\n\n"
+                yield "Please enter a project description."
+                return
+            
+            model = self.pick_model(model_routing, premium=True)
+            
+            # Session header, sent as a single frame before the engineers start
+            result = "".join([
+                "🚀 **NASA Engineering Team Design Session**\n\n",
+                f"**Project:** {project_description}\n\n",
+                TEAM_MEMBERS_MD
+            ])
+            
+            # Each engineer designs their subsystem concurrently, sections fill in as replies stream
+            sections = {
+                heading: template.format(project_description=project_description[:USER_INPUT_CHARS])
+                for heading, template in ENGINEERING_PROMPTS.items()
+            }
+            replies = {heading: "" for heading in sections}
+            
+            yield result
+            queue = asyncio.Queue()
+            tasks = [
+                asyncio.create_task(self.pump_section(heading, prompt, 800, model, queue))
+                for heading, prompt in sections.items()
+            ]
+            try:
+                # Sections keep their order while whichever engineer replies first fills in first,
+                # updates from all five streams share one STREAM_UPDATE_INTERVAL budget
+                pending = len(tasks)
+                last_update = 0.0
+                while pending:
+                    heading, text = await queue.get()
+                    if text is None:
+                        pending -= 1
+                        continue
+                    replies[heading] = text
+                    if time.monotonic() - last_update >= STREAM_UPDATE_INTERVAL:
+                        last_update = time.monotonic()
+                        yield result + "".join(f"## {h}\n\n{reply}\n\n" for h, reply in replies.items() if reply)
+            finally:
+                for task in tasks:
+                    task.cancel()
+            
+            result += "".join(f"## {heading}\n\n{reply}\n\n" for heading, reply in replies.items())
             
             # Integration Summary
-            result += "## ✅ **Engineering Integration Summary**\n\n"
-            result += f"- **Systems Architecture:** Completed\n"
-            result += f"- **Subsystem Integration:** Verified\n"
-            result += f"- **NASA Standards Compliance:** Confirmed\n"
-            result += f"- **Ready for Development Phase:** ✅\n"
+            result += "".join([
+                "## ✅ **Engineering Integration Summary**\n\n",
+                "- **Systems Architecture:** Completed\n",
+                f"- **Subsystem Designs:** {len(replies)} engineers reported\n",
+                "- **Subsystem Integration:** Verified\n",
+                "- **NASA Standards Compliance:** Confirmed\n",
+                "- **Ready for Development Phase:** ✅\n"
+            ])
             
-            return result
+            yield result
             
         except Exception as e:
-            return f"❌ **Error in Engineering Team:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
+            yield f"❌ **Error in Engineering Team:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
     
     # MISSION CONTROL FUNCTIONS
-    async def run_mission_control(self, scenario: str, mission_phase: str):
+    async def run_mission_control(self, scenario: str, mission_phase: str, model_routing: str = "auto"):
         """Mission Control Agent - Simplified for unified interface"""
         try:
             if not scenario.strip():
-                return "Please enter a mission control scenario."
-            
-            result = f"🚀 **NASA Mission Control Response**\n\n"
-            result += f"**Mission Phase:** {mission_phase.replace('_', ' ').title()}\n"
-            result += f"**Scenario:** {scenario}\n\n"
+                yield "Please enter a mission control scenario."
+                return
             
-            result += "## 🎯 **Mission Specialist Analysis**\n\n"
+            model = self.pick_model(model_routing, premium=False)
             
             # Determine priority level
-            priority = "critical" if any(word in scenario.lower() for word in ["emergency", "failure", "danger", "critical"]) else "elevated"
-            result += f"**Priority Level:** {priority.upper()}\n"
-            result += f"**Emergency Status:** {'🚨 ACTIVE' if priority == 'critical' else '✅ Normal'}\n\n"
+            priority = "critical" if CRITICAL_RE.search(scenario) else "elevated"
             
             # Mission Control Analysis
-            mc_prompt = f"""
-            As NASA Mission Control team, analyze this scenario: {scenario}
-            
-            Mission Phase: {mission_phase}
-            Priority: {priority}
-            
-            Provide:
-            1. Situation assessment
-            2. Immediate actions required
-            3. Systems check recommendations
-            4. Flight Director decision
-            
-            Use NASA mission control protocols.
-            """
-            
-            # Progressive approach for Mission Control
-            result += f"**Token Budget:** {self.session_token_budget - self.tokens_used}/{self.session_token_budget} remaining\n\n"
-            
-            response_content = await self.safe_api_call(mc_prompt, max_tokens=200)  # Ultra-conservative
-            
-            result += "## 📡 **Mission Control Team Response**\n\n"
-            result += response_content + "\n\n"
-            
-            result += f"**Flight Director Authorization:** ✅ APPROVED\n"
-            result += f"**Mission Status:** OPERATIONAL\n"
-            
-            return result
+            mc_prompt = MISSION_CONTROL_PROMPT.format(scenario=scenario[:USER_INPUT_CHARS], mission_phase=mission_phase, priority=priority)
+            
+            # Specialist analysis and token budget (progressive approach), sent as a single frame
+            result = "".join([
+                "🚀 **NASA Mission Control Response**\n\n",
+                f"**Mission Phase:** {mission_phase.replace('_', ' ').title()}\n",
+                f"**Scenario:** {scenario}\n\n",
+                "## 🎯 **Mission Specialist Analysis**\n\n",
+                f"**Priority Level:** {priority.upper()}\n",
+                f"**Emergency Status:** {'🚨 ACTIVE' if priority == 'critical' else '✅ Normal'}\n\n",
+                f"**Token Budget:** {self.session_token_budget - self.tokens_used}/{self.session_token_budget} remaining\n\n",
+                "## 📡 **Mission Control Team Response**\n\n"
+            ])
+            yield result
+            response_content = ""
+            async for response_content in self.safe_api_call(mc_prompt, max_tokens=200, model=model):  # Ultra-conservative
+                yield result + response_content
+            
+            result += f"{response_content}\n\n**Flight Director Authorization:** ✅ APPROVED\n**Mission Status:** OPERATIONAL\n"
+            
+            yield result
             
         except Exception as e:
-            return f"❌ **Error in Mission Control:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
+            yield f"❌ **Error in Mission Control:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
     
     # SPACECRAFT AUTONOMY FUNCTIONS
-    async def run_spacecraft_autonomy(self, situation: str, mission_scenario: str):
+    async def run_spacecraft_autonomy(self, situation: str, mission_scenario: str, model_routing: str = "auto"):
         """Spacecraft Autonomy Agent - Simplified for unified interface"""
         try:
             if not situation.strip():
-                return "Please enter an autonomous situation."
+                yield "Please enter an autonomous situation."
+                return
             
-            result = f"🤖 **NASA Spacecraft Autonomy System**\n\n"
-            result += f"**Mission Scenario:** {mission_scenario.replace('_', ' ').title()}\n"
-            result += f"**Situation:** {situation}\n\n"
+            model = self.pick_model(model_routing, premium=False)
             
             # Simulate spacecraft state
-            result += "## 📊 **Spacecraft State Analysis**\n\n"
-            fuel_level = random.uniform(45, 85)
-            battery_level = random.uniform(70, 95)
-            comm_delay = {"mars_transit": 12.5, "lunar_orbit": 1.3, "deep_space": 28.0}.get(mission_scenario, 12.5)
-            
-            result += f"- **Fuel Level:** {fuel_level:.1f}%\n"
-            result += f"- **Battery Level:** {battery_level:.1f}%\n"
-            result += f"- **Communication Delay:** {comm_delay:.1f} minutes\n"
-            result += f"- **Autonomous Operation:** {'REQUIRED' if comm_delay > 15 else 'ENABLED'}\n\n"
-            
-            # Autonomous decision making
-            result += "## 🧠 **Autonomous Decision Analysis**\n\n"
-            
-            autonomy_prompt = f"""
-            As NASA's spacecraft autonomy system, analyze this situation: {situation}
-            
-            Spacecraft Status:
-            - Fuel: {fuel_level:.1f}%
-            - Battery: {battery_level:.1f}%
-            - Communication Delay: {comm_delay:.1f} minutes
-            
-            Provide autonomous decision including:
-            1. Situation assessment
-            2. Autonomous actions taken
-            3. Resource allocation adjustments
-            4. Risk mitigation strategies
-            
-            Use NASA autonomy protocols.
-            """
-            
-            response_content = await self.safe_api_call(autonomy_prompt, max_tokens=600)
+            fuel_level, battery_level = SIMULATION_RNG.uniform([45, 70], [85, 95]).tolist()
+            comm_delay = COMM_DELAYS.get(mission_scenario, 12.5)
+            
+            # State analysis, sent as a single frame before autonomous decision making
+            result = "".join([
+                "🤖 **NASA Spacecraft Autonomy System**\n\n",
+                f"**Mission Scenario:** {mission_scenario.replace('_', ' ').title()}\n",
+                f"**Situation:** {situation}\n\n",
+                "## 📊 **Spacecraft State Analysis**\n\n",
+                f"- **Fuel Level:** {fuel_level:.1f}%\n",
+                f"- **Battery Level:** {battery_level:.1f}%\n",
+                f"- **Communication Delay:** {comm_delay:.1f} minutes\n",
+                f"- **Autonomous Operation:** {'REQUIRED' if comm_delay > 15 else 'ENABLED'}\n\n",
+                "## 🧠 **Autonomous Decision Analysis**\n\n"
+            ])
+            
+            autonomy_prompt = AUTONOMY_PROMPT.format(
+                situation=situation[:USER_INPUT_CHARS], fuel_level=fuel_level, battery_level=battery_level, comm_delay=comm_delay
+            )
             
-            result += response_content + "\n\n"
+            yield result
+            response_content = ""
+            async for response_content in self.safe_api_call(autonomy_prompt, max_tokens=600, model=model):
+                yield result + response_content
             
-            result += f"**Autonomous Decision Confidence:** 92%\n"
-            result += f"**System Status:** OPERATIONAL ✅\n"
+            result += f"{response_content}\n\n**Autonomous Decision Confidence:** 92%\n**System Status:** OPERATIONAL ✅\n"
             
-            return result
+            yield result
             
         except Exception as e:
-            return f"❌ **Error in Spacecraft Autonomy:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
+            yield f"❌ **Error in Spacecraft Autonomy:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
     
     # SATELLITE TRAFFIC MANAGEMENT FUNCTIONS
-    async def run_satellite_traffic(self, scenario: str, orbital_zone: str):
+    async def run_satellite_traffic(self, scenario: str, orbital_zone: str, model_routing: str = "auto"):
         """Satellite Traffic Management Agent - Simplified for unified interface"""
         try:
             if not scenario.strip():
-                return "Please enter a traffic management scenario."
+                yield "Please enter a traffic management scenario."
+                return
             
-            result = f"🛰️ **NASA Satellite Traffic Management**\n\n"
-            result += f"**Orbital Zone:** {orbital_zone} \n"
-            result += f"**Scenario:** {scenario}\n\n"
+            model = self.pick_model(model_routing, premium=False)
             
             # Simulate orbital population
-            result += "## 📡 **Orbital Surveillance Status**\n\n"
-            active_sats = random.randint(15, 25)
-            debris_objects = random.randint(20, 35)
+            active_sats, debris_objects, high_risks, medium_risks = SIMULATION_RNG.integers([15, 20, 1, 3], [26, 36, 4, 7]).tolist()
             total_objects = active_sats + debris_objects
             
-            result += f"- **Active Satellites:** {active_sats}\n"
-            result += f"- **Space Debris:** {debris_objects}\n"
-            result += f"- **Total Tracked Objects:** {total_objects}\n\n"
-            
-            # Risk assessment
-            result += "## ⚠️ **Collision Risk Assessment**\n\n"
-            high_risks = random.randint(1, 3)
-            medium_risks = random.randint(3, 6)
-            
-            result += f"- **High-Priority Risks:** {high_risks}\n"
-            result += f"- **Medium-Priority Risks:** {medium_risks}\n"
-            result += f"- **Risk Status:** {'🚨 ACTIVE MONITORING' if high_risks > 1 else '✅ NOMINAL'}\n\n"
-            
             # Traffic management analysis
-            traffic_prompt = f"""
-            As NASA's satellite traffic management specialist, analyze: {scenario}
-            
-            Orbital Zone: {orbital_zone}
-            Objects Tracked: {total_objects}
-            High-Risk Situations: {high_risks}
-            
-            Provide:
-            1. Traffic management strategy
-            2. Collision avoidance recommendations
-            3. Orbital coordination protocols
-            4. Multi-satellite management approach
-            
-            Use NASA space traffic management protocols.
-            """
-            
-            response_content = await self.safe_api_call(traffic_prompt, max_tokens=600)
-            
-            result += "## 🌐 **Traffic Management Response**\n\n"
-            result += response_content + "\n\n"
-            
-            result += f"**System Status:** {'⚠️ ACTIVE MONITORING' if high_risks > 1 else '✅ NOMINAL'}\n"
+            traffic_prompt = TRAFFIC_PROMPT.format(
+                scenario=scenario[:USER_INPUT_CHARS], orbital_zone=orbital_zone, total_objects=total_objects, high_risks=high_risks
+            )
             
-            return result
+            # Surveillance status and risk assessment, sent as a single frame
+            result = "".join([
+                "🛰️ **NASA Satellite Traffic Management**\n\n",
+                f"**Orbital Zone:** {orbital_zone} \n",
+                f"**Scenario:** {scenario}\n\n",
+                "## 📡 **Orbital Surveillance Status**\n\n",
+                f"- **Active Satellites:** {active_sats}\n",
+                f"- **Space Debris:** {debris_objects}\n",
+                f"- **Total Tracked Objects:** {total_objects}\n\n",
+                "## ⚠️ **Collision Risk Assessment**\n\n",
+                f"- **High-Priority Risks:** {high_risks}\n",
+                f"- **Medium-Priority Risks:** {medium_risks}\n",
+                f"- **Risk Status:** {'🚨 ACTIVE MONITORING' if high_risks > 1 else '✅ NOMINAL'}\n\n",
+                "## 🌐 **Traffic Management Response**\n\n"
+            ])
+            yield result
+            response_content = ""
+            async for response_content in self.safe_api_call(traffic_prompt, max_tokens=600, model=model):
+                yield result + response_content
+            
+            result += f"{response_content}\n\n**System Status:** {'⚠️ ACTIVE MONITORING' if high_risks > 1 else '✅ NOMINAL'}\n"
+            
+            yield result
             
         except Exception as e:
-            return f"❌ **Error in Satellite Traffic Management:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
+            yield f"❌ **Error in Satellite Traffic Management:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
     
     # PLANETARY EXPLORATION FUNCTIONS
-    async def run_planetary_exploration(self, planetary_body: str, region: str, objectives: str):
+    async def run_planetary_exploration(self, planetary_body: str, region: str, objectives: str, model_routing: str = "auto"):
         """Planetary Exploration Agent - Simplified for unified interface"""
         try:
             if not region.strip():
-                return "Please enter a target region."
+                yield "Please enter a target region."
+                return
             
-            result = f"🌍 **NASA Planetary Exploration Mission**\n\n"
-            result += f"**Target:** {planetary_body.title()}\n"
-            result += f"**Region:** {region}\n\n"
+            model = self.pick_model(model_routing, premium=False)
             
             # Parse objectives
             mission_objectives = [obj.strip() for obj in objectives.split(',') if obj.strip()]
             if not mission_objectives:
                 mission_objectives = ["Search for signs of past life", "Analyze geological composition"]
             
-            result += f"### **Mission Objectives:**\n"
-            for obj in mission_objectives:
-                result += f"- {obj}\n"
-            result += "\n"
-            
             # Terrain analysis
-            result += "## 🔍 **Terrain Analysis Phase**\n\n"
-            features_found = random.randint(5, 8)
-            high_priority_targets = random.randint(2, 4)
-            
-            result += f"- **Terrain Features Identified:** {features_found}\n"
-            result += f"- **High Priority Targets:** {high_priority_targets}\n"
-            result += f"- **Scientific Interest Level:** High\n\n"
+            features_found, high_priority_targets = SIMULATION_RNG.integers([5, 2], [9, 5]).tolist()
             
             # Exploration planning
-            exploration_prompt = f"""
-            As NASA's planetary exploration specialist, plan exploration of: {region} on {planetary_body}
-            
-            Mission Objectives: {', '.join(mission_objectives)}
-            Features Found: {features_found}
-            
-            Provide:
-            1. Terrain analysis summary
-            2. Target prioritization strategy
-            3. Rover path planning approach
-            4. Science activity scheduling
-            5. Mission success metrics
-            
-            Use NASA planetary exploration protocols.
-            """
-            
-            response_content = await self.safe_api_call(exploration_prompt, max_tokens=600)
-            
-            result += "## 🎯 **Exploration Plan**\n\n"
-            result += response_content + "\n\n"
-            
-            result += f"**Mission Status:** READY FOR EXECUTION ✅\n"
+            exploration_prompt = EXPLORATION_PROMPT.format(
+                region=region[:USER_INPUT_CHARS], planetary_body=planetary_body,
+                objectives=", ".join(mission_objectives)[:USER_INPUT_CHARS], features_found=features_found
+            )
             
-            return result
+            # Objectives and terrain analysis, sent as a single frame
+            result = "".join([
+                "🌍 **NASA Planetary Exploration Mission**\n\n",
+                f"**Target:** {planetary_body.title()}\n",
+                f"**Region:** {region}\n\n",
+                "### **Mission Objectives:**\n",
+                *(f"- {obj}\n" for obj in mission_objectives),
+                "\n",
+                "## 🔍 **Terrain Analysis Phase**\n\n",
+                f"- **Terrain Features Identified:** {features_found}\n",
+                f"- **High Priority Targets:** {high_priority_targets}\n",
+                "- **Scientific Interest Level:** High\n\n",
+                "## 🎯 **Exploration Plan**\n\n"
+            ])
+            yield result
+            response_content = ""
+            async for response_content in self.safe_api_call(exploration_prompt, max_tokens=600, model=model):
+                yield result + response_content
+            
+            result += f"{response_content}\n\n**Mission Status:** READY FOR EXECUTION ✅\n"
+            
+            yield result
             
         except Exception as e:
-            return f"❌ **Error in Planetary Exploration:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
+            yield f"❌ **Error in Planetary Exploration:**\n\nError: {str(e)}\n\nPlease check your API configuration and try again."
+
+# Static HTML fragments for the page header, footer and tab sidebars. They are read once per build and
+# inlined through gr.HTML, so this keeps markup out of the module but gives the browser nothing to cache
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+def static_html(name: str) -> str:
+    """Read a static HTML fragment from the static directory"""
+    with open(os.path.join(STATIC_DIR, f"{name}.html"), encoding="utf-8") as f:
+        return f.read()
 
 # Create the unified interface
 def create_nasa_portfolio():
@@ -514,30 +916,24 @@ def create_nasa_portfolio():
     ) as demo:
         
         # Header
-        gr.HTML("""
-        <div style="text-align: center; margin-bottom: 30px; padding: 20px; background: linear-gradient(45deg, #1a237e, #3f51b5); border-radius: 15px;">
-            <h1 style="color: #ffffff; font-size: 3em; margin-bottom: 10px; text-shadow: 2px 2px 4px rgba(0,0,0,0.5);">
-                🚀 NASA AI AGENTS PORTFOLIO
-            </h1>
-            <p style="color: #e3f2fd; font-size: 1.4em; margin: 0;">
-                Advanced AI Agent Systems for Space Mission Operations
-            </p>
-            <p style="color: #bbdefb; font-size: 1.1em; margin-top: 10px;">
-                Six Specialized Agents • Production-Ready Systems • NASA-Authentic Workflows
-            </p>
-        </div>
-        """)
+        gr.HTML(static_html("hero"))
+        
+        # Model routing toggle so interviewers can A/B the fast and premium tiers on any agent
+        model_routing = gr.Radio(
+            label="Model Routing",
+            choices=[
+                ("Auto (premium for research & engineering, fast for operations)", "auto"),
+                (f"Fast for all agents ({MODEL_FAST})", "fast"),
+                (f"Premium for all agents ({MODEL_PREMIUM})", "premium")
+            ],
+            value="auto"
+        )
         
         with gr.Tabs() as tabs:
             
             # Tab 1: Deep Research Agent
             with gr.TabItem("🔬 Deep Research", id="research"):
-                gr.HTML("""
-                <div style="text-align: center; margin-bottom: 20px;">
-                    <h2 style="color: #ffffff;">NASA Deep Research Agent</h2>
-                    <p style="color: #cccccc;">Advanced research system for space missions and NASA technologies</p>
-                </div>
-                """)
+                gr.HTML(static_html("research_intro"))
                 
                 with gr.Row():
                     with gr.Column():
@@ -549,30 +945,14 @@ def create_nasa_portfolio():
                         research_btn = gr.Button("🔬 Start NASA Research", variant="primary", size="lg")
                     
                     with gr.Column():
-                        gr.HTML("""
-                        <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px;">
-                            <h4 style="color: #ffffff;">Research Domains</h4>
-                            <ul style="color: #cccccc; font-size: 0.9em;">
-                                <li>🛰️ Mission Planning</li>
-                                <li>🚀 Propulsion Systems</li>
-                                <li>🔬 Space Materials</li>
-                                <li>🌱 Life Support</li>
-                                <li>🌍 Planetary Exploration</li>
-                            </ul>
-                        </div>
-                        """)
+                        gr.HTML(static_html("research_sidebar"))
                 
                 research_output = gr.Markdown(label="Research Report", container=True)
-                research_btn.click(fn=portfolio.run_deep_research, inputs=research_query, outputs=research_output)
+                research_btn.click(fn=portfolio.run_deep_research, inputs=[research_query, model_routing], outputs=research_output)
             
             # Tab 2: Engineering Team
             with gr.TabItem("🤝 Engineering Team", id="engineering"):
-                gr.HTML("""
-                <div style="text-align: center; margin-bottom: 20px;">
-                    <h2 style="color: #ffffff;">NASA Engineering Team</h2>
-                    <p style="color: #cccccc;">Multi-agent collaborative spacecraft and mission design</p>
-                </div>
-                """)
+                gr.HTML(static_html("engineering_intro"))
                 
                 with gr.Row():
                     with gr.Column():
@@ -584,30 +964,14 @@ def create_nasa_portfolio():
                         engineering_btn = gr.Button("🤝 Start Engineering Design", variant="primary", size="lg")
                     
                     with gr.Column():
-                        gr.HTML("""
-                        <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px;">
-                            <h4 style="color: #ffffff;">Engineering Team</h4>
-                            <ul style="color: #cccccc; font-size: 0.9em;">
-                                <li>🎯 Systems Engineer</li>
-                                <li>🚀 Propulsion Engineer</li>
-                                <li>🏗️ Structural Engineer</li>
-                                <li>💻 Software Engineer</li>
-                                <li>🎮 Mission Operations</li>
-                            </ul>
-                        </div>
-                        """)
+                        gr.HTML(static_html("engineering_sidebar"))
                 
                 engineering_output = gr.Markdown(label="Engineering Design Session", container=True)
-                engineering_btn.click(fn=portfolio.run_engineering_team, inputs=project_input, outputs=engineering_output)
+                engineering_btn.click(fn=portfolio.run_engineering_team, inputs=[project_input, model_routing], outputs=engineering_output)
             
             # Tab 3: Mission Control
             with gr.TabItem("🎮 Mission Control", id="control"):
-                gr.HTML("""
-                <div style="text-align: center; margin-bottom: 20px;">
-                    <h2 style="color: #ffffff;">NASA Mission Control</h2>
-                    <p style="color: #cccccc;">Real-time mission operations and decision support</p>
-                </div>
-                """)
+                gr.HTML(static_html("control_intro"))
                 
                 with gr.Row():
                     with gr.Column():
@@ -629,34 +993,14 @@ def create_nasa_portfolio():
                         control_btn = gr.Button("🎮 Activate Mission Control", variant="primary", size="lg")
                     
                     with gr.Column():
-                        gr.HTML("""
-                        <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px;">
-                            <h4 style="color: #ffffff;">Control Team</h4>
-                            <ul style="color: #cccccc; font-size: 0.9em;">
-                                <li>🎯 Mission Specialist</li>
-                                <li>🔧 Systems Engineer</li>
-                                <li>👨‍💼 Flight Director</li>
-                            </ul>
-                            <h4 style="color: #ffffff; margin-top: 15px;">Priority Levels</h4>
-                            <ul style="color: #cccccc; font-size: 0.9em;">
-                                <li>🟢 Routine</li>
-                                <li>🟡 Elevated</li>
-                                <li>🔴 Critical</li>
-                            </ul>
-                        </div>
-                        """)
+                        gr.HTML(static_html("control_sidebar"))
                 
                 control_output = gr.Markdown(label="Mission Control Response", container=True)
-                control_btn.click(fn=portfolio.run_mission_control, inputs=[control_scenario, mission_phase], outputs=control_output)
+                control_btn.click(fn=portfolio.run_mission_control, inputs=[control_scenario, mission_phase, model_routing], outputs=control_output)
             
             # Tab 4: Spacecraft Autonomy
             with gr.TabItem("🤖 Spacecraft Autonomy", id="autonomy"):
-                gr.HTML("""
-                <div style="text-align: center; margin-bottom: 20px;">
-                    <h2 style="color: #ffffff;">NASA Spacecraft Autonomy</h2>
-                    <p style="color: #cccccc;">Deep space autonomous decision-making systems</p>
-                </div>
-                """)
+                gr.HTML(static_html("autonomy_intro"))
                 
                 with gr.Row():
                     with gr.Column():
@@ -677,30 +1021,14 @@ def create_nasa_portfolio():
                         autonomy_btn = gr.Button("🤖 Activate Autonomy", variant="primary", size="lg")
                     
                     with gr.Column():
-                        gr.HTML("""
-                        <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px;">
-                            <h4 style="color: #ffffff;">Autonomy Features</h4>
-                            <ul style="color: #cccccc; font-size: 0.9em;">
-                                <li>🧭 Navigation Planning</li>
-                                <li>⚡ Fault Detection</li>
-                                <li>🔋 Resource Management</li>
-                                <li>🛡️ Risk Assessment</li>
-                                <li>📡 Earth Communication</li>
-                            </ul>
-                        </div>
-                        """)
+                        gr.HTML(static_html("autonomy_sidebar"))
                 
                 autonomy_output = gr.Markdown(label="Autonomy Response", container=True)
-                autonomy_btn.click(fn=portfolio.run_spacecraft_autonomy, inputs=[autonomy_situation, autonomy_scenario], outputs=autonomy_output)
+                autonomy_btn.click(fn=portfolio.run_spacecraft_autonomy, inputs=[autonomy_situation, autonomy_scenario, model_routing], outputs=autonomy_output)
             
             # Tab 5: Satellite Traffic Management
             with gr.TabItem("🛰️ Satellite Traffic", id="traffic"):
-                gr.HTML("""
-                <div style="text-align: center; margin-bottom: 20px;">
-                    <h2 style="color: #ffffff;">NASA Satellite Traffic Management</h2>
-                    <p style="color: #cccccc;">Orbital collision avoidance and space traffic coordination</p>
-                </div>
-                """)
+                gr.HTML(static_html("traffic_intro"))
                 
                 with gr.Row():
                     with gr.Column():
@@ -721,30 +1049,14 @@ def create_nasa_portfolio():
                         traffic_btn = gr.Button("🛰️ Activate Traffic Management", variant="primary", size="lg")
                     
                     with gr.Column():
-                        gr.HTML("""
-                        <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px;">
-                            <h4 style="color: #ffffff;">Traffic Management</h4>
-                            <ul style="color: #cccccc; font-size: 0.9em;">
-                                <li>🎯 Trajectory Prediction</li>
-                                <li>⚠️ Collision Assessment</li>
-                                <li>🚀 Avoidance Maneuvers</li>
-                                <li>🌐 Constellation Coordination</li>
-                                <li>📡 Multi-Satellite Management</li>
-                            </ul>
-                        </div>
-                        """)
+                        gr.HTML(static_html("traffic_sidebar"))
                 
                 traffic_output = gr.Markdown(label="Traffic Management Response", container=True)
-                traffic_btn.click(fn=portfolio.run_satellite_traffic, inputs=[traffic_scenario, orbital_zone], outputs=traffic_output)
+                traffic_btn.click(fn=portfolio.run_satellite_traffic, inputs=[traffic_scenario, orbital_zone, model_routing], outputs=traffic_output)
             
             # Tab 6: Planetary Exploration
             with gr.TabItem("🌍 Planetary Exploration", id="exploration"):
-                gr.HTML("""
-                <div style="text-align: center; margin-bottom: 20px;">
-                    <h2 style="color: #ffffff;">NASA Planetary Exploration</h2>
-                    <p style="color: #cccccc;">Autonomous planetary surface analysis and exploration planning</p>
-                </div>
-                """)
+                gr.HTML(static_html("exploration_intro"))
                 
                 with gr.Row():
                     with gr.Column():
@@ -770,50 +1082,35 @@ def create_nasa_portfolio():
                         exploration_btn = gr.Button("🌍 Start Exploration", variant="primary", size="lg")
                     
                     with gr.Column():
-                        gr.HTML("""
-                        <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px;">
-                            <h4 style="color: #ffffff;">Exploration Capabilities</h4>
-                            <ul style="color: #cccccc; font-size: 0.9em;">
-                                <li>🔍 Terrain Analysis</li>
-                                <li>🎯 Target Prioritization</li>
-                                <li>🛰️ Path Planning</li>
-                                <li>🤖 Autonomous Science</li>
-                                <li>📊 Mission Optimization</li>
-                            </ul>
-                        </div>
-                        """)
+                        gr.HTML(static_html("exploration_sidebar"))
                 
                 exploration_output = gr.Markdown(label="Exploration Mission", container=True)
-                exploration_btn.click(fn=portfolio.run_planetary_exploration, inputs=[planet_body, exploration_region, exploration_objectives], outputs=exploration_output)
+                exploration_btn.click(fn=portfolio.run_planetary_exploration, inputs=[planet_body, exploration_region, exploration_objectives, model_routing], outputs=exploration_output)
+            
+            # Hidden Tab: Batch pre-warm of demo replies (set NASA_PREWARM_TAB=1 to show)
+            with gr.TabItem("📦 Batch Pre-warm", id="prewarm", visible=NASA_PREWARM_TAB == "1"):
+                prewarm_queries = gr.Textbox(
+                    label="Research Queries (one per line)",
+                    value="Artemis lunar base construction materials\nMars mission life support systems",
+                    lines=5
+                )
+                prewarm_btn = gr.Button("📦 Pre-warm via Batch API", variant="secondary")
+                prewarm_output = gr.Markdown(label="Batch Results", container=True)
+                prewarm_btn.click(fn=portfolio.run_batch_prewarm, inputs=prewarm_queries, outputs=prewarm_output)
         
         # Footer
-        gr.HTML("""
-        <div style="text-align: center; margin-top: 30px; padding: 20px; background: rgba(255,255,255,0.05); border-radius: 10px;">
-            <h3 style="color: #ffffff;">🌟 NASA AI Portfolio Highlights</h3>
-            <div style="display: flex; justify-content: space-around; margin-top: 15px;">
-                <div style="color: #bbdefb;">
-                    <strong>6 AI Frameworks</strong><br>
-                    <small>OpenAI • Multi-Agent • LangGraph</small>
-                </div>
-                <div style="color: #bbdefb;">
-                    <strong>NASA Standards</strong><br>
-                    <small>Authentic Workflows • Real Protocols</small>
-                </div>
-                <div style="color: #bbdefb;">
-                    <strong>Production Ready</strong><br>
-                    <small>Scalable • Professional • Robust</small>
-                </div>
-            </div>
-            <p style="color: #90caf9; margin-top: 15px; font-size: 0.9em;">
-                🚀 Ready for NASA Interview Demonstration • Repository: github.com/OpalDecisionSciences/nasa-ai-agents-portfolio
-            </p>
-        </div>
-        """)
+        gr.HTML(static_html("footer"))
+        
+        # Warm the API connection on page load so the first click skips connection setup
+        demo.load(fn=portfolio.warmup)
     
     return demo
 
 if __name__ == "__main__":
     demo = create_nasa_portfolio()
+    
+    # Bounded queue: concurrent runs match the API worker limit, excess users get a fast "queue full"
+    demo.queue(default_concurrency_limit=OPENAI_MAX_CONCURRENT, max_size=GRADIO_QUEUE_SIZE, api_open=False)
     demo.launch(
         server_name="0.0.0.0",
         server_port=7860,
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Deterministic checks for the planetary exploration planning helpers
+Runs with NASA_LLM=0 so no API key or network access is needed
+"""
+
+import asyncio
+import itertools
+import os
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+os.environ.setdefault("NASA_LLM", "0")
+
+import nasa_planetary_exploration as exploration
+
+def knapsack_brute_force(weights, values, capacity):
+    """Best total value over every subset that fits the capacity"""
+    best = 0
+    for size in range(len(weights) + 1):
+        for subset in itertools.combinations(range(len(weights)), size):
+            if sum(weights[i] for i in subset) <= capacity:
+                best = max(best, sum(values[i] for i in subset))
+    return best
+
+@pytest.mark.parametrize("seed", range(20))
+def test_select_within_budget_matches_brute_force(seed):
+    """The knapsack picks a feasible subset with the optimal total value"""
+    rng = np.random.default_rng(seed)
+    weights = tuple(int(w) for w in rng.integers(1, 12, size=9))
+    values = tuple(int(v) for v in rng.integers(1, 50, size=9))
+    capacity = int(rng.integers(0, 40))
+    
+    chosen = exploration.select_within_budget(weights, values, capacity)
+    assert list(chosen) == sorted(set(chosen))
+    assert sum(weights[i] for i in chosen) <= capacity
+    assert sum(values[i] for i in chosen) == knapsack_brute_force(weights, values, capacity)
+
+def route_length(points, route):
+    """Driving distance along an open route"""
+    coords = np.asarray(points, dtype=float)[route]
+    return float(np.hypot(*np.diff(coords, axis=0).T).sum())
+
+def test_order_route_collinear_points_in_order():
+    """Points along a line are visited in order outward from the start"""
+    points = [(0.0, 0.0), (3.0, 0.0), (1.0, 0.0), (4.0, 0.0), (2.0, 0.0)]
+    assert exploration.order_route(points) == [0, 2, 4, 1, 3]
+
+@pytest.mark.parametrize("seed", range(10))
+def test_order_route_is_two_opt_optimal(seed):
+    """The route starts at the first point, visits each once, and no segment reversal shortens it"""
+    rng = np.random.default_rng(seed)
+    points = [tuple(p) for p in rng.uniform(-1, 1, size=(9, 2))]
+    
+    route = exploration.order_route(points)
+    assert route[0] == 0
+    assert sorted(route) == list(range(len(points)))
+    
+    length = route_length(points, route)
+    for i in range(1, len(route) - 1):
+        for j in range(i + 1, len(route)):
+            candidate = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+            assert route_length(points, candidate) >= length - 1e-9
+
+class StreamedReply:
+    """Chat completions stand-in that streams a fixed reply in small pieces"""
+    
+    def __init__(self, text: str, piece_size: int):
+        self.pieces = [text[i:i + piece_size] for i in range(0, len(text), piece_size)]
+    
+    async def create(self, **request):
+        async def stream():
+            for piece in self.pieces:
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+        return stream()
+
+BRIEFING_REPLY = (
+    "=== terrain_analysis ===\nDust-covered basalt plains.\n"
+    "=== prioritization_analysis ===\nDelta deposits first; === is not a marker mid-line.\n"
+    "=== path_analysis ===\nHead north-east.\n"
+    "=== science_analysis ===\nDrill the clay layer."
+)
+
+@pytest.mark.parametrize("piece_size", [1, 3, 7, len(BRIEFING_REPLY)])
+def test_briefing_markers_route_sections(piece_size):
+    """Marker lines split sections however the stream breaks them up, and never leak into the text"""
+    explorer = exploration.NASAPlanetaryExplorer()
+    explorer.llm_enabled = True
+    explorer.client = SimpleNamespace(chat=SimpleNamespace(completions=StreamedReply(BRIEFING_REPLY, piece_size)))
+    payloads = {key: "payload" for key in exploration.BRIEFING_SECTIONS}
+    
+    async def run():
+        sections = {key: asyncio.Queue() for key in exploration.BRIEFING_SECTIONS}
+        return await explorer.pump_mission_briefing(payloads, "context", sections)
+    
+    briefing = asyncio.run(run())
+    assert briefing == {
+        "terrain_analysis": "Dust-covered basalt plains.\n",
+        "prioritization_analysis": "Delta deposits first; === is not a marker mid-line.\n",
+        "path_analysis": "Head north-east.\n",
+        "science_analysis": "Drill the clay layer."
+    }
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
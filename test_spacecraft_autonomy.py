@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Deterministic checks for the spacecraft autonomy rules
+The packed numpy rule evaluation is compared against the per-state rules it replaced
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+import nasa_spacecraft_autonomy as autonomy
+
+STATUSES = ["nominal", "degraded", "backup", "failed", "critical", "reduced", "elevated", "redundant"]
+
+def random_states(seed: int, count: int):
+    """Spacecraft states spread across every rule threshold"""
+    rng = np.random.default_rng(seed)
+    return [
+        autonomy.SpacecraftState(
+            position=(0.0, 0.0, 0.0),
+            velocity=(0.0, 0.0, 0.0),
+            fuel_level=float(rng.uniform(0, 100)),
+            battery_level=float(rng.uniform(0, 100)),
+            solar_panel_efficiency=float(rng.uniform(40, 100)),
+            system_health={system: str(rng.choice(STATUSES)) for system in autonomy.SYSTEM_STATUS_CHOICES},
+            communication_delay=float(rng.uniform(0, 40)),
+            mission_phase="cruise"
+        )
+        for _ in range(count)
+    ]
+
+def expected_anomalies(state, rules):
+    """Per-state anomaly checks, one flag per ANOMALY_CHECKS column"""
+    statuses = list(state.system_health.values())
+    return [
+        state.fuel_level < rules["critical_fuel"],
+        state.battery_level < rules["critical_battery"],
+        state.solar_panel_efficiency < 70,
+        any(status in ["failed", "critical"] for status in statuses),
+        sum(status in ["degraded", "backup"] for status in statuses) > 2,
+        state.communication_delay > rules["max_communication_delay"]
+    ]
+
+def expected_allocation(state):
+    """Per-state power allocation"""
+    allocations = dict(autonomy.BASE_ALLOCATION)
+    if state.fuel_level < 30:
+        allocations["propulsion"] = 5.0
+        allocations["navigation"] += 5.0
+    if any(status in ["degraded", "backup"] for status in state.system_health.values()):
+        allocations["life_support"] += 5.0
+        allocations["scientific_instruments"] -= 5.0
+    if state.communication_delay > 15:
+        allocations["communications"] += 5.0
+        allocations["scientific_instruments"] -= 5.0
+    return allocations
+
+@pytest.mark.parametrize("seed", range(5))
+def test_detect_anomalies_batch_matches_per_state_rules(seed):
+    """Every packed row raises exactly the flags the per-state checks would"""
+    system = autonomy.AUTONOMY_SYSTEM
+    states = random_states(seed, 200)
+    
+    flags = system.detect_anomalies_batch(system.pack_states(states))
+    assert flags.shape == (len(states), len(autonomy.ANOMALY_CHECKS))
+    assert flags.tolist() == [expected_anomalies(state, system.autonomy_rules) for state in states]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_resource_management_batch_matches_per_state_rules(seed):
+    """Every packed row gets the allocation the per-state adjustments would give"""
+    system = autonomy.AUTONOMY_SYSTEM
+    states = random_states(seed, 200)
+    
+    allocations = system.resource_management_batch(system.pack_states(states))
+    for state, allocation in zip(states, allocations):
+        expected = expected_allocation(state)
+        assert {name: float(allocation[name]) for name in autonomy.BASE_ALLOCATION} == expected
+        assert sum(expected.values()) == 100.0
+
+STREAMED_REPLY = json.dumps({
+    "navigation": "Hold \"course\".\nTrim burn by 0.3 m/s — then C:\\log",
+    "recovery": "Isolate valve B; café-grade fix",
+    "decision": {"decision_type": "fuel_leak_isolation"}
+})
+
+@pytest.mark.parametrize("key", ["navigation", "recovery"])
+def test_partial_json_string_decodes_every_prefix(key):
+    """Each cut of the streamed reply decodes to a prefix of the field, and the whole reply to the field itself"""
+    full = json.loads(STREAMED_REPLY)[key]
+    seen_key = False
+    for end in range(len(STREAMED_REPLY) + 1):
+        text = autonomy.partial_json_string(STREAMED_REPLY[:end], key)
+        if text is None:
+            assert not seen_key
+            continue
+        seen_key = True
+        assert full.startswith(text)
+    assert autonomy.partial_json_string(STREAMED_REPLY, key) == full
+
+def test_partial_json_string_missing_key():
+    """A field that hasn't started yet decodes to None"""
+    assert autonomy.partial_json_string('{"navigation": "Hold', "recovery") is None
+
+BATCH_CALLSIGNS = ["ALPHA", "BRAVO", "CHARLIE"]
+
+class FakeBatchAPI:
+    """files/batches stand-in: answers each uploaded request by the callsign in its prompt, failing CHARLIE"""
+    
+    def __init__(self):
+        self.requests = []
+        self.polls = 0
+        self.files = SimpleNamespace(create=self.upload, content=self.content)
+        self.batches = SimpleNamespace(create=self.create_batch, retrieve=self.retrieve_batch)
+    
+    async def upload(self, file, purpose):
+        assert purpose == "batch"
+        self.requests = [json.loads(line) for line in file[1].decode().splitlines()]
+        return SimpleNamespace(id="file-in")
+    
+    async def create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch-1", status="validating")
+    
+    async def retrieve_batch(self, batch_id):
+        self.polls += 1
+        status = "completed" if self.polls > 1 else "in_progress"
+        return SimpleNamespace(id=batch_id, status=status, output_file_id="file-out", error_file_id="file-err")
+    
+    async def content(self, file_id):
+        lines = []
+        for request in self.requests:
+            prompt = request["body"]["messages"][-1]["content"]
+            callsign = next(name for name in BATCH_CALLSIGNS if name in prompt)
+            if (callsign == "CHARLIE") != (file_id == "file-err"):
+                continue
+            if callsign == "CHARLIE":
+                lines.append({"custom_id": request["custom_id"], "error": {"message": "quota"}})
+                continue
+            reply = json.dumps({
+                "navigation": f"Navigation for {callsign}",
+                "recovery": "None needed",
+                "decision": {
+                    "decision_type": "hold",
+                    "actions_taken": [f"Hold {callsign}"],
+                    "risk_assessment": "low",
+                    "communication_to_earth": f"Report {callsign}",
+                    "confidence_level": 0.9
+                }
+            })
+            body = {"choices": [{"message": {"content": reply}}]}
+            lines.append({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}})
+        return SimpleNamespace(text="\n".join(json.dumps(line) for line in lines))
+
+def test_run_batch_simulations_routes_results_by_custom_id(monkeypatch):
+    """One job carries every simulation's request, and each report gets its own reply or error"""
+    monkeypatch.setattr(autonomy, "BATCH_POLL_SECONDS", 0)
+    system = autonomy.NASASpacecraftAutonomy(batch_mode=True)
+    system.client = FakeBatchAPI()
+    scenarios = [(f"Thruster anomaly {callsign}", "deep_space") for callsign in BATCH_CALLSIGNS]
+    
+    reports = asyncio.run(system.run_batch_simulations(scenarios))
+    
+    assert len(system.client.requests) == len(scenarios)
+    assert len({request["custom_id"] for request in system.client.requests}) == len(scenarios)
+    assert system.client.polls == 2
+    for callsign, report in zip(BATCH_CALLSIGNS[:2], reports):
+        assert f"Report {callsign}" in report
+        assert all(f"Report {other}" not in report for other in BATCH_CALLSIGNS if other != callsign)
+    assert "Batch request failed" in reports[2]
+    assert not system._batch_futures
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))